@@ -161,6 +161,25 @@ class Assignment(kvs.Base, assignment.Driver):
     def get_roles_for_groups(self, group_ids, project_id=None, domain_id=None):
         raise exception.NotImplemented()
 
+    def get_roles_for_actors(self, user_id, group_ids, project_id=None,
+                             domain_id=None, inherited=False):
+        target_id = project_id or domain_id
+        if target_id is None:
+            raise AttributeError(_("Must specify either domain or project"))
+
+        keys = ['metadata_user-%s-%s' % (target_id, user_id)]
+        keys += ['metadata_group-%s-%s' % (target_id, group_id)
+                 for group_id in group_ids]
+        role_list = []
+        for key in keys:
+            try:
+                metadata_ref = self.db.get(key)
+            except exception.NotFound:
+                continue
+            role_list += self._roles_from_role_dicts(
+                metadata_ref.get('roles', []), inherited)
+        return role_list
+
     def list_projects_for_groups(self, group_ids):
         raise exception.NotImplemented()
 
@@ -205,7 +224,7 @@ class Assignment(kvs.Base, assignment.Driver):
         else:
             self.db.delete('metadata_user-%s-%s' % (tenant_id, user_id))
 
-    def list_role_assignments(self):
+    def list_role_assignments(self, hints):
         """List the role assignments.
 
         We enumerate the metadata entries and extract the targets, actors, and
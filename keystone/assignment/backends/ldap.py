@@ -147,6 +147,28 @@ class Assignment(assignment.Driver):
     def get_roles_for_groups(self, group_ids, project_id=None, domain_id=None):
         raise exception.NotImplemented()
 
+    def get_roles_for_actors(self, user_id, group_ids, project_id=None,
+                             domain_id=None, inherited=False):
+        if project_id is None:
+            if domain_id is None:
+                raise AttributeError(
+                    _("Must specify either domain or project"))
+            msg = _('Domain metadata not supported by LDAP')
+            raise exception.NotImplemented(message=msg)
+        if inherited:
+            return []
+
+        actor_dns = [ldap.dn.str2dn(self.user._id_to_dn(user_id))]
+        actor_dns += [ldap.dn.str2dn(self.group._id_to_dn(group_id))
+                      for group_id in group_ids]
+        # All the role assignments on the project are read with a single
+        # search and matched against the user and its groups here.
+        return [self.role._dn_to_id(a.role_dn)
+                for a in self.role.get_role_assignments(
+                    self.project._id_to_dn(project_id))
+                if any(common_ldap.is_dn_equal(a.user_dn, actor_dn)
+                       for actor_dn in actor_dns)]
+
     def list_projects_for_groups(self, group_ids):
         raise exception.NotImplemented()
 
@@ -390,7 +412,7 @@ class Assignment(assignment.Driver):
             raise exception.DomainNotFound(domain_id=domain_name)
         return default_domain
 
-    def list_role_assignments(self):
+    def list_role_assignments(self, hints):
         role_assignments = []
         for a in self.role.list_role_assignments(self.project.tree_dn):
             assignment = {'role_id': self.role._dn_to_id(a.role_dn),
@@ -312,6 +312,38 @@ class Assignment(keystone_assignment.Driver):
                 sql_constraints).distinct()
         return [role.to_dict() for role in query.all()]
 
+    def get_roles_for_actors(self, user_id, group_ids, project_id=None,
+                             domain_id=None, inherited=False):
+
+        if project_id is not None:
+            user_type = AssignmentType.USER_PROJECT
+            group_type = AssignmentType.GROUP_PROJECT
+            target_id = project_id
+        elif domain_id is not None:
+            user_type = AssignmentType.USER_DOMAIN
+            group_type = AssignmentType.GROUP_DOMAIN
+            target_id = domain_id
+        else:
+            raise AttributeError(_("Must specify either domain or project"))
+
+        actor_constraints = [sqlalchemy.and_(
+            RoleAssignment.type == user_type,
+            RoleAssignment.actor_id == user_id)]
+        if group_ids:
+            actor_constraints.append(sqlalchemy.and_(
+                RoleAssignment.type == group_type,
+                RoleAssignment.actor_id.in_(group_ids)))
+
+        sql_constraints = sqlalchemy.and_(
+            RoleAssignment.target_id == target_id,
+            RoleAssignment.inherited == inherited,
+            sqlalchemy.or_(*actor_constraints))
+
+        with sql.transaction() as session:
+            query = session.query(RoleAssignment.role_id).filter(
+                sql_constraints).distinct()
+            return [ref.role_id for ref in query.all()]
+
     def _list_entities_for_groups(self, group_ids, entity):
         if entity == Domain:
             assignment_type = AssignmentType.GROUP_DOMAIN
@@ -362,7 +394,7 @@ class Assignment(keystone_assignment.Driver):
                     'Cannot remove role that has not been granted, %s') %
                     role_id)
 
-    def list_role_assignments(self):
+    def list_role_assignments(self, hints):
 
         def denormalize_role(ref):
             assignment = {}
@@ -389,8 +421,55 @@ class Assignment(keystone_assignment.Driver):
             return assignment
 
         with sql.transaction() as session:
-            refs = session.query(RoleAssignment).all()
-            return [denormalize_role(ref) for ref in refs]
+            query = session.query(RoleAssignment.type,
+                                  RoleAssignment.actor_id,
+                                  RoleAssignment.target_id,
+                                  RoleAssignment.role_id,
+                                  RoleAssignment.inherited)
+            query = self._filter_role_assignments(query, hints)
+            return [denormalize_role(ref) for ref in query.yield_per(1000)]
+
+    def _filter_role_assignments(self, query, hints):
+        """Applies the role assignment filters in hints to a query.
+
+        Any filters satisfied here are removed from hints.
+
+        """
+        for filter_ in list(hints.filters):
+            if filter_['comparator'] != 'equals':
+                continue
+            name = filter_['name']
+            value = filter_['value']
+            values = value if isinstance(value, list) else [value]
+            if name == 'user_id':
+                query = query.filter(
+                    RoleAssignment.type.in_([AssignmentType.USER_PROJECT,
+                                             AssignmentType.USER_DOMAIN]),
+                    RoleAssignment.actor_id.in_(values))
+            elif name == 'group_id':
+                query = query.filter(
+                    RoleAssignment.type.in_([AssignmentType.GROUP_PROJECT,
+                                             AssignmentType.GROUP_DOMAIN]),
+                    RoleAssignment.actor_id.in_(values))
+            elif name == 'project_id':
+                query = query.filter(
+                    RoleAssignment.type.in_([AssignmentType.USER_PROJECT,
+                                             AssignmentType.GROUP_PROJECT]),
+                    RoleAssignment.target_id.in_(values))
+            elif name == 'domain_id':
+                query = query.filter(
+                    RoleAssignment.type.in_([AssignmentType.USER_DOMAIN,
+                                             AssignmentType.GROUP_DOMAIN]),
+                    RoleAssignment.target_id.in_(values))
+            elif name == 'role_id':
+                query = query.filter(RoleAssignment.role_id.in_(values))
+            elif name == 'inherited_to_projects':
+                query = query.filter(
+                    RoleAssignment.inherited == bool(value))
+            else:
+                continue
+            hints.filters.remove(filter_)
+        return query
 
     # CRUD
     @sql.handle_conflicts(conflict_type='project')
@@ -600,7 +679,8 @@ class RoleAssignment(sql.ModelBase, sql.DictBase):
                          nullable=False)
     inherited = sql.Column(sql.Boolean, default=False, nullable=False)
     __table_args__ = (sql.PrimaryKeyConstraint('type', 'actor_id', 'target_id',
-                                               'role_id'), {})
+                                               'role_id'),
+                      sql.Index('ix_assignment_target_id', 'target_id'), {})
 
     def to_dict(self):
         """Override parent to_dict() method with a simpler implementation.
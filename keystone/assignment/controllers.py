@@ -15,7 +15,6 @@
 
 """Workflow Logic the Assignment service."""
 
-import copy
 import uuid
 
 import six
@@ -23,6 +22,7 @@ from six.moves import urllib
 
 from keystone.common import controller
 from keystone.common import dependency
+from keystone.common import driver_hints
 from keystone import config
 from keystone import exception
 from keystone.openstack.common.gettextutils import _
@@ -65,7 +65,7 @@ class Tenant(controller.V2Controller):
 
         """
         try:
-            token_ref = self.token_api.get_token(context['token_id'])
+            token_ref = self._get_token_ref(context)
         except exception.NotFound as e:
             LOG.warning(_('Authentication failed: %s'), e)
             raise exception.Unauthorized(e)
@@ -566,6 +566,15 @@ class RoleAssignmentV3(controller.V3Controller):
     collection_name = 'role_assignments'
     member_name = 'role_assignment'
 
+    # The assignment_api filters that correspond to the API ones.
+    _ASSIGNMENT_FILTERS = {
+        'user.id': 'user_id',
+        'group.id': 'group_id',
+        'role.id': 'role_id',
+        'scope.project.id': 'project_id',
+        'scope.domain.id': 'domain_id',
+        'scope.OS-INHERIT:inherited_to': 'inherited_to_projects'}
+
     @classmethod
     def wrap_member(cls, context, ref):
         # NOTE(henry-nash): Since we are not yet a true collection, we override
@@ -649,7 +658,8 @@ class RoleAssignmentV3(controller.V3Controller):
 
         return formatted_entity
 
-    def _expand_indirect_assignments(self, context, refs):
+    def _expand_indirect_assignments(self, context, refs, user_id=None,
+                                     project_id=None):
         """Processes entity list into all-direct assignments.
 
         For any group role assignments in the list, create a role assignment
@@ -663,27 +673,39 @@ class RoleAssignmentV3(controller.V3Controller):
         For any new entity created by virtue of group membership, add in an
         additional link to that membership.
 
+        If user_id is given, the list only holds assignments of that user and
+        of groups the user is a member of, so group assignments are expanded
+        for that user alone. Likewise, if project_id is given, inherited
+        roles are only expanded onto that project.
+
         """
+        group_members = {}
+        domain_project_ids = {}
+
         def _get_group_members(ref):
             """Get a list of group members.
 
-            Get the list of group members.  If this fails with
-            GroupNotFound, then log this as a warning, but allow
-            overall processing to continue.
+            Get the list of group members, reading each group only once.
+            If this fails with GroupNotFound, then log this as a warning,
+            but allow overall processing to continue.
 
             """
+            group_id = ref['group']['id']
+            if user_id is not None:
+                return [{'id': user_id}]
+            if group_id in group_members:
+                return group_members[group_id]
             try:
-                members = self.identity_api.list_users_in_group(
-                    ref['group']['id'])
+                members = self.identity_api.list_users_in_group(group_id)
             except exception.GroupNotFound:
                 members = []
                 # The group is missing, which should not happen since
                 # group deletion should remove any related assignments, so
                 # log a warning
-                if 'domain' in ref:
-                    target = 'Domain: %s' % ref['domain'].get('domain_id')
-                elif 'project' in ref:
-                    target = 'Project: %s' % ref['project'].get('project_id')
+                if 'domain' in ref['scope']:
+                    target = 'Domain: %s' % ref['scope']['domain']['id']
+                elif 'project' in ref['scope']:
+                    target = 'Project: %s' % ref['scope']['project']['id']
                 else:
                     # Should always be a domain or project, but since to get
                     # here things have gone astray, let's be cautious.
@@ -691,70 +713,88 @@ class RoleAssignmentV3(controller.V3Controller):
                 LOG.warning(
                     _('Group %(group)s not found for role-assignment - '
                       '%(target)s with Role: %(role)s'), {
-                          'group': ref['group_id'], 'target': target,
-                          'role': ref.get('role_id')})
+                          'group': group_id, 'target': target,
+                          'role': ref['role']['id']})
+            group_members[group_id] = members
             return members
 
+        def _get_project_ids(domain_id):
+            """Get the ids of the projects owned by a domain, once."""
+            if project_id is not None:
+                return [project_id]
+            if domain_id not in domain_project_ids:
+                domain_project_ids[domain_id] = (
+                    [x['id'] for x in
+                        self.assignment_api.list_projects_in_domain(
+                            domain_id)])
+            return domain_project_ids[domain_id]
+
         def _build_user_assignment_equivalent_of_group(
                 user, group_id, template):
             """Create a user assignment equivalent to the group one.
 
-            The template has had the 'group' entity removed, so
-            substitute a 'user' one. The 'assignment' link stays as it is,
-            referring to the group assignment that led to this role.
-            A 'membership' link is added that refers to this particular
-            user's membership of this group.
+            Substitute a 'user' entity for the 'group' one of the
+            template. The 'assignment' link stays as it is, referring to the
+            group assignment that led to this role. A 'membership' link is
+            added that refers to this particular user's membership of this
+            group.
 
             """
-            user_entry = copy.deepcopy(template)
-            user_entry['user'] = {'id': user['id']}
-            user_entry['links']['membership'] = (
-                self.base_url(context, '/groups/%s/users/%s' %
-                              (group_id, user['id'])))
-            return user_entry
+            return {
+                'user': {'id': user['id']},
+                'role': template['role'],
+                'scope': template['scope'],
+                'links': {
+                    'assignment': template['links']['assignment'],
+                    'membership': self.base_url(
+                        context,
+                        '/groups/%s/users/%s' % (group_id, user['id']))}}
 
         def _build_project_equivalent_of_user_domain_role(
                 project_id, domain_id, template):
             """Create a user project assignment equivalent to the domain one.
 
-            The template has had the 'domain' entity removed, so
-            substitute a 'project' one, modifying the 'assignment' link
-            to match.
+            Substitute a 'project' entity for the 'domain' one of the
+            template, modifying the 'assignment' link to match.
 
             """
-            project_entry = copy.deepcopy(template)
-            project_entry['scope']['project'] = {'id': project_id}
-            project_entry['links']['assignment'] = (
-                self.base_url(
-                    context,
-                    '/OS-INHERIT/domains/%s/users/%s/roles/%s'
-                    '/inherited_to_projects' % (
-                        domain_id, project_entry['user']['id'],
-                        project_entry['role']['id'])))
-            return project_entry
+            return {
+                'user': template['user'],
+                'role': template['role'],
+                'scope': {
+                    'project': {'id': project_id},
+                    'OS-INHERIT:inherited_to': 'projects'},
+                'links': {
+                    'assignment': self.base_url(
+                        context,
+                        '/OS-INHERIT/domains/%s/users/%s/roles/%s'
+                        '/inherited_to_projects' % (
+                            domain_id, template['user']['id'],
+                            template['role']['id']))}}
 
         def _build_project_equivalent_of_group_domain_role(
                 user_id, group_id, project_id, domain_id, template):
             """Create a user project equivalent to the domain group one.
 
-            The template has had the 'domain' and 'group' entities removed, so
-            substitute a 'user-project' one, modifying the 'assignment' link
-            to match.
+            Substitute a 'user-project' entity for the 'group-domain' one of
+            the template, modifying the 'assignment' link to match.
 
             """
-            project_entry = copy.deepcopy(template)
-            project_entry['user'] = {'id': user_id}
-            project_entry['scope']['project'] = {'id': project_id}
-            project_entry['links']['assignment'] = (
-                self.base_url(context,
-                              '/OS-INHERIT/domains/%s/groups/%s/roles/%s'
-                              '/inherited_to_projects' % (
-                                  domain_id, group_id,
-                                  project_entry['role']['id'])))
-            project_entry['links']['membership'] = (
-                self.base_url(context, '/groups/%s/users/%s' %
-                              (group_id, user_id)))
-            return project_entry
+            return {
+                'user': {'id': user_id},
+                'role': template['role'],
+                'scope': {
+                    'project': {'id': project_id},
+                    'OS-INHERIT:inherited_to': 'projects'},
+                'links': {
+                    'assignment': self.base_url(
+                        context,
+                        '/OS-INHERIT/domains/%s/groups/%s/roles/%s'
+                        '/inherited_to_projects' % (
+                            domain_id, group_id, template['role']['id'])),
+                    'membership': self.base_url(
+                        context,
+                        '/groups/%s/users/%s' % (group_id, user_id))}}
 
         # Scan the list of entities for any assignments that need to be
         # expanded.
@@ -767,7 +807,9 @@ class RoleAssignmentV3(controller.V3Controller):
         # on membership of that group.
         #
         # Due to the potentially large expansions, rather than modify the
-        # list we are enumerating, we build a new one as we go.
+        # list we are enumerating, we build a new one as we go. The new
+        # entries are built afresh rather than deep copied, and share the
+        # unmodified 'role' and 'scope' entities of the original ones.
         #
 
         new_refs = []
@@ -776,46 +818,34 @@ class RoleAssignmentV3(controller.V3Controller):
                 # It's an inherited domain role - so get the list of projects
                 # owned by this domain. A domain scope is guaranteed since we
                 # checked this when we built the refs list
-                project_ids = (
-                    [x['id'] for x in
-                        self.assignment_api.list_projects_in_domain(
-                            r['scope']['domain']['id'])])
-                base_entry = copy.deepcopy(r)
-                domain_id = base_entry['scope']['domain']['id']
-                base_entry['scope'].pop('domain')
+                domain_id = r['scope']['domain']['id']
+                project_ids = _get_project_ids(domain_id)
                 # For each project, create an equivalent role assignment
-                for p in project_ids:
+                if 'group' in r:
                     # If it's a group assignment, then create equivalent user
                     # roles based on membership of the group
-                    if 'group' in base_entry:
-                        members = _get_group_members(base_entry)
-                        sub_entry = copy.deepcopy(base_entry)
-                        group_id = sub_entry['group']['id']
-                        sub_entry.pop('group')
+                    members = _get_group_members(r)
+                    group_id = r['group']['id']
+                    for p in project_ids:
                         for m in members:
                             new_entry = (
                                 _build_project_equivalent_of_group_domain_role(
-                                    m['id'], group_id, p,
-                                    domain_id, sub_entry))
+                                    m['id'], group_id, p, domain_id, r))
                             new_refs.append(new_entry)
-                    else:
+                else:
+                    for p in project_ids:
                         new_entry = (
                             _build_project_equivalent_of_user_domain_role(
-                                p, domain_id, base_entry))
+                                p, domain_id, r))
                         new_refs.append(new_entry)
             elif 'group' in r:
                 # It's a non-inherited group role assignment, so get the list
-                # of members.
-                members = _get_group_members(r)
-
-                # Now replace that group role assignment entry with an
-                # equivalent user role assignment for each of the group members
-                base_entry = copy.deepcopy(r)
-                group_id = base_entry['group']['id']
-                base_entry.pop('group')
-                for m in members:
+                # of members, and replace that group role assignment entry
+                # with an equivalent user role assignment for each of them.
+                group_id = r['group']['id']
+                for m in _get_group_members(r):
                     user_entry = _build_user_assignment_equivalent_of_group(
-                        m, group_id, base_entry)
+                        m, group_id, r)
                     new_refs.append(user_entry)
             else:
                 new_refs.append(r)
@@ -849,29 +879,108 @@ class RoleAssignmentV3(controller.V3Controller):
         else:
             return True
 
+    def _build_assignment_hints(self, hints, filter_names, **filters):
+        """Build the assignment_api hints for the API filters in hints.
+
+        Only the exact API filters listed in filter_names are passed on, in
+        addition to any assignment_api filters given as keyword arguments.
+
+        """
+        assignment_hints = driver_hints.Hints()
+        for name in filter_names:
+            filter_ = hints.get_exact_filter_by_name(name)
+            if filter_ is None:
+                continue
+            value = filter_['value']
+            if name == 'scope.OS-INHERIT:inherited_to':
+                if value != 'projects':
+                    # Left for wrap_collection to filter out.
+                    continue
+                value = True
+            assignment_hints.add_filter(self._ASSIGNMENT_FILTERS[name], value)
+        for name, value in six.iteritems(filters):
+            assignment_hints.add_filter(name, value)
+        return assignment_hints
+
+    def _list_effective_role_assignments(self, context, hints):
+        """List the effective role assignments matching the API filters.
+
+        The user and scope filters select the group and inherited
+        assignments that the effective ones derive from, so that only those
+        are read from assignment_api before being expanded.
+
+        """
+        user_filter = hints.get_exact_filter_by_name('user.id')
+        user_id = user_filter['value'] if user_filter else None
+        project_filter = hints.get_exact_filter_by_name('scope.project.id')
+        project_id = project_filter['value'] if project_filter else None
+        domain_filter = hints.get_exact_filter_by_name('scope.domain.id')
+
+        actors = [{}]
+        if user_id is not None:
+            actors = [{'user_id': user_id}]
+            try:
+                group_ids = [x['id'] for x in
+                             self.identity_api.list_groups_for_user(user_id)]
+            except exception.UserNotFound:
+                group_ids = []
+            if group_ids:
+                actors.append({'group_id': group_ids})
+
+        targets = [{}]
+        if project_id is not None:
+            targets = [{'project_id': project_id}]
+            if CONF.os_inherit.enabled:
+                try:
+                    project_ref = self.assignment_api.get_project(project_id)
+                    targets.append({'domain_id': project_ref['domain_id'],
+                                    'inherited_to_projects': True})
+                except exception.ProjectNotFound:
+                    pass
+        elif domain_filter is not None:
+            # Inherited roles on a domain only take effect on its projects.
+            targets = [{'domain_id': domain_filter['value'],
+                        'inherited_to_projects': False}]
+
+        refs = []
+        for actor in actors:
+            for target in targets:
+                filters = dict(actor, **target)
+                refs += self.assignment_api.list_role_assignments(
+                    self._build_assignment_hints(hints, ['role.id'],
+                                                 **filters))
+
+        formatted_refs = (
+            [self._format_entity(context, x) for x in refs
+             if self._filter_inherited(x)])
+        return self._expand_indirect_assignments(context, formatted_refs,
+                                                 user_id=user_id,
+                                                 project_id=project_id)
+
     @controller.filterprotected('group.id', 'role.id',
                                 'scope.domain.id', 'scope.project.id',
                                 'scope.OS-INHERIT:inherited_to', 'user.id')
     def list_role_assignments(self, context, filters):
 
-        # TODO(henry-nash): This implementation uses the standard filtering
-        # in the V3.wrap_collection. Given the large number of individual
-        # assignments, this is pretty inefficient.  An alternative would be
-        # to pass the filters into the driver call, so that the list size is
-        # kept a minimum.
+        # NOTE(henry-nash): The filters are passed into the driver call, so
+        # that the list size is kept a minimum. They all remain in the hints
+        # though, so that wrap_collection applies them to the formatted (and
+        # possibly expanded) assignments as well.
 
         hints = self.build_driver_hints(context, filters)
-        refs = self.assignment_api.list_role_assignments()
-        formatted_refs = (
-            [self._format_entity(context, x) for x in refs
-             if self._filter_inherited(x)])
-
         if ('effective' in context['query_string'] and
                 self._query_filter_is_true(
                     context['query_string']['effective'])):
 
-            formatted_refs = self._expand_indirect_assignments(context,
-                                                               formatted_refs)
+            formatted_refs = self._list_effective_role_assignments(context,
+                                                                   hints)
+        else:
+            refs = self.assignment_api.list_role_assignments(
+                self._build_assignment_hints(hints,
+                                             self._ASSIGNMENT_FILTERS))
+            formatted_refs = (
+                [self._format_entity(context, x) for x in refs
+                 if self._filter_inherited(x)])
 
         return self.wrap_collection(context, formatted_refs, hints=hints)
 
@@ -129,60 +129,22 @@ class Manager(manager.Manager):
                  keystone.exception.ProjectNotFound
 
         """
-        def _get_group_project_roles(user_id, project_ref):
-            role_list = []
-            group_refs = self.identity_api.list_groups_for_user(user_id)
-            for x in group_refs:
-                try:
-                    metadata_ref = self._get_metadata(
-                        group_id=x['id'], tenant_id=project_ref['id'])
-                    role_list += self._roles_from_role_dicts(
-                        metadata_ref.get('roles', {}), False)
-                except exception.MetadataNotFound:
-                    # no group grant, skip
-                    pass
-
-                if CONF.os_inherit.enabled:
-                    # Now get any inherited group roles for the owning domain
-                    try:
-                        metadata_ref = self._get_metadata(
-                            group_id=x['id'],
-                            domain_id=project_ref['domain_id'])
-                        role_list += self._roles_from_role_dicts(
-                            metadata_ref.get('roles', {}), True)
-                    except (exception.MetadataNotFound,
-                            exception.NotImplemented):
-                        pass
-
-            return role_list
-
-        def _get_user_project_roles(user_id, project_ref):
-            role_list = []
+        project_ref = self.get_project(tenant_id)
+        group_ids = self._get_group_ids_for_user_id(user_id)
+        role_list = self.driver.get_roles_for_actors(
+            user_id, group_ids, project_id=project_ref['id'])
+
+        if CONF.os_inherit.enabled:
+            # Now get any inherited roles for the owning domain
             try:
-                metadata_ref = self._get_metadata(user_id=user_id,
-                                                  tenant_id=project_ref['id'])
-                role_list = self._roles_from_role_dicts(
-                    metadata_ref.get('roles', {}), False)
-            except exception.MetadataNotFound:
+                role_list += self.driver.get_roles_for_actors(
+                    user_id, group_ids, domain_id=project_ref['domain_id'],
+                    inherited=True)
+            except exception.NotImplemented:
                 pass
 
-            if CONF.os_inherit.enabled:
-                # Now get any inherited roles for the owning domain
-                try:
-                    metadata_ref = self._get_metadata(
-                        user_id=user_id, domain_id=project_ref['domain_id'])
-                    role_list += self._roles_from_role_dicts(
-                        metadata_ref.get('roles', {}), True)
-                except (exception.MetadataNotFound, exception.NotImplemented):
-                    pass
-
-            return role_list
-
-        project_ref = self.get_project(tenant_id)
-        user_role_list = _get_user_project_roles(user_id, project_ref)
-        group_role_list = _get_group_project_roles(user_id, project_ref)
         # Use set() to process the list to remove any duplicates
-        return list(set(user_role_list + group_role_list))
+        return list(set(role_list))
 
     def get_roles_for_user_and_domain(self, user_id, domain_id):
         """Get the roles associated with a user within given domain.
@@ -192,41 +154,20 @@ class Manager(manager.Manager):
                  keystone.exception.DomainNotFound
 
         """
-
-        def _get_group_domain_roles(user_id, domain_id):
-            role_list = []
-            group_refs = self.identity_api.list_groups_for_user(user_id)
-            for x in group_refs:
-                try:
-                    metadata_ref = self._get_metadata(group_id=x['id'],
-                                                      domain_id=domain_id)
-                    role_list += self._roles_from_role_dicts(
-                        metadata_ref.get('roles', {}), False)
-                except (exception.MetadataNotFound, exception.NotImplemented):
-                    # MetadataNotFound implies no group grant, so skip.
-                    # Ignore NotImplemented since not all backends support
-                    # domains.
-                    pass
-            return role_list
-
-        def _get_user_domain_roles(user_id, domain_id):
-            metadata_ref = {}
-            try:
-                metadata_ref = self._get_metadata(user_id=user_id,
-                                                  domain_id=domain_id)
-            except (exception.MetadataNotFound, exception.NotImplemented):
-                # MetadataNotFound implies no user grants.
-                # Ignore NotImplemented since not all backends support
-                # domains
-                pass
-            return self._roles_from_role_dicts(
-                metadata_ref.get('roles', {}), False)
-
         self.get_domain(domain_id)
-        user_role_list = _get_user_domain_roles(user_id, domain_id)
-        group_role_list = _get_group_domain_roles(user_id, domain_id)
+        group_ids = self._get_group_ids_for_user_id(user_id)
+        try:
+            role_list = self.driver.get_roles_for_actors(
+                user_id, group_ids, domain_id=domain_id)
+        except exception.NotImplemented:
+            # Ignore NotImplemented since not all backends support domains.
+            role_list = []
         # Use set() to process the list to remove any duplicates
-        return list(set(user_role_list + group_role_list))
+        return list(set(role_list))
+
+    def _get_group_ids_for_user_id(self, user_id):
+        return [x['id'] for
+                x in self.identity_api.list_groups_for_user(user_id)]
 
     def add_user_to_project(self, tenant_id, user_id):
         """Add user to a tenant by creating a default role relationship.
@@ -483,16 +424,40 @@ class Manager(manager.Manager):
         self.driver.delete_role(role_id)
         self.get_role.invalidate(self, role_id)
 
+    def list_role_assignments(self, hints=None):
+        """List role assignments, optionally filtered by hints.
+
+        The filters are exact matches on the attributes of the assignments:
+        ``user_id``, ``group_id``, ``project_id``, ``domain_id``, ``role_id``
+        and ``inherited_to_projects`` (a boolean). A filter value may also be
+        a list, in which case any of its items matches.
+
+        Any filters not satisfied by the driver are applied here.
+
+        """
+        hints = hints or driver_hints.Hints()
+        refs = self.driver.list_role_assignments(hints)
+        for filter_ in hints.filters:
+            if filter_['comparator'] != 'equals':
+                continue
+            refs = [ref for ref in refs
+                    if self._role_assignment_matches(ref, filter_)]
+        return refs
+
+    @staticmethod
+    def _role_assignment_matches(ref, filter_):
+        name = filter_['name']
+        value = filter_['value']
+        if name == 'inherited_to_projects':
+            return bool(ref.get(name)) == bool(value)
+        if isinstance(value, list):
+            return ref.get(name) in value
+        return ref.get(name) == value
+
     def list_role_assignments_for_role(self, role_id=None):
-        # NOTE(henry-nash): Currently the efficiency of the key driver
-        # implementation (SQL) of list_role_assignments is severely hampered by
-        # the existence of the multiple grant tables - hence there is little
-        # advantage in pushing the logic of this method down into the driver.
-        # Once the single assignment table is implemented, then this situation
-        # will be different, and this method should have its own driver
-        # implementation.
-        return [r for r in self.driver.list_role_assignments()
-                if r['role_id'] == role_id]
+        hints = driver_hints.Hints()
+        hints.add_filter('role_id', role_id)
+        return self.list_role_assignments(hints)
 
     def remove_role_from_user_and_project(self, user_id, tenant_id, role_id):
         self.driver.remove_role_from_user_and_project(user_id, tenant_id,
@@ -741,8 +706,20 @@ class Driver(object):
         raise exception.NotImplemented()
 
     @abc.abstractmethod
-    def list_role_assignments(self):
+    def list_role_assignments(self, hints):
+        """Lists role assignments.
+
+        :param hints: filter hints which the driver should implement if at
+                      all possible. See the assignment Manager for the
+                      filters that may be present; any filter satisfied by
+                      the driver must be removed from the hints.
 
+        :returns: a list of assignment dicts, each with the ids of the actor
+                  (``user_id`` or ``group_id``), target (``project_id`` or
+                  ``domain_id``) and ``role_id``, plus
+                  ``inherited_to_projects`` for inherited roles.
+
+        """
         raise exception.NotImplemented()
 
     # domain crud
@@ -877,6 +854,32 @@ class Driver(object):
         """
         raise exception.NotImplemented()
 
+    @abc.abstractmethod
+    def get_roles_for_actors(self, user_id, group_ids, project_id=None,
+                             domain_id=None, inherited=False):
+        """List the ids of the roles a user and its groups have on a target.
+
+        This resolves, in a single backend call, the roles assigned either
+        directly to the user or to any of the groups on either a domain or
+        project. If the project_id is not None, this value will be used, no
+        matter what was specified in the domain_id.
+
+        :param user_id: id of the user
+        :param group_ids: iterable with the ids of the groups of the user
+        :param project_id: id of the project
+        :param domain_id: id of the domain
+        :param inherited: if True, list only the roles inherited by the
+                          projects of the domain, otherwise only the roles
+                          assigned on the target itself
+
+        :raises: AttributeError: In case both project_id and domain_id are set
+                                 to None
+
+        :returns: a list of role ids, which may contain duplicates
+
+        """
+        raise exception.NotImplemented()
+
     @abc.abstractmethod
     def list_projects_for_groups(self, group_ids):
         """List projects accessible to specified groups.
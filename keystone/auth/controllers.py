@@ -12,9 +12,6 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-from keystoneclient.common import cms
-import six
-
 from keystone.common import controller
 from keystone.common import dependency
 from keystone.common import wsgi
@@ -24,9 +21,7 @@ from keystone import exception
 from keystone.openstack.common.gettextutils import _
 from keystone.openstack.common.gettextutils import _LI  # noqa
 from keystone.openstack.common import importutils
-from keystone.openstack.common import jsonutils
 from keystone.openstack.common import log
-from keystone.openstack.common import timeutils
 
 
 LOG = log.getLogger(__name__)
@@ -504,6 +499,9 @@ class Auth(controller.V3Controller):
         token_data = self.token_provider_api.validate_v3_token(
             token_id)
         if not include_catalog and 'catalog' in token_data['token']:
+            # NOTE: the validated token may be shared with the token cache,
+            # so it is copied rather than modified.
+            token_data = {'token': dict(token_data['token'])}
             del token_data['token']['catalog']
         return render_token_data_response(token_id, token_data)
 
@@ -511,19 +509,9 @@ class Auth(controller.V3Controller):
     def revocation_list(self, context, auth=None):
         if not CONF.token.revoke_by_id:
             raise exception.Gone()
-        tokens = self.token_api.list_revoked_tokens()
-
-        for t in tokens:
-            expires = t['expires']
-            if not (expires and isinstance(expires, six.text_type)):
-                    t['expires'] = timeutils.isotime(expires)
-        data = {'revoked': tokens}
-        json_data = jsonutils.dumps(data)
-        signed_text = cms.cms_sign_text(json_data,
-                                        CONF.signing.certfile,
-                                        CONF.signing.keyfile)
-
-        return {'signed': signed_text}
+        version, signed_text = self.token_api.get_signed_revocation_list()
+        return wsgi.render_entity_response(context, {'signed': signed_text},
+                                           version)
 
 
 # FIXME(gyee): not sure if it belongs here or keystone.common. Park it here
@@ -16,7 +16,6 @@ from keystone import auth
 from keystone.common import dependency
 from keystone.contrib import federation
 from keystone.contrib.federation import utils
-from keystone.openstack.common import jsonutils
 
 
 @dependency.requires('federation_api', 'identity_api', 'token_api')
@@ -70,8 +69,7 @@ class Saml2(auth.AuthMethodHandler):
 
         mapping = self.federation_api.get_mapping_from_idp_and_protocol(
             identity_provider, protocol)
-        rules = jsonutils.loads(mapping['rules'])
-        rule_processor = utils.RuleProcessor(rules)
+        rule_processor = utils.get_rule_processor(mapping)
         mapped_properties = rule_processor.process(assertion)
         utils.validate_groups(mapped_properties['group_ids'],
                               mapping['id'], self.identity_api)
@@ -239,10 +239,8 @@ class Catalog(catalog.Driver):
             ref.extra = new_endpoint.extra
         return ref.to_dict()
 
-    def get_catalog(self, user_id, tenant_id, metadata=None):
+    def _compile_catalog(self):
         d = dict(six.iteritems(CONF))
-        d.update({'tenant_id': tenant_id,
-                  'user_id': user_id})
 
         session = sql.get_session()
         t = True  # variable for singleton for PEP8, E712.
@@ -250,34 +248,54 @@ class Catalog(catalog.Driver):
                      options(sql.joinedload(Endpoint.service)).
                      filter(Endpoint.enabled == t).all())
 
-        catalog = {}
-
+        compiled = []
         for endpoint in endpoints:
             if not endpoint.service['enabled']:
                 continue
             try:
-                url = core.format_url(endpoint['url'], d)
+                url = core.UrlTemplate(endpoint['url'], d)
+            except exception.MalformedEndpoint:
+                continue  # this failure is already logged in format_url()
+
+            compiled.append((endpoint['region'],
+                             endpoint.service['type'],
+                             endpoint['id'],
+                             endpoint.service['name'],
+                             '%sURL' % endpoint['interface'],
+                             url))
+        return compiled
+
+    def get_catalog(self, user_id, tenant_id, metadata=None):
+        catalog = {}
+
+        compiled = self._get_compiled_catalog(self._compile_catalog)
+        for (region, service_type, endpoint_id, service_name, interface_url,
+             url) in compiled:
+            try:
+                url = url.format(tenant_id, user_id)
             except exception.MalformedEndpoint:
                 continue  # this failure is already logged in format_url()
 
-            region = endpoint['region']
-            service_type = endpoint.service['type']
             default_service = {
-                'id': endpoint['id'],
-                'name': endpoint.service['name'],
+                'id': endpoint_id,
+                'name': service_name,
                 'publicURL': ''
             }
             catalog.setdefault(region, {})
             catalog[region].setdefault(service_type, default_service)
-            interface_url = '%sURL' % endpoint['interface']
             catalog[region][service_type][interface_url] = url
 
         return catalog
 
-    def get_v3_catalog(self, user_id, tenant_id, metadata=None):
+    def _compile_v3_endpoint(self, endpoint_ref, d):
+        endpoint = endpoint_ref.to_dict()
+        del endpoint['service_id']
+        del endpoint['legacy_endpoint_id']
+        del endpoint['enabled']
+        return endpoint, core.UrlTemplate(endpoint.pop('url'), d)
+
+    def _compile_v3_catalog(self):
         d = dict(six.iteritems(CONF))
-        d.update({'tenant_id': tenant_id,
-                  'user_id': user_id})
 
         session = sql.get_session()
         t = True  # variable for singleton for PEP8, E712.
@@ -285,24 +303,39 @@ class Catalog(catalog.Driver):
                     options(sql.joinedload(Service.endpoints)).
                     all())
 
-        def make_v3_endpoints(endpoints):
-            for endpoint in (ep.to_dict() for ep in endpoints if ep.enabled):
-                del endpoint['service_id']
-                del endpoint['legacy_endpoint_id']
-                del endpoint['enabled']
+        def compile_v3_endpoints(endpoints):
+            for endpoint in endpoints:
+                if not endpoint.enabled:
+                    continue
                 try:
-                    endpoint['url'] = core.format_url(endpoint['url'], d)
+                    yield self._compile_v3_endpoint(endpoint, d)
                 except exception.MalformedEndpoint:
                     continue  # this failure is already logged in format_url()
 
-                yield endpoint
-
-        def make_v3_service(svc):
-            eps = list(make_v3_endpoints(svc.endpoints))
-            service = {'endpoints': eps, 'id': svc.id, 'type': svc.type}
+        def compile_v3_service(svc):
+            service = {'id': svc.id, 'type': svc.type}
             name = svc.extra.get('name')
             if name:
                 service['name'] = name
-            return service
+            return service, list(compile_v3_endpoints(svc.endpoints))
+
+        return [compile_v3_service(svc) for svc in services]
+
+    def _format_v3_catalog(self, compiled, user_id, tenant_id):
+        def make_v3_endpoints(endpoints):
+            for endpoint, url in endpoints:
+                try:
+                    url = url.format(tenant_id, user_id)
+                except exception.MalformedEndpoint:
+                    continue  # this failure is already logged in format_url()
+
+                yield dict(endpoint, url=url)
 
-        return [make_v3_service(svc) for svc in services]
+        def make_v3_service(service, endpoints):
+            return dict(service, endpoints=list(make_v3_endpoints(endpoints)))
+
+        return [make_v3_service(*svc) for svc in compiled]
+
+    def get_v3_catalog(self, user_id, tenant_id, metadata=None):
+        compiled = self._get_compiled_catalog(self._compile_v3_catalog)
+        return self._format_v3_catalog(compiled, user_id, tenant_id)
@@ -106,22 +106,34 @@ class Catalog(kvs.Catalog):
             LOG.critical(_('Unable to open template file %s'), template_file)
             raise
 
-    def get_catalog(self, user_id, tenant_id, metadata=None):
+    def _compile_catalog(self):
         d = dict(six.iteritems(CONF))
-        d.update({'tenant_id': tenant_id,
-                  'user_id': user_id})
 
-        o = {}
+        compiled = []
         for region, region_ref in six.iteritems(self.templates):
-            o[region] = {}
+            services = []
             for service, service_ref in six.iteritems(region_ref):
-                service_data = {}
                 try:
-                    for k, v in six.iteritems(service_ref):
-                        service_data[k] = core.format_url(v, d)
+                    service_data = [(k, core.UrlTemplate(v, d))
+                                    for k, v in six.iteritems(service_ref)]
+                except exception.MalformedEndpoint:
+                    continue  # this failure is already logged in format_url()
+                services.append((service, service_data))
+            compiled.append((region, services))
+        return compiled
+
+    def get_catalog(self, user_id, tenant_id, metadata=None):
+        o = {}
+        compiled = self._get_compiled_catalog(self._compile_catalog)
+        for region, services in compiled:
+            o[region] = {}
+            for service, service_data in services:
+                try:
+                    o[region][service] = dict(
+                        (k, v.format(tenant_id, user_id))
+                        for k, v in service_data)
                 except exception.MalformedEndpoint:
                     continue  # this failure is already logged in format_url()
-                o[region][service] = service_data
 
         return o
 
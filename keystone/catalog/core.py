@@ -16,9 +16,12 @@
 """Main entry point into the Catalog service."""
 
 import abc
+import re
+import uuid
 
 import six
 
+from keystone.common import cache
 from keystone.common import dependency
 from keystone.common import driver_hints
 from keystone.common import manager
@@ -30,6 +33,17 @@ from keystone.openstack.common import log
 
 CONF = config.CONF
 LOG = log.getLogger(__name__)
+SHOULD_CACHE = cache.should_cache_fn('catalog')
+# NOTE: The config option is not available at import time.
+EXPIRATION_TIME = lambda: CONF.catalog.cache_time
+
+# The variables of an endpoint URL which vary from one request to another;
+# all the others are taken from the configuration.
+REQUEST_VARIABLES = frozenset(['tenant_id', 'user_id'])
+
+_REVISION_KEY = 'catalog-revision'
+# The number of changes this process has made to the catalog.
+_LOCAL_REVISION = {'count': 0}
 
 
 def format_url(url, data):
@@ -58,6 +72,69 @@ def format_url(url, data):
     return result
 
 
+class UrlTemplate(object):
+    """A user-defined endpoint URL, parsed once to be formatted cheaply.
+
+    The URL is checked and its configuration variables substituted when the
+    template is built, so that only the request variables (``tenant_id`` and
+    ``user_id``) are left to substitute for each request.
+
+    :raises: keystone.exception.MalformedEndpoint
+
+    """
+
+    _VARIABLE = re.compile(r'%\((\w+)\)')
+
+    def __init__(self, url, data):
+        # Report a malformed URL once, rather than on every request.
+        request_data = dict((name, None) for name in REQUEST_VARIABLES)
+        self.url = format_url(url, dict(data, **request_data))
+
+        template = url.replace('$(', '%(')
+        self.variables = frozenset(self._VARIABLE.findall(template))
+        if self.variables & REQUEST_VARIABLES:
+            self._template = template
+            self._data = dict((name, data[name])
+                              for name in self.variables - REQUEST_VARIABLES)
+        else:
+            self._template = None
+
+    def format(self, tenant_id, user_id):
+        if self._template is None:
+            return self.url
+        data = dict(self._data, tenant_id=tenant_id, user_id=user_id)
+        try:
+            return self._template % data
+        except (KeyError, TypeError, ValueError):
+            # Let format_url report the failure.
+            return format_url(self.url, data)
+
+
+def get_catalog_revision():
+    """Return the current revision of the catalog.
+
+    The revision changes whenever this process creates, updates or deletes
+    a region, a service or an endpoint. With caching enabled, it also
+    changes when another process sharing the cache does, and whenever the
+    shared revision expires, which bounds how long a process whose cache
+    backend is not shared keeps a stale catalog.
+
+    """
+    shared = None
+    if SHOULD_CACHE(None):
+        shared = cache.REGION.get_or_create(_REVISION_KEY,
+                                            lambda: uuid.uuid4().hex,
+                                            expiration_time=EXPIRATION_TIME())
+    return _LOCAL_REVISION['count'], shared
+
+
+def bump_catalog_revision():
+    """Invalidate the catalogs compiled from the current revision."""
+    _LOCAL_REVISION['count'] += 1
+    if SHOULD_CACHE(None):
+        cache.REGION.set(_REVISION_KEY, uuid.uuid4().hex)
+
+
 @dependency.provider('catalog_api')
 class Manager(manager.Manager):
     """Default pivot point for the Catalog backend.
@@ -85,10 +162,12 @@ class Manager(manager.Manager):
         # set it to an empty string.
         region_ref.setdefault('description', '')
         try:
-            return self.driver.create_region(region_ref)
+            ret = self.driver.create_region(region_ref)
         except exception.NotFound:
             parent_region_id = region_ref.get('parent_region_id')
             raise exception.RegionNotFound(region_id=parent_region_id)
+        bump_catalog_revision()
+        return ret
 
     def get_region(self, region_id):
         try:
@@ -96,15 +175,24 @@ class Manager(manager.Manager):
         except exception.NotFound:
             raise exception.RegionNotFound(region_id=region_id)
 
+    def update_region(self, region_id, region_ref):
+        ret = self.driver.update_region(region_id, region_ref)
+        bump_catalog_revision()
+        return ret
+
     def delete_region(self, region_id):
         try:
-            return self.driver.delete_region(region_id)
+            ret = self.driver.delete_region(region_id)
         except exception.NotFound:
             raise exception.RegionNotFound(region_id=region_id)
+        bump_catalog_revision()
+        return ret
 
     def create_service(self, service_id, service_ref):
         service_ref.setdefault('enabled', True)
-        return self.driver.create_service(service_id, service_ref)
+        ret = self.driver.create_service(service_id, service_ref)
+        bump_catalog_revision()
+        return ret
 
     def get_service(self, service_id):
         try:
@@ -112,11 +200,18 @@ class Manager(manager.Manager):
         except exception.NotFound:
             raise exception.ServiceNotFound(service_id=service_id)
 
+    def update_service(self, service_id, service_ref):
+        ret = self.driver.update_service(service_id, service_ref)
+        bump_catalog_revision()
+        return ret
+
     def delete_service(self, service_id):
         try:
-            return self.driver.delete_service(service_id)
+            ret = self.driver.delete_service(service_id)
         except exception.NotFound:
             raise exception.ServiceNotFound(service_id=service_id)
+        bump_catalog_revision()
+        return ret
 
     @manager.response_truncated
     def list_services(self, hints=None):
@@ -124,16 +219,25 @@ class Manager(manager.Manager):
 
     def create_endpoint(self, endpoint_id, endpoint_ref):
         try:
-            return self.driver.create_endpoint(endpoint_id, endpoint_ref)
+            ret = self.driver.create_endpoint(endpoint_id, endpoint_ref)
         except exception.NotFound:
             service_id = endpoint_ref.get('service_id')
             raise exception.ServiceNotFound(service_id=service_id)
+        bump_catalog_revision()
+        return ret
+
+    def update_endpoint(self, endpoint_id, endpoint_ref):
+        ret = self.driver.update_endpoint(endpoint_id, endpoint_ref)
+        bump_catalog_revision()
+        return ret
 
     def delete_endpoint(self, endpoint_id):
         try:
-            return self.driver.delete_endpoint(endpoint_id)
+            ret = self.driver.delete_endpoint(endpoint_id)
         except exception.NotFound:
             raise exception.EndpointNotFound(endpoint_id=endpoint_id)
+        bump_catalog_revision()
+        return ret
 
     def get_endpoint(self, endpoint_id):
         try:
@@ -159,6 +263,24 @@ class Driver(object):
     def _get_list_limit(self):
         return CONF.catalog.list_limit or CONF.list_limit
 
+    def _get_compiled_catalog(self, compile_catalog):
+        """Return the catalog compiled by compile_catalog.
+
+        With caching enabled, the compiled catalog is kept for the lifetime
+        of the process and only compiled again once the catalog revision
+        has changed.
+
+        """
+        if not SHOULD_CACHE(None):
+            return compile_catalog()
+        revision = get_catalog_revision()
+        compiled = getattr(self, '_compiled_catalogs', {})
+        key = compile_catalog.__name__
+        if key not in compiled or compiled[key][0] != revision:
+            compiled[key] = (revision, compile_catalog())
+            self._compiled_catalogs = compiled
+        return compiled[key][1]
+
     @abc.abstractmethod
     def create_region(self, region_ref):
         """Creates a new region.
@@ -336,6 +458,15 @@ class Driver(object):
         """
         raise exception.NotImplemented()
 
+    def invalidate_project_catalog(self, project_id):
+        """Discard any catalog cached for a project.
+
+        Only drivers which cache a catalog per project need to implement
+        this.
+
+        """
+        pass
+
     def get_v3_catalog(self, user_id, tenant_id, metadata=None):
         """Retrieve and format the current V3 service catalog.
 
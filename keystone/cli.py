@@ -14,6 +14,7 @@
 
 from __future__ import absolute_import
 
+import datetime
 import os
 
 from oslo.config import cfg
@@ -24,8 +25,10 @@ from keystone.common import sql
 from keystone.common.sql import migration_helpers
 from keystone.common import utils
 from keystone import config
+from keystone.contrib import revoke
 from keystone.openstack.common.gettextutils import _
 from keystone.openstack.common import log
+from keystone.openstack.common import timeutils
 from keystone import token
 
 
@@ -168,16 +171,57 @@ class TokenFlush(BaseApp):
 
     name = 'token_flush'
 
+    @classmethod
+    def add_argument_parser(cls, subparsers):
+        parser = super(TokenFlush, cls).add_argument_parser(subparsers)
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help=('Number of tokens deleted per transaction. '
+                                  'If not provided, the default of the '
+                                  'database is used; 0 deletes all the '
+                                  'expired tokens at once.'))
+        parser.add_argument('--sleep-between-batches', type=float,
+                            default=0,
+                            help=('Time to sleep between two batches, in '
+                                  'seconds, to limit the load on the '
+                                  'database.'))
+        parser.add_argument('--max-runtime', type=int, default=None,
+                            help=('Time after which no new batch is '
+                                  'started, in seconds. The remaining '
+                                  'expired tokens are left for the next '
+                                  'run.'))
+        parser.add_argument('--cutoff', type=int, default=0,
+                            help=('Only flush the tokens expired more than '
+                                  'this many hours ago.'))
+        return parser
+
     @classmethod
     def main(cls):
         token_manager = token.Manager()
-        token_manager.driver.flush_expired_tokens()
+        expired_before = timeutils.utcnow() - datetime.timedelta(
+            hours=CONF.command.cutoff)
+        token_manager.driver.flush_expired_tokens(
+            batch_size=CONF.command.batch_size,
+            batch_delay=CONF.command.sleep_between_batches,
+            max_runtime=CONF.command.max_runtime,
+            expired_before=expired_before)
+
+
+class RevocationFlush(BaseApp):
+    """Flush expired revocation events from the backend."""
+
+    name = 'revocation_flush'
+
+    @classmethod
+    def main(cls):
+        revoke_manager = revoke.Manager()
+        revoke_manager.prune_expired_events()
 
 
 CMDS = [
     DbSync,
     DbVersion,
     PKISetup,
+    RevocationFlush,
     SSLSetup,
     TokenFlush,
 ]
@@ -38,9 +38,45 @@ It is a dictionary with the following attributes:
 
 """
 
+AUTH_TOKEN_ENV = 'KEYSTONE_AUTH_TOKEN'
+"""Environment variable used to convey the request auth token.
+
+It is a :class:`RequestToken`, set by the middleware which validated the
+token, so that the later stages of the request do not load it again.
+
+"""
+
 LOG = log.getLogger(__name__)
 
 
+class RequestToken(object):
+    """The auth token of a request, loaded and validated once.
+
+    :param token_id: the token ID, as presented with the request
+    :param token_ref: the token reference, as returned by the token API
+    :param auth_context: the auth context built from the token
+
+    """
+
+    def __init__(self, token_id, token_ref, auth_context):
+        self.token_id = token_id
+        self.token_ref = token_ref
+        self.auth_context = auth_context
+
+
+def get_request_token(context):
+    """Return the RequestToken of the token the context was built for.
+
+    :returns: the RequestToken, or None if the token has not been validated
+              by the middleware.
+
+    """
+    request_token = context.get('environment', {}).get(AUTH_TOKEN_ENV)
+    if (request_token is not None and
+            request_token.token_id == context.get('token_id')):
+        return request_token
+
+
 def is_v3_token(token):
     # V3 token data are encapsulated into "token" key while
     # V2 token data are encapsulated into "access" key.
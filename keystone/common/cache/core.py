@@ -14,7 +14,12 @@
 
 """Keystone Caching Layer Implementation."""
 
+import collections
+import threading
+import time
+
 import dogpile.cache
+from dogpile.cache import api
 from dogpile.cache import proxy
 from dogpile.cache import util
 
@@ -79,6 +84,74 @@ class DebugProxy(proxy.ProxyBackend):
         self.proxied.delete_multi(keys)
 
 
+class LRUCache(object):
+    """Bounded in-process cache, in front of the shared cache region.
+
+    Values expire ``ttl`` seconds after they are set, and the least recently
+    used value is evicted once ``maxsize`` values are held. Values are not
+    shared between processes, so ``ttl`` bounds how long a process may keep
+    using a value invalidated by another one.
+
+    :param maxsize: maximum number of values held, 0 disables the cache
+    :param ttl: time to keep each value (in seconds)
+
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._values = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key):
+        """Return the value of the key, or ``api.NO_VALUE`` if not held."""
+        with self._lock:
+            try:
+                expires_at, value = self._values.pop(key)
+            except KeyError:
+                self.misses += 1
+                return api.NO_VALUE
+            if expires_at <= time.time():
+                self.misses += 1
+                return api.NO_VALUE
+            # re-inserting the key makes it the most recently used one
+            self._values[key] = (expires_at, value)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._values.pop(key, None)
+            while len(self._values) >= self.maxsize:
+                self._values.popitem(last=False)
+            self._values[key] = (time.time() + self.ttl, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def get_stats(self):
+        """Return the size and hit ratio of the cache."""
+        lookups = self.hits + self.misses
+        return {'size': len(self._values),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': float(self.hits) / lookups if lookups else 0.0}
+
+
 def build_cache_config():
     """Build the cache region dictionary configuration.
 
@@ -164,6 +164,31 @@ FILE_OPTIONS = {
         cfg.IntOpt('max_password_length', default=4096,
                    help='Maximum supported length for user passwords; '
                         'decrease to improve performance.'),
+        cfg.IntOpt('password_hash_pool_size', default=0,
+                   help='Maximum number of passwords hashed or checked at '
+                        'the same time in OS threads, outside of the '
+                        'eventlet event loop. Set to 0 to hash passwords in '
+                        'the request\'s green thread.'),
+        cfg.IntOpt('password_hash_pool_queue_size', default=100,
+                   help='Maximum number of passwords waiting to be hashed or '
+                        'checked when password_hash_pool_size is greater '
+                        'than 0. Further requests fail with 503 Service '
+                        'Unavailable.'),
+        cfg.IntOpt('password_hash_pool_timeout', default=10,
+                   help='Time (in seconds) a password may wait to be hashed '
+                        'or checked when password_hash_pool_size is greater '
+                        'than 0 before the request fails with 503 Service '
+                        'Unavailable.'),
+        cfg.IntOpt('verified_password_cache_size', default=0,
+                   help='Maximum number of users whose last verified '
+                        'password is remembered by each process, so that '
+                        'their next authentications with the same password '
+                        'skip the password hashing. Set to 0 to disable.'),
+        cfg.IntOpt('verified_password_cache_time', default=60,
+                   help='Time to remember a verified password (in '
+                        'seconds). A password changed through another '
+                        'process is rejected immediately, as the stored '
+                        'hash no longer matches.'),
         cfg.IntOpt('list_limit',
                    help='Maximum number of entities that will be returned in '
                         'an identity collection.'),
@@ -213,6 +238,16 @@ FILE_OPTIONS = {
                    help='Time to cache tokens (in seconds). This has no '
                         'effect unless global and token caching are '
                         'enabled.'),
+        cfg.IntOpt('local_cache_size', default=0,
+                   help='Maximum number of validated tokens kept in each '
+                        'process, in front of the cache backend. Set to 0 '
+                        'to disable. This has no effect unless global and '
+                        'token caching are enabled.'),
+        cfg.IntOpt('local_cache_time', default=5,
+                   help='Time to keep validated tokens in each process (in '
+                        'seconds). A token invalidated by another process '
+                        'may be accepted for this long, unless the revoke '
+                        'extension is enabled.'),
         cfg.BoolOpt('revoke_by_id', default=True,
                     help='Revoke token by token identifier. Setting '
                     'revoke_by_id to true enables various forms of '
@@ -241,6 +276,12 @@ FILE_OPTIONS = {
         cfg.BoolOpt('caching', default=True,
                     help='Toggle for revocation event cacheing. This has no '
                          'effect unless global caching is enabled.'),
+        cfg.IntOpt('prune_interval', default=300,
+                   help='Minimum time (in seconds) between two removals of '
+                        'expired revocation events from the backend, done '
+                        'when a new revocation event is recorded. Set to 0 '
+                        'to disable, in which case "keystone-manage '
+                        'revocation_flush" should be run periodically.'),
     ],
     'cache': [
         cfg.StrOpt('config_prefix', default='cache.keystone',
@@ -334,6 +375,27 @@ FILE_OPTIONS = {
         cfg.StrOpt('keyfile',
                    default='/etc/keystone/ssl/private/signing_key.pem',
                    help='Path of the keyfile for token signing.'),
+        cfg.StrOpt('signer',
+                   default='keystone.common.signing.backends.openssl.Signer',
+                   help='Implementation used to sign PKI and PKIZ tokens and '
+                        'the token revocation list. '
+                        '"keystone.common.signing.backends.crypto.Signer" '
+                        'signs in-process instead of running openssl for '
+                        'each token; it requires the cryptography library '
+                        'and an RSA signing key.'),
+        cfg.IntOpt('pool_size', default=0,
+                   help='Maximum number of PKI and PKIZ tokens signed at '
+                        'the same time in OS threads, outside of the '
+                        'eventlet event loop. Set to 0 to sign in the '
+                        'request\'s green thread.'),
+        cfg.IntOpt('pool_queue_size', default=100,
+                   help='Maximum number of tokens waiting to be signed when '
+                        'pool_size is greater than 0. Further token requests '
+                        'fail with 503 Service Unavailable.'),
+        cfg.IntOpt('pool_timeout', default=10,
+                   help='Time (in seconds) a token may wait to be signed '
+                        'when pool_size is greater than 0 before the request '
+                        'fails with 503 Service Unavailable.'),
         cfg.StrOpt('ca_certs',
                    default='/etc/keystone/ssl/certs/ca.pem',
                    help='Path of the CA for token signing.'),
@@ -373,6 +435,21 @@ FILE_OPTIONS = {
                    default=('keystone.credential.backends'
                             '.sql.Credential'),
                    help='Credential backend driver.'),
+        cfg.BoolOpt('caching', default=True,
+                    help='Toggle for credential caching. This has no effect '
+                         'unless global caching is enabled.'),
+        cfg.IntOpt('cache_time',
+                   help='TTL (in seconds) to cache credentials. This has no '
+                        'effect unless global caching is enabled.'),
+        cfg.IntOpt('authorization_cache_size', default=0,
+                   help='Maximum number of (user, project) pairs for which '
+                        'each process keeps the roles and the catalog '
+                        'returned by EC2 and S3 authentications. Set to 0 '
+                        'to disable.'),
+        cfg.IntOpt('authorization_cache_time', default=30,
+                   help='Time to keep the roles and the catalog of a (user, '
+                        'project) pair (in seconds). A role removed from the '
+                        'user may still be granted for this long.'),
     ],
     'oauth1': [
         cfg.StrOpt('driver',
@@ -391,11 +468,23 @@ FILE_OPTIONS = {
         cfg.StrOpt('assertion_prefix', default='',
                    help='Value to be used when filtering assertion parameters '
                         'from the environment.'),
+        cfg.IntOpt('group_cache_size', default=1000,
+                   help='Maximum number of mapped groups each process '
+                        'remembers to exist, so that federated logins do '
+                        'not look them up again. Set to 0 to disable.'),
+        cfg.IntOpt('group_cache_time', default=10,
+                   help='Time to remember that a mapped group exists (in '
+                        'seconds). A group deleted through another process '
+                        'may still be accepted for this long.'),
     ],
     'policy': [
         cfg.StrOpt('driver',
                    default='keystone.policy.backends.sql.Policy',
                    help='Policy backend driver.'),
+        cfg.IntOpt('file_check_interval', default=1,
+                   help='Minimum time, in seconds, between two checks of '
+                        'the policy file for changes. Set to 0 to check the '
+                        'file on every policy enforcement.'),
         cfg.IntOpt('list_limit',
                    help='Maximum number of entities that will be returned '
                         'in a policy collection.'),
@@ -461,6 +550,34 @@ FILE_OPTIONS = {
         cfg.BoolOpt('chase_referrals',
                     help='Override the system\'s default referral chasing '
                          'behavior for queries.'),
+        cfg.BoolOpt('use_pool', default=False,
+                    help='Keep connections to the LDAP server open and '
+                         'bound in a pool, rather than opening a new '
+                         'connection for each LDAP operation.'),
+        cfg.IntOpt('pool_size', default=10,
+                   help='Maximum number of idle connections kept in the '
+                        'pool.'),
+        cfg.IntOpt('pool_retry_max', default=3,
+                   help='Maximum number of times to retry connecting to '
+                        'the LDAP server while it is down.'),
+        cfg.FloatOpt('pool_retry_delay', default=0.1,
+                     help='Time to wait, in seconds, before retrying to '
+                          'connect to the LDAP server.'),
+        cfg.IntOpt('pool_connection_lifetime', default=600,
+                   help='Time, in seconds, a pooled connection is kept '
+                        'open. A negative value keeps connections open '
+                        'indefinitely.'),
+        cfg.BoolOpt('use_auth_pool', default=False,
+                    help='Also pool the connections used to authenticate '
+                         'users, which are bound again as each user. '
+                         'Requires use_pool.'),
+        cfg.IntOpt('auth_pool_size', default=100,
+                   help='Maximum number of idle connections kept in the '
+                        'pool of connections used to authenticate users.'),
+        cfg.IntOpt('auth_pool_connection_lifetime', default=60,
+                   help='Time, in seconds, a pooled connection used to '
+                        'authenticate users is kept open. A negative value '
+                        'keeps connections open indefinitely.'),
         cfg.StrOpt('user_tree_dn',
                    help='Search base for users.'),
         cfg.StrOpt('user_filter',
@@ -703,6 +820,16 @@ FILE_OPTIONS = {
         cfg.StrOpt('driver',
                    default='keystone.catalog.backends.sql.Catalog',
                    help='Catalog backend driver.'),
+        cfg.BoolOpt('caching', default=True,
+                    help='Toggle for catalog caching. This has no effect '
+                         'unless global caching is enabled.'),
+        cfg.IntOpt('cache_time',
+                   help='Time to trust the catalog revision shared through '
+                        'the cache (in seconds), the global expiration_time '
+                        'if unset. Catalog changes made by another process '
+                        'are seen within this time even when the cache '
+                        'backend is not shared. This has no effect unless '
+                        'global caching is enabled.'),
         cfg.IntOpt('list_limit',
                    help='Maximum number of entities that will be returned '
                         'in a catalog collection.'),
@@ -15,6 +15,8 @@
 import functools
 import uuid
 
+from six.moves import urllib
+
 from keystone.common import authorization
 from keystone.common import dependency
 from keystone.common import driver_hints
@@ -81,6 +83,14 @@ def _build_policy_check_credentials(self, action, context, kwargs):
 
     auth_context = authorization.token_to_auth_context(token_ref['token_data'])
 
+    if 'environment' in context:
+        # Keep the token for the rest of the request, as the middleware
+        # would have.
+        context['environment'][authorization.AUTH_CONTEXT_ENV] = auth_context
+        context['environment'][authorization.AUTH_TOKEN_ENV] = (
+            authorization.RequestToken(context['token_id'], token_ref,
+                                       auth_context))
+
     return auth_context
 
 
@@ -346,6 +356,7 @@ class V3Controller(wsgi.Application):
 
         if hints is not None:
             refs = cls.filter_by_attributes(refs, hints)
+            refs = cls.filter_by_marker(refs, hints)
 
         list_limited, refs = cls.limit(refs, hints)
 
@@ -358,6 +369,15 @@ class V3Controller(wsgi.Application):
             'self': cls.base_url(context, path=context['path']),
             'previous': None}
 
+        if list_limited and refs and 'id' in refs[-1]:
+            # Only the next page can be linked to, since a keyset marker
+            # cannot be walked backwards.
+            query = dict(context['query_string'] or {})
+            query['marker'] = refs[-1]['id']
+            container['links']['next'] = '%s?%s' % (
+                cls.base_url(context, path=context['path']),
+                urllib.parse.urlencode(sorted(query.items())))
+
         if list_limited:
             container['truncated'] = True
 
@@ -391,11 +411,35 @@ class V3Controller(wsgi.Application):
 
         if len(refs) > hints.limit['limit']:
             # The driver layer wasn't able to truncate it for us, so we must
-            # do it here
+            # do it here, in order of id so that the next page can start
+            # after the last entity of this one
+            if 'id' in refs[0]:
+                refs = sorted(refs, key=lambda ref: ref['id'])
             return LIMITED, refs[:hints.limit['limit']]
 
         return NOT_LIMITED, refs
 
+    @classmethod
+    def filter_by_marker(cls, refs, hints):
+        """Filters a list of references by the marker, if not done already.
+
+        Only the references with an id greater than the marker are kept, in
+        order of id. This is where the marker is applied for drivers that
+        cannot do so themselves, such as LDAP, or when some filters could not
+        be satisfied by the driver.
+
+        """
+        if hints.marker is None or hints.marker['applied']:
+            return refs
+        if refs and 'id' not in refs[0]:
+            # Entities without an id, such as role assignments, cannot be
+            # paged through.
+            return refs
+        marker = hints.marker['marker']
+        hints.set_marker(marker, applied=True)
+        return sorted([ref for ref in refs if ref['id'] > marker],
+                      key=lambda ref: ref['id'])
+
     @classmethod
     def filter_by_attributes(cls, refs, hints):
         """Filters a list of references by filter values."""
@@ -476,6 +520,10 @@ class V3Controller(wsgi.Application):
             return hints
 
         for key in query_dict:
+            # The pagination directives are not filters
+            if key in ('marker', 'limit'):
+                continue
+
             # Check if this is an exact filter
             if supported_filters is None or key in supported_filters:
                 hints.add_filter(key, query_dict[key])
@@ -511,9 +559,17 @@ class V3Controller(wsgi.Application):
                                  comparator=comparator,
                                  case_sensitive=case_sensitive)
 
-        # NOTE(henry-nash): If we were to support pagination, we would pull any
-        # pagination directives out of the query_dict here, and add them into
-        # the hints list.
+        if 'marker' in query_dict:
+            hints.set_marker(query_dict['marker'])
+        if 'limit' in query_dict:
+            try:
+                limit = int(query_dict['limit'])
+            except (TypeError, ValueError):
+                limit = 0
+            if limit < 1:
+                raise exception.ValidationError(
+                    attribute='a positive integer', target='limit')
+            hints.set_limit(limit)
         return hints
 
     def _require_matching_id(self, value, ref):
@@ -563,7 +619,7 @@ class V3Controller(wsgi.Application):
         # a v3 protected call).  However, this optimization is probably not
         # worth the duplication of state
         try:
-            token_ref = self.token_api.get_token(context['token_id'])
+            token_ref = self._get_token_ref(context)
         except exception.TokenNotFound:
             LOG.warning(_('Invalid token in _get_domain_id_for_request'))
             raise exception.Unauthorized()
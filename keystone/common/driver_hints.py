@@ -28,7 +28,9 @@ class Hints(object):
 
     A Hint object contains filters, which is a list of dicts that can be
     accessed publicly. Also it contains a dict called limit, which will
-    indicate the amount of data we want to limit our listing to.
+    indicate the amount of data we want to limit our listing to, and a dict
+    called marker, which holds the id after which the listing should start
+    (in order of id) when paging through a collection.
 
     Each filter term consists of:
 
@@ -43,6 +45,7 @@ class Hints(object):
     """
     def __init__(self):
         self.limit = None
+        self.marker = None
         self.filters = list()
 
     def add_filter(self, name, value, comparator='equals',
@@ -63,3 +66,12 @@ class Hints(object):
     def set_limit(self, limit, truncated=False):
         """Set a limit to indicate the list should be truncated."""
         self.limit = {'limit': limit, 'type': 'limit', 'truncated': truncated}
+
+    def set_marker(self, marker, applied=False):
+        """Set a marker to indicate the list should start after it.
+
+        A driver that only lists the entities with an id greater than the
+        marker, in order of id, marks the marker as applied.
+
+        """
+        self.marker = {'marker': marker, 'type': 'marker', 'applied': applied}
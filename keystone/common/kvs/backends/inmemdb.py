@@ -16,9 +16,8 @@
 Keystone In-Memory Dogpile.cache backend implementation.
 """
 
-import copy
-
 from dogpile.cache import api
+from six.moves import cPickle as pickle
 
 
 NO_VALUE = api.NO_VALUE
@@ -45,7 +44,9 @@ class MemoryBackend(api.CacheBackend):
 
     def _isolate_value(self, value):
         if value is not NO_VALUE:
-            return copy.deepcopy(value)
+            # NOTE: a pickle round trip isolates the value, as a networked
+            # backend would, several times faster than a deep copy.
+            return pickle.loads(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
         return value
 
     def get(self, key):
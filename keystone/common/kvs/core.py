@@ -280,6 +280,16 @@ class KeyValueStore(object):
             raise exception.NotFound(target=not_found)
         return values
 
+    def get_multi_or_default(self, keys, default=None):
+        """Get multiple values in a single call from the KVS backend.
+
+        Unlike get_multi, the keys that are not found do not raise NotFound,
+        `default` is returned in their place.
+        """
+        self._assert_configured()
+        values = self._region.get_multi(keys)
+        return [default if value is NO_VALUE else value for value in values]
+
     def set(self, key, value, lock=None):
         """Set a single value in the KVS backend."""
         self._assert_configured()
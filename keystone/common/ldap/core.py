@@ -13,8 +13,10 @@
 # under the License.
 
 import abc
+import collections
 import os.path
 import re
+import time
 
 import codecs
 import ldap
@@ -791,6 +793,228 @@ class KeystoneLDAPHandler(LDAPHandler):
         return self.conn.delete_ext_s(dn_utf8, serverctrls, clientctrls)
 
 
+class ConnectionPool(object):
+    """Pool of idle LDAP connections to a server, bound as the same user.
+
+    Connections are created on demand by the connector, so the pool never
+    blocks; at most ``size`` of them are kept once released, each for no
+    more than ``lifetime`` seconds (a negative lifetime never expires them).
+    The connector is retried up to ``retry_max`` times, ``retry_delay``
+    seconds apart, while the server is down.
+
+    The ``stats`` count the connections reused (hits), created (misses),
+    closed rather than kept (discarded) and the retries to connect.
+
+    """
+
+    def __init__(self, connector, size, lifetime, retry_max, retry_delay):
+        self.connector = connector
+        self.size = size
+        self.lifetime = lifetime
+        self.retry_max = retry_max
+        self.retry_delay = retry_delay
+        self._idle = collections.deque()
+        self.stats = {'hits': 0, 'misses': 0, 'discarded': 0, 'retries': 0}
+
+    def _expired(self, created_at):
+        return self.lifetime >= 0 and time.time() - created_at >= self.lifetime
+
+    def connect(self):
+        """Create a new connection, retrying while the server is down."""
+        attempt = 0
+        while True:
+            try:
+                return self.connector()
+            except ldap.SERVER_DOWN:
+                if attempt >= self.retry_max:
+                    raise
+                attempt += 1
+                self.stats['retries'] += 1
+                LOG.debug('LDAP server down, retrying to connect (%d/%d)',
+                          attempt, self.retry_max)
+                time.sleep(self.retry_delay)
+
+    def acquire(self):
+        """Return a (creation time, connection) pair for exclusive use."""
+        while self._idle:
+            created_at, conn = self._idle.pop()
+            if not self._expired(created_at):
+                self.stats['hits'] += 1
+                return created_at, conn
+            self.discard(conn)
+        self.stats['misses'] += 1
+        return time.time(), self.connect()
+
+    def release(self, created_at, conn):
+        """Give a connection acquired from the pool back to it."""
+        if len(self._idle) < self.size and not self._expired(created_at):
+            self._idle.append((created_at, conn))
+        else:
+            self.discard(conn)
+
+    def discard(self, conn):
+        """Close a connection rather than keeping it in the pool."""
+        self.stats['discarded'] += 1
+        try:
+            conn.unbind_s()
+        except ldap.LDAPError:
+            pass
+
+
+_POOLS = {}
+
+
+def get_pool_stats():
+    """Return the statistics of the connection pools of this process.
+
+    The statistics are keyed by the URL of the server and by the user the
+    pooled connections are bound as, None for the pool of connections used
+    to authenticate users.
+
+    """
+    return dict(((key[0], key[1]), dict(pool.stats))
+                for key, pool in six.iteritems(_POOLS))
+
+
+class PooledLDAPHandler(LDAPHandler):
+    """Implementation of the LDAPHandler interface which pools connections.
+
+    Connections are taken from a pool on bind, or on the first operation
+    for an anonymous connection, and are given back to it on unbind instead
+    of being closed. A connection found to be down while searching is
+    discarded and the search retried on a new connection.
+
+    With use_auth_pool, the handler serves the binds that authenticate
+    users: the connections of the pool are bound again as each user, which
+    avoids a new TCP (and TLS) handshake per authentication, and are never
+    used for anything but binding.
+
+    """
+
+    def __init__(self, conn=None, size=10, lifetime=600, retry_max=3,
+                 retry_delay=0.1, use_auth_pool=False):
+        super(PooledLDAPHandler, self).__init__(conn=conn)
+        self.size = size
+        self.lifetime = lifetime
+        self.retry_max = retry_max
+        self.retry_delay = retry_delay
+        self.use_auth_pool = use_auth_pool
+        self._pool = None
+        self._created_at = None
+
+    def connect(self, url, page_size=0, alias_dereferencing=None,
+                use_tls=False, tls_cacertfile=None, tls_cacertdir=None,
+                tls_req_cert='demand', chase_referrals=None, debug_level=None):
+        # The connection itself is deferred until it is known which pool it
+        # comes from.
+        self._url = url
+        self._connect_args = (page_size, alias_dereferencing, use_tls,
+                              tls_cacertfile, tls_cacertdir, tls_req_cert,
+                              chase_referrals, debug_level)
+
+    def _get_pool(self, who=None, cred=None):
+        if self.use_auth_pool:
+            who = cred = None
+        key = (self._url, who, cred, self.use_auth_pool) + self._connect_args
+
+        pool = _POOLS.get(key)
+        if pool is None:
+            def connector():
+                conn = _get_connection(self._url)
+                conn.connect(self._url, *self._connect_args)
+                if who and cred:
+                    conn.simple_bind_s(who, cred)
+                return conn
+
+            pool = ConnectionPool(connector, self.size, self.lifetime,
+                                  self.retry_max, self.retry_delay)
+            _POOLS[key] = pool
+        return pool
+
+    def _acquire(self, who=None, cred=None):
+        self._pool = self._get_pool(who, cred)
+        self._created_at, self.conn = self._pool.acquire()
+
+    def _get_conn(self):
+        if self.conn is None:
+            # An anonymous connection
+            self._acquire()
+        return self.conn
+
+    def set_option(self, option, invalue):
+        return self._get_conn().set_option(option, invalue)
+
+    def get_option(self, option):
+        return self._get_conn().get_option(option)
+
+    def simple_bind_s(self, who='', cred='',
+                      serverctrls=None, clientctrls=None):
+        if self.conn is not None:
+            self.unbind_s()
+        self._acquire(who, cred)
+        if self.use_auth_pool:
+            try:
+                return self.conn.simple_bind_s(who, cred,
+                                               serverctrls, clientctrls)
+            except ldap.SERVER_DOWN:
+                self._discard()
+                raise
+            except Exception:
+                # The connection is still fit to be bound again, but the
+                # caller does not get it back to unbind it.
+                self.unbind_s()
+                raise
+
+    def unbind_s(self):
+        if self.conn is not None:
+            self._pool.release(self._created_at, self.conn)
+            self.conn = None
+
+    def _discard(self):
+        self._pool.discard(self.conn)
+        self.conn = None
+
+    def add_s(self, dn, modlist):
+        return self._get_conn().add_s(dn, modlist)
+
+    def search_s(self, base, scope,
+                 filterstr='(objectClass=*)', attrlist=None, attrsonly=0):
+        conn = self._get_conn()
+        try:
+            return conn.search_s(base, scope, filterstr, attrlist, attrsonly)
+        except ldap.SERVER_DOWN:
+            # The pooled connection may have been closed by the server, or
+            # the server restarted since, so search again on a new one.
+            pool = self._pool
+            self._discard()
+            self._created_at, self.conn = time.time(), pool.connect()
+            return self.conn.search_s(base, scope, filterstr, attrlist,
+                                      attrsonly)
+
+    def search_ext(self, base, scope,
+                   filterstr='(objectClass=*)', attrlist=None, attrsonly=0,
+                   serverctrls=None, clientctrls=None,
+                   timeout=-1, sizelimit=0):
+        return self._get_conn().search_ext(base, scope,
+                                           filterstr, attrlist, attrsonly,
+                                           serverctrls, clientctrls,
+                                           timeout, sizelimit)
+
+    def result3(self, msgid=ldap.RES_ANY, all=1, timeout=None,
+                resp_ctrl_classes=None):
+        return self._get_conn().result3(msgid, all, timeout,
+                                        resp_ctrl_classes)
+
+    def modify_s(self, dn, modlist):
+        return self._get_conn().modify_s(dn, modlist)
+
+    def delete_s(self, dn):
+        return self._get_conn().delete_s(dn)
+
+    def delete_ext_s(self, dn, serverctrls=None, clientctrls=None):
+        return self._get_conn().delete_ext_s(dn, serverctrls, clientctrls)
+
+
 _HANDLERS = {}
 
 
@@ -853,6 +1077,15 @@ class BaseLdap(object):
         self.attribute_mapping = {}
         self.chase_referrals = conf.ldap.chase_referrals
         self.debug_level = conf.ldap.debug_level
+        self.use_pool = conf.ldap.use_pool
+        self.pool_size = conf.ldap.pool_size
+        self.pool_retry_max = conf.ldap.pool_retry_max
+        self.pool_retry_delay = conf.ldap.pool_retry_delay
+        self.pool_connection_lifetime = conf.ldap.pool_connection_lifetime
+        self.use_auth_pool = conf.ldap.use_auth_pool
+        self.auth_pool_size = conf.ldap.auth_pool_size
+        self.auth_pool_connection_lifetime = (
+            conf.ldap.auth_pool_connection_lifetime)
 
         if self.options_name is not None:
             self.suffix = conf.ldap.suffix
@@ -939,7 +1172,23 @@ class BaseLdap(object):
                 and is_dn_equal(member_dn, self.dumb_member))
 
     def get_connection(self, user=None, password=None):
-        conn = _get_connection(self.LDAP_URL)
+        use_auth_pool = user is not None
+        if self.use_pool and (self.use_auth_pool or not use_auth_pool):
+            if use_auth_pool:
+                conn = PooledLDAPHandler(
+                    size=self.auth_pool_size,
+                    lifetime=self.auth_pool_connection_lifetime,
+                    retry_max=self.pool_retry_max,
+                    retry_delay=self.pool_retry_delay,
+                    use_auth_pool=True)
+            else:
+                conn = PooledLDAPHandler(
+                    size=self.pool_size,
+                    lifetime=self.pool_connection_lifetime,
+                    retry_max=self.pool_retry_max,
+                    retry_delay=self.pool_retry_delay)
+        else:
+            conn = _get_connection(self.LDAP_URL)
 
         conn = KeystoneLDAPHandler(conn=conn)
 
@@ -1161,6 +1410,21 @@ class BaseLdap(object):
         return [self._ldap_res_to_model(x)
                 for x in self._ldap_get_all(ldap_filter)]
 
+    def get_all_by_ids(self, object_ids):
+        """Return the objects with any of the given ids, in a single search.
+
+        The ids of the objects that do not exist are ignored.
+
+        """
+        if not object_ids:
+            return []
+        query = u'(|%s)' % u''.join(
+            u'(%s=%s)' % (self.id_attr,
+                          ldap.filter.escape_filter_chars(
+                              six.text_type(object_id)))
+            for object_id in set(object_ids))
+        return self.get_all(query + (self.ldap_filter or u''))
+
     def update(self, object_id, values, old_obj=None):
         if old_obj is None:
             old_obj = self.get(object_id)
@@ -32,7 +32,8 @@ def response_truncated(f):
 
     A _get_list_limit() method is required to be present in the object class
     hierarchy, which returns the limit for this backend to which we will
-    truncate.
+    truncate. A limit already present in the hints, as requested by an API
+    client, is honored if it is lower.
 
     If a hints list is not provided in the arguments of the wrapped call then
     any limits set in the config file are ignored.  This allows internal use
@@ -46,9 +47,15 @@ def response_truncated(f):
         if kwargs.get('hints') is None:
             return f(self, *args, **kwargs)
 
+        hints = kwargs['hints']
         list_limit = self.driver._get_list_limit()
+        if hints.limit:
+            # A limit was requested by the caller, which may only lower the
+            # one configured.
+            list_limit = min(list_limit or hints.limit['limit'],
+                             hints.limit['limit'])
         if list_limit:
-            kwargs['hints'].set_limit(list_limit)
+            hints.set_limit(list_limit)
         return f(self, *args, **kwargs)
     return wrapper
 
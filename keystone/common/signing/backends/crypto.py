@@ -0,0 +1,149 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""In-process CMS signer.
+
+The signing key and certificate are loaded once, and each document is
+signed without forking openssl. The CMS SignedData structure is assembled
+here so that the result is byte for byte what
+``openssl cms -sign -nosmimecap -nodetach -nocerts -noattr`` produces for an
+RSA key: with no signed attributes the RSA PKCS#1 v1.5 signature only
+depends on the content, so the whole document is deterministic.
+
+"""
+
+import base64
+import zlib
+
+from cryptography.hazmat import backends
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives import serialization
+from cryptography import x509
+from keystoneclient.common import cms
+import six
+
+from keystone.common.signing import core
+from keystone.openstack.common.gettextutils import _
+
+
+_SEQUENCE = 0x30
+_SET = 0x31
+_INTEGER = 0x02
+_OCTET_STRING = 0x04
+_CONTEXT_0 = 0xa0
+
+# DER encoded object identifiers
+_OID_SIGNED_DATA = b'\x06\x09\x2a\x86\x48\x86\xf7\x0d\x01\x07\x02'
+_OID_DATA = b'\x06\x09\x2a\x86\x48\x86\xf7\x0d\x01\x07\x01'
+_OID_SHA256 = b'\x06\x09\x60\x86\x48\x01\x65\x03\x04\x02\x01'
+_OID_RSA_ENCRYPTION = b'\x06\x09\x2a\x86\x48\x86\xf7\x0d\x01\x01\x01'
+_NULL = b'\x05\x00'
+
+_PEM_HEADER = '-----BEGIN CMS-----\n'
+_PEM_FOOTER = '-----END CMS-----\n'
+_PEM_LINE_LENGTH = 64
+
+# zlib compression level used by keystoneclient for PKIZ tokens
+_PKIZ_COMPRESSION_LEVEL = 6
+
+
+def _der_length(length):
+    if length < 0x80:
+        return six.int2byte(length)
+    encoded = b''
+    while length:
+        encoded = six.int2byte(length & 0xff) + encoded
+        length >>= 8
+    return six.int2byte(0x80 | len(encoded)) + encoded
+
+
+def _der(tag, *contents):
+    content = b''.join(contents)
+    return six.int2byte(tag) + _der_length(len(content)) + content
+
+
+def _der_integer(value):
+    encoded = b''
+    while True:
+        encoded = six.int2byte(value & 0xff) + encoded
+        value >>= 8
+        if not value and not six.indexbytes(encoded, 0) & 0x80:
+            break
+    return _der(_INTEGER, encoded)
+
+
+class Signer(core.Signer):
+    """Sign in-process with the cryptography library."""
+
+    def __init__(self, certfile, keyfile):
+        super(Signer, self).__init__(certfile, keyfile)
+        backend = backends.default_backend()
+        with open(certfile, 'rb') as f:
+            cert = x509.load_pem_x509_certificate(f.read(), backend)
+        with open(keyfile, 'rb') as f:
+            self._key = serialization.load_pem_private_key(f.read(), None,
+                                                           backend)
+        if not isinstance(self._key, rsa.RSAPrivateKey):
+            raise ValueError(_('Only RSA signing keys can be used to sign '
+                               'in-process.'))
+
+        # Everything but the content and the signature is the same for every
+        # document, so it is encoded once.
+        self._version = _der_integer(1)
+        self._digest_algorithms = _der(_SET, _der(_SEQUENCE, _OID_SHA256))
+        self._signer_identifier = _der(
+            _SEQUENCE,
+            cert.issuer.public_bytes(backend),
+            _der_integer(cert.serial_number))
+        self._digest_algorithm = _der(_SEQUENCE, _OID_SHA256)
+        self._signature_algorithm = _der(_SEQUENCE, _OID_RSA_ENCRYPTION,
+                                         _NULL)
+
+    def sign_der(self, data):
+        """Sign data and return the DER encoded CMS document."""
+        if isinstance(data, six.text_type):
+            data = data.encode('utf-8')
+        signature = self._key.sign(data, padding.PKCS1v15(), hashes.SHA256())
+        signer_info = _der(_SEQUENCE,
+                           self._version,
+                           self._signer_identifier,
+                           self._digest_algorithm,
+                           self._signature_algorithm,
+                           _der(_OCTET_STRING, signature))
+        content_info = _der(_SEQUENCE,
+                            _OID_DATA,
+                            _der(_CONTEXT_0, _der(_OCTET_STRING, data)))
+        signed_data = _der(_SEQUENCE,
+                           self._version,
+                           self._digest_algorithms,
+                           content_info,
+                           _der(_SET, signer_info))
+        return _der(_SEQUENCE,
+                    _OID_SIGNED_DATA,
+                    _der(_CONTEXT_0, signed_data))
+
+    def sign_text(self, text):
+        encoded = base64.b64encode(self.sign_der(text)).decode('ascii')
+        lines = [encoded[i:i + _PEM_LINE_LENGTH]
+                 for i in range(0, len(encoded), _PEM_LINE_LENGTH)]
+        return _PEM_HEADER + '\n'.join(lines) + '\n' + _PEM_FOOTER
+
+    def sign_token(self, text):
+        return cms.cms_to_token(self.sign_text(text))
+
+    def sign_pkiz(self, text):
+        compressed = zlib.compress(self.sign_der(text),
+                                   _PKIZ_COMPRESSION_LEVEL)
+        return (cms.PKIZ_PREFIX +
+                base64.urlsafe_b64encode(compressed).decode('utf-8'))
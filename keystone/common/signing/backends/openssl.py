@@ -0,0 +1,28 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from keystoneclient.common import cms
+
+from keystone.common.signing import core
+
+
+class Signer(core.Signer):
+    """Sign by running ``openssl cms`` in a subprocess for each document."""
+
+    def sign_text(self, text):
+        return cms.cms_sign_text(text, self.certfile, self.keyfile)
+
+    def sign_token(self, text):
+        return cms.cms_sign_token(text, self.certfile, self.keyfile)
+
+    def sign_pkiz(self, text):
+        return cms.pkiz_sign(text, self.certfile, self.keyfile)
@@ -0,0 +1,121 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""CMS signing of tokens and of the token revocation list."""
+
+import abc
+
+import six
+
+from keystone.common import utils
+from keystone import config
+from keystone import exception
+from keystone.openstack.common.gettextutils import _
+from keystone.openstack.common import importutils
+from keystone.openstack.common import log
+
+
+CONF = config.CONF
+LOG = log.getLogger(__name__)
+
+_DEFAULT_SIGNER = 'keystone.common.signing.backends.openssl.Signer'
+
+# (signer, certfile, keyfile) -> Signer, one per worker process
+_SIGNERS = {}
+
+# (pool_size, pool_queue_size, pool_timeout) -> SigningPool
+_POOLS = {}
+
+
+def get_signer():
+    """Return the configured signer, loading it once per process.
+
+    If the configured signer cannot be loaded, for example because its
+    crypto library is not installed or the key type is not supported, the
+    openssl subprocess signer is used instead.
+
+    """
+    key = (CONF.signing.signer, CONF.signing.certfile, CONF.signing.keyfile)
+    signer = _SIGNERS.get(key)
+    if signer is None:
+        try:
+            signer = importutils.import_object(CONF.signing.signer,
+                                               CONF.signing.certfile,
+                                               CONF.signing.keyfile)
+        except Exception:
+            if CONF.signing.signer == _DEFAULT_SIGNER:
+                raise
+            LOG.exception(_('Unable to load the %s token signer, falling '
+                            'back to openssl.'), CONF.signing.signer)
+            signer = importutils.import_object(_DEFAULT_SIGNER,
+                                               CONF.signing.certfile,
+                                               CONF.signing.keyfile)
+        _SIGNERS[key] = signer
+    return signer
+
+
+def get_signing_pool():
+    """Return the signing pool of this process."""
+    key = (CONF.signing.pool_size, CONF.signing.pool_queue_size,
+           CONF.signing.pool_timeout)
+    pool = _POOLS.get(key)
+    if pool is None:
+        pool = SigningPool(*key)
+        _POOLS[key] = pool
+    return pool
+
+
+class SigningPool(utils.ThreadPool):
+    """Bounded pool of OS threads signing tokens.
+
+    Signing is CPU bound, or forks openssl, and blocks every other green
+    thread of the process while it runs in the event loop. See
+    :class:`keystone.common.utils.ThreadPool`.
+
+    """
+
+    def __init__(self, size, queue_size, timeout):
+        super(SigningPool, self).__init__(size, queue_size, timeout,
+                                          name='Signing')
+
+
+@six.add_metaclass(abc.ABCMeta)
+class Signer(object):
+    """Interface for producing CMS signed data.
+
+    The output of every signer must be identical to the output of the
+    keystoneclient ``cms`` functions, which run ``openssl cms -sign``.
+
+    """
+
+    def __init__(self, certfile, keyfile):
+        self.certfile = certfile
+        self.keyfile = keyfile
+
+    @abc.abstractmethod
+    def sign_text(self, text):
+        """Sign text, as keystoneclient.common.cms.cms_sign_text.
+
+        :returns: the PEM encoded CMS document
+
+        """
+        raise exception.NotImplemented()
+
+    @abc.abstractmethod
+    def sign_token(self, text):
+        """Sign a PKI token, as keystoneclient.common.cms.cms_sign_token."""
+        raise exception.NotImplemented()
+
+    @abc.abstractmethod
+    def sign_pkiz(self, text):
+        """Sign a PKIZ token, as keystoneclient.common.cms.pkiz_sign."""
+        raise exception.NotImplemented()
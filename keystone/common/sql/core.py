@@ -18,8 +18,10 @@ Before using this module, call initialize(). This has to be done before
 CONF() because it sets up configuration options.
 
 """
+import base64
 import contextlib
 import functools
+import zlib
 
 from oslo.config import cfg
 from oslo.db import exception as db_exception
@@ -118,6 +120,29 @@ class JsonBlob(sql_types.TypeDecorator):
         return jsonutils.loads(value)
 
 
+class CompressedJsonBlob(JsonBlob):
+    """A JsonBlob stored compressed.
+
+    The JSON text is compressed and base64 encoded, behind a prefix which
+    cannot start a JSON text, so that values stored by a JsonBlob column are
+    still read and the column type can be changed without converting them.
+
+    """
+
+    prefix = 'zlib:'
+
+    def process_bind_param(self, value, dialect):
+        data = jsonutils.dumps(value).encode('utf-8')
+        return self.prefix + base64.b64encode(zlib.compress(data)).decode(
+            'ascii')
+
+    def process_result_value(self, value, dialect):
+        if value is not None and value.startswith(self.prefix):
+            data = base64.b64decode(value[len(self.prefix):])
+            value = zlib.decompress(data).decode('utf-8')
+        return jsonutils.loads(value)
+
+
 class DictBase(models.ModelBase):
     attributes = []
 
@@ -330,19 +355,27 @@ def _filter(model, query, hints):
     return query
 
 
-def _limit(query, hints):
-    """Applies a limit to a query.
+def _limit(model, query, hints):
+    """Applies a marker and a limit to a query.
+
+    The marker is applied as a keyset, i.e. only the entities with an id
+    greater than the marker are listed, ordered by id, so that paging through
+    a collection stays cheap however far into it the marker is.
 
+    :param model: table model
     :param query: query to apply filters to
     :param hints: contains the list of filters and limit details.
 
     :returns updated query
 
     """
-    # NOTE(henry-nash): If we were to implement pagination, then we
-    # we would expand this method to support pagination and limiting.
+    if hints.marker:
+        query = query.filter(model.id > hints.marker['marker'])
+        hints.set_marker(hints.marker['marker'], applied=True)
 
     # If we satisfied all the filters, set an upper limit if supplied
+    if hints.limit or hints.marker:
+        query = query.order_by(model.id)
     if hints.limit:
         query = query.limit(hints.limit['limit'])
     return query
@@ -376,7 +409,7 @@ def filter_limit_query(model, query, hints):
     # as well.
 
     if not hints.filters:
-        return _limit(query, hints)
+        return _limit(model, query, hints)
     else:
         return query
 
@@ -0,0 +1,35 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sqlalchemy as sql
+
+
+ASSIGNMENT_TABLE = 'assignment'
+INDEX_NAME = 'ix_assignment_target_id'
+
+
+def upgrade(migrate_engine):
+    meta = sql.MetaData()
+    meta.bind = migrate_engine
+
+    # NOTE: the primary key (type, actor_id, target_id, role_id) already
+    # serves lookups by actor, so only lookups by target need a new index.
+    assignment = sql.Table(ASSIGNMENT_TABLE, meta, autoload=True)
+    sql.Index(INDEX_NAME, assignment.c.target_id).create(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    meta = sql.MetaData()
+    meta.bind = migrate_engine
+
+    assignment = sql.Table(ASSIGNMENT_TABLE, meta, autoload=True)
+    sql.Index(INDEX_NAME, assignment.c.target_id).drop(migrate_engine)
@@ -0,0 +1,102 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Adds indexed scope columns to the `token` table.
+
+The project, domain and OAuth consumer of a token were only stored in the
+`extra` JSON. To upgrade, the `project_id`, `domain_id` and `consumer_id`
+columns are added and filled in for the tokens still valid, and `trust_id`
+and the new columns are indexed.
+
+The `extra` column is now written compressed by the token backend, which
+still reads the plain JSON rows. To downgrade, the compressed rows are
+written back as plain JSON before the columns are dropped.
+
+"""
+
+import datetime
+
+import sqlalchemy as sql
+
+from keystone.common import sql as ks_sql
+from keystone.openstack.common import jsonutils
+
+
+TOKEN_TABLE = 'token'
+SCOPE_COLUMNS = ('project_id', 'domain_id', 'consumer_id')
+INDEXED_COLUMNS = ('trust_id',) + SCOPE_COLUMNS
+
+
+def _index_name(column_name):
+    return 'ix_token_%s' % column_name
+
+
+def _scope_values(extra):
+    token_ref = jsonutils.loads(extra)
+    values = dict((name, None) for name in SCOPE_COLUMNS)
+    if token_ref.get('tenant'):
+        values['project_id'] = token_ref['tenant'].get('id')
+    token_data = token_ref.get('token_data') or {}
+    if 'token' in token_data:
+        values['domain_id'] = token_data['token'].get('domain', {}).get('id')
+        values['consumer_id'] = token_data['token'].get(
+            'OS-OAUTH1', {}).get('consumer_id')
+    return values
+
+
+def upgrade(migrate_engine):
+    meta = sql.MetaData()
+    meta.bind = migrate_engine
+
+    token_table = sql.Table(TOKEN_TABLE, meta, autoload=True)
+    for name in SCOPE_COLUMNS:
+        token_table.create_column(sql.Column(name, sql.String(64)))
+    for name in INDEXED_COLUMNS:
+        sql.Index(_index_name(name),
+                  token_table.c[name]).create(migrate_engine)
+
+    # NOTE: expired and revoked tokens are never looked up by scope again,
+    # so only the tokens still valid are filled in.
+    query = sql.select([token_table.c.id, token_table.c.extra,
+                        token_table.c.valid]).where(
+        token_table.c.expires > datetime.datetime.utcnow())
+    for token in list(migrate_engine.execute(query)):
+        if not token.valid:
+            continue
+        values = _scope_values(token.extra)
+        if not any(values.values()):
+            continue
+        update = token_table.update().where(
+            token_table.c.id == token.id).values(values)
+        migrate_engine.execute(update)
+
+
+def downgrade(migrate_engine):
+    meta = sql.MetaData()
+    meta.bind = migrate_engine
+
+    token_table = sql.Table(TOKEN_TABLE, meta, autoload=True)
+    blob = ks_sql.CompressedJsonBlob()
+    query = sql.select([token_table.c.id, token_table.c.extra]).where(
+        token_table.c.extra.like(blob.prefix + '%'))
+    for token in list(migrate_engine.execute(query)):
+        extra = jsonutils.dumps(blob.process_result_value(token.extra,
+                                                          migrate_engine))
+        update = token_table.update().where(
+            token_table.c.id == token.id).values(extra=extra)
+        migrate_engine.execute(update)
+
+    for name in INDEXED_COLUMNS:
+        sql.Index(_index_name(name),
+                  token_table.c[name]).drop(migrate_engine)
+    for name in SCOPE_COLUMNS:
+        token_table.drop_column(name)
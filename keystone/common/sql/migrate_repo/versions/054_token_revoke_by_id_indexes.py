@@ -0,0 +1,44 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sqlalchemy as sql
+
+
+TOKEN_TABLE = 'token'
+TRUST_ID_INDEX = 'ix_token_trust_id'
+# NOTE: the tokens of a user or a trust are looked up, and revoked, among
+# the valid tokens which have not expired yet.
+VALID_TOKEN_INDEXES = {
+    'ix_token_user_id_valid_expires': ('user_id', 'valid', 'expires'),
+    'ix_token_trust_id_valid_expires': ('trust_id', 'valid', 'expires'),
+}
+
+
+def upgrade(migrate_engine):
+    meta = sql.MetaData()
+    meta.bind = migrate_engine
+
+    token = sql.Table(TOKEN_TABLE, meta, autoload=True)
+    for name, columns in VALID_TOKEN_INDEXES.items():
+        sql.Index(name, *[token.c[c] for c in columns]).create(migrate_engine)
+    # the (trust_id, valid, expires) index serves the lookups by trust_id
+    sql.Index(TRUST_ID_INDEX, token.c.trust_id).drop(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    meta = sql.MetaData()
+    meta.bind = migrate_engine
+
+    token = sql.Table(TOKEN_TABLE, meta, autoload=True)
+    sql.Index(TRUST_ID_INDEX, token.c.trust_id).create(migrate_engine)
+    for name, columns in VALID_TOKEN_INDEXES.items():
+        sql.Index(name, *[token.c[c] for c in columns]).drop(migrate_engine)
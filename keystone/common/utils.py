@@ -22,6 +22,7 @@ import grp
 import hashlib
 import os
 import pwd
+import time
 
 import passlib.hash
 import six
@@ -40,6 +41,9 @@ CONF = config.CONF
 
 LOG = log.getLogger(__name__)
 
+# (pool_size, pool_queue_size, pool_timeout) -> ThreadPool
+_PASSWORD_POOLS = {}
+
 
 def flatten_dict(d, parent_key=''):
     """Flatten a nested dictionary
@@ -110,6 +114,103 @@ def hash_access_key(access):
     return hash_.hexdigest()
 
 
+class ThreadPool(object):
+    """Bounded pool of OS threads running CPU bound functions.
+
+    A CPU bound function blocks every other green thread of the process
+    while it runs in the event loop. With a ``size`` greater than 0, the
+    functions are run by eventlet's pool of OS threads, at most ``size`` at a
+    time. At most ``queue_size`` calls wait for a free slot; a call that
+    finds the queue full, or that waits more than ``timeout`` seconds, fails
+    with 503 Service Unavailable.
+
+    """
+
+    def __init__(self, size, queue_size, timeout, name='call'):
+        self.size = size
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.name = name
+        self.stats = {'executed': 0,
+                      'rejected': 0,
+                      'timed_out': 0,
+                      'queue_depth': 0,
+                      'max_queue_depth': 0,
+                      'wait_time': 0.0,
+                      'execute_time': 0.0}
+        if size > 0:
+            # NOTE: eventlet is imported here rather than at the top of the
+            # module since it must not be imported before
+            # keystone.common.environment has configured it.
+            from eventlet import semaphore
+            from eventlet import timeout as eventlet_timeout
+            from eventlet import tpool
+            self._semaphore = semaphore.Semaphore(size)
+            self._timeout = eventlet_timeout.Timeout
+            self._tpool = tpool
+
+    def _acquire(self):
+        stats = self.stats
+        if (self._semaphore.locked() and
+                stats['queue_depth'] >= self.queue_size):
+            stats['rejected'] += 1
+            raise exception.ServiceUnavailable()
+        stats['queue_depth'] += 1
+        stats['max_queue_depth'] = max(stats['max_queue_depth'],
+                                       stats['queue_depth'])
+        acquired = False
+        try:
+            with self._timeout(self.timeout, False):
+                acquired = self._semaphore.acquire()
+        finally:
+            stats['queue_depth'] -= 1
+        if not acquired:
+            stats['timed_out'] += 1
+            raise exception.ServiceUnavailable()
+
+    def execute(self, func, *args, **kwargs):
+        """Call func with args and kwargs in the pool and return its result.
+
+        :raises keystone.exception.ServiceUnavailable: if the pool is
+            saturated
+
+        """
+        waited = 0.0
+        if self.size <= 0:
+            started = time.time()
+            result = func(*args, **kwargs)
+        else:
+            queued = time.time()
+            self._acquire()
+            started = time.time()
+            waited = started - queued
+            self.stats['wait_time'] += waited
+            try:
+                result = self._tpool.execute(func, *args, **kwargs)
+            finally:
+                self._semaphore.release()
+        elapsed = time.time() - started
+        self.stats['executed'] += 1
+        self.stats['execute_time'] += elapsed
+        LOG.debug('%(name)s took %(elapsed).3fs after waiting %(waited).3fs, '
+                  '%(queue_depth)d calls waiting.',
+                  {'name': self.name, 'elapsed': elapsed, 'waited': waited,
+                   'queue_depth': self.stats['queue_depth']})
+        return result
+
+
+def get_password_pool():
+    """Return the pool hashing and checking passwords in this process."""
+    key = (CONF.identity.password_hash_pool_size,
+           CONF.identity.password_hash_pool_queue_size,
+           CONF.identity.password_hash_pool_timeout)
+    pool = _PASSWORD_POOLS.get(key)
+    if pool is None:
+        pool = ThreadPool(*key, name='Password hashing')
+        _PASSWORD_POOLS[key] = pool
+    return pool
+
+
 def hash_user_password(user):
     """Hash a user dict's password without modifying the passed-in dict."""
     password = user.get('password')
@@ -122,8 +223,9 @@ def hash_user_password(user):
 def hash_password(password):
     """Hash a password. Hard."""
     password_utf8 = verify_length_and_trunc_password(password).encode('utf-8')
-    return passlib.hash.sha512_crypt.encrypt(
-        password_utf8, rounds=CONF.crypt_strength)
+    return get_password_pool().execute(passlib.hash.sha512_crypt.encrypt,
+                                       password_utf8,
+                                       rounds=CONF.crypt_strength)
 
 
 def check_password(password, hashed):
@@ -136,7 +238,8 @@ def check_password(password, hashed):
     if password is None or hashed is None:
         return False
     password_utf8 = verify_length_and_trunc_password(password).encode('utf-8')
-    return passlib.hash.sha512_crypt.verify(password_utf8, hashed)
+    return get_password_pool().execute(passlib.hash.sha512_crypt.verify,
+                                       password_utf8, hashed)
 
 
 def attr_as_boolean(val_attr):
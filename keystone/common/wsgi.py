@@ -23,6 +23,7 @@ import six
 import webob.dec
 import webob.exc
 
+from keystone.common import authorization
 from keystone.common import config
 from keystone.common import dependency
 from keystone.common import utils
@@ -253,14 +254,35 @@ class Application(BaseApplication):
         return dict([(self._normalize_arg(k), v)
                      for (k, v) in six.iteritems(d)])
 
+    def _get_token_ref(self, context):
+        """Return the reference of the token the request was made with.
+
+        The token already validated by the middleware is used if there is
+        one, rather than loading it again.
+
+        :raises: keystone.exception.TokenNotFound
+
+        """
+        request_token = authorization.get_request_token(context)
+        if request_token is not None:
+            return request_token.token_ref
+        return self.token_api.get_token(context['token_id'])
+
     def assert_admin(self, context):
         if not context['is_admin']:
-            try:
-                user_token_ref = self.token_api.get_token(context['token_id'])
-            except exception.TokenNotFound as e:
-                raise exception.Unauthorized(e)
+            request_token = authorization.get_request_token(context)
+            if request_token is not None:
+                # The middleware has already validated the token, and its
+                # bind.
+                user_token_ref = request_token.token_ref
+            else:
+                try:
+                    user_token_ref = self.token_api.get_token(
+                        context['token_id'])
+                except exception.TokenNotFound as e:
+                    raise exception.Unauthorized(e)
 
-            validate_token_bind(context, user_token_ref)
+                validate_token_bind(context, user_token_ref)
             creds = user_token_ref['metadata'].copy()
 
             try:
@@ -321,7 +343,7 @@ class Application(BaseApplication):
             return None
 
         try:
-            token_ref = self.token_api.get_token(context['token_id'])
+            token_ref = self._get_token_ref(context)
         except exception.TokenNotFound:
             LOG.warning(_('Invalid token in _get_trust_id_for_request'))
             raise exception.Unauthorized()
@@ -626,6 +648,25 @@ def render_response(body=None, status=None, headers=None):
                           headerlist=headers)
 
 
+def render_entity_response(context, body, etag):
+    """Forms a WSGI response for an entity with the given version.
+
+    The version is sent as the ETag header. If the request's If-None-Match
+    header already lists it, a 304 Not Modified response without a body is
+    returned instead.
+
+    """
+    etag = '"%s"' % etag
+    headers = [('ETag', etag)]
+    if_none_match = context.get('headers', {}).get('If-None-Match')
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        if etag in tags or '*' in tags:
+            return render_response(status=(304, 'Not Modified'),
+                                   headers=headers)
+    return render_response(body=body, headers=headers)
+
+
 def render_exception(error, context=None, request=None, user_locale=None):
     """Forms a WSGI response based on the current error."""
 
@@ -35,14 +35,17 @@ Glance to list images needed to perform the requested task.
 import abc
 import uuid
 
+from dogpile.cache import api
 import six
 
 from keystoneclient.contrib.ec2 import utils as ec2_utils
 
+from keystone.catalog import core as catalog_core
 from keystone.common import controller
 from keystone.common import dependency
 from keystone.common import utils
 from keystone.common import wsgi
+from keystone import credential
 from keystone import exception
 from keystone.openstack.common.gettextutils import _
 from keystone.openstack.common import jsonutils
@@ -114,29 +117,55 @@ class Ec2ControllerCommon(object):
         # TODO(termie): this is copied from TokenController.authenticate
         tenant_ref = self.assignment_api.get_project(creds_ref['tenant_id'])
         user_ref = self.identity_api.get_user(creds_ref['user_id'])
+
+        # Validate that the auth info is valid and nothing is disabled
+        token.validate_auth_info(self, user_ref, tenant_ref)
+
+        roles, roles_ref, catalog_ref = self._get_authorization(
+            user_ref['id'], tenant_ref['id'])
         metadata_ref = {}
-        metadata_ref['roles'] = (
-            self.assignment_api.get_roles_for_user_and_project(
-                user_ref['id'], tenant_ref['id']))
+        metadata_ref['roles'] = roles
 
         trust_id = creds_ref.get('trust_id')
         if trust_id:
             metadata_ref['trust_id'] = trust_id
             metadata_ref['trustee_user_id'] = user_ref['id']
 
-        # Validate that the auth info is valid and nothing is disabled
-        token.validate_auth_info(self, user_ref, tenant_ref)
+        return user_ref, tenant_ref, metadata_ref, roles_ref, catalog_ref
 
-        roles = metadata_ref.get('roles', [])
+    def _get_authorization(self, user_id, tenant_id):
+        """Return the roles and the catalog of a user on a project.
+
+        With ``[credential] authorization_cache_size`` set, they are kept for
+        ``authorization_cache_time`` seconds, or until a role is updated or
+        deleted or the catalog changes.
+
+        :raises exception.Unauthorized: when the user has no role on the
+                                        project
+        :returns: role ids, roles_ref, catalog_ref
+
+        """
+        authorizations = credential.get_authorizations()
+        revision = catalog_core.get_catalog_revision()
+        authorization = authorizations.get((user_id, tenant_id))
+        if (authorization is not api.NO_VALUE and
+                authorization[0] == revision):
+            _revision, roles, roles_ref, catalog_ref = authorization
+            return list(roles), list(roles_ref), catalog_ref
+
+        roles = self.assignment_api.get_roles_for_user_and_project(
+            user_id, tenant_id)
         if not roles:
             raise exception.Unauthorized(message='User not valid for tenant.')
         roles_ref = [self.assignment_api.get_role(role_id)
                      for role_id in roles]
-
         catalog_ref = self.catalog_api.get_catalog(
-            user_ref['id'], tenant_ref['id'], metadata_ref)
+            user_id, tenant_id, {'roles': roles})
 
-        return user_ref, tenant_ref, metadata_ref, roles_ref, catalog_ref
+        authorizations.set((user_id, tenant_id),
+                           (revision, tuple(roles), tuple(roles_ref),
+                            catalog_ref))
+        return roles, roles_ref, catalog_ref
 
     def create_credential(self, context, user_id, tenant_id):
         """Create a secret/access pair for use with ec2 style auth.
@@ -297,7 +326,7 @@ class Ec2Controller(Ec2ControllerCommon, controller.V2Controller):
 
         """
         try:
-            token_ref = self.token_api.get_token(context['token_id'])
+            token_ref = self._get_token_ref(context)
         except exception.TokenNotFound as e:
             raise exception.Unauthorized(e)
 
@@ -16,8 +16,11 @@ import six
 
 from keystone.catalog.backends import sql
 from keystone.catalog import core as catalog_core
+from keystone.common import cache
 from keystone.common import dependency
+from keystone.common import sql as common_sql
 from keystone import config
+from keystone.contrib.endpoint_filter.backends import sql as filter_sql
 from keystone import exception
 
 CONF = config.CONF
@@ -25,52 +28,67 @@ CONF = config.CONF
 
 @dependency.requires('endpoint_filter_api')
 class EndpointFilterCatalog(sql.Catalog):
-    def get_v3_catalog(self, user_id, project_id, metadata=None):
+    @cache.on_arguments(should_cache_fn=catalog_core.SHOULD_CACHE)
+    def _get_project_catalog(self, project_id, revision):
+        """Compile the catalog of the endpoints associated with a project.
+
+        The endpoints are loaded in a single query joining the project's
+        associations with their endpoints and services. The result is
+        cached per project and catalog revision.
+
+        :returns: the compiled catalog, or None if no endpoint is
+                  associated with the project.
+
+        """
         d = dict(six.iteritems(CONF))
-        d.update({'tenant_id': project_id, 'user_id': user_id})
+
+        session = common_sql.get_session()
+        refs = (session.query(filter_sql.ProjectEndpoint, sql.Endpoint,
+                              sql.Service).
+                outerjoin(sql.Endpoint, sql.Endpoint.id ==
+                          filter_sql.ProjectEndpoint.endpoint_id).
+                outerjoin(sql.Service, sql.Service.id ==
+                          sql.Endpoint.service_id).
+                filter(filter_sql.ProjectEndpoint.project_id == project_id).
+                all())
+        if not refs:
+            return None
 
         services = {}
+        for project_endpoint, endpoint_ref, service_ref in refs:
+            if endpoint_ref is None:
+                # remove bad reference from association
+                self.endpoint_filter_api.remove_endpoint_from_project(
+                    project_endpoint.endpoint_id, project_id)
+                continue
+            if not endpoint_ref.enabled:
+                # Skip disabled endpoints.
+                continue
+            try:
+                endpoint = self._compile_v3_endpoint(endpoint_ref, d)
+            except exception.MalformedEndpoint:
+                continue  # this failure is already logged in format_url()
 
-        refs = self.endpoint_filter_api.list_endpoints_for_project(project_id)
+            if service_ref.id not in services:
+                services[service_ref.id] = (
+                    {'id': service_ref.id, 'type': service_ref.type}, [])
+            services[service_ref.id][1].append(endpoint)
 
-        if (not refs and
+        return list(six.itervalues(services))
+
+    def invalidate_project_catalog(self, project_id):
+        self._get_project_catalog.invalidate(
+            self, project_id, catalog_core.get_catalog_revision()[1])
+
+    def get_v3_catalog(self, user_id, project_id, metadata=None):
+        # Only the revision shared by all the processes is part of the key,
+        # so that any of them may invalidate the project's catalog.
+        compiled = self._get_project_catalog(
+            project_id, catalog_core.get_catalog_revision()[1])
+
+        if (compiled is None and
                 CONF.endpoint_filter.return_all_endpoints_if_no_filter):
             return super(EndpointFilterCatalog, self).get_v3_catalog(
                 user_id, project_id, metadata=metadata)
 
-        for entry in refs:
-            try:
-                endpoint = self.get_endpoint(entry.endpoint_id)
-                if not endpoint['enabled']:
-                    # Skip disabled endpoints.
-                    continue
-                service_id = endpoint['service_id']
-                services.setdefault(
-                    service_id,
-                    self.get_service(service_id))
-                service = services[service_id]
-                del endpoint['service_id']
-                del endpoint['enabled']
-                del endpoint['legacy_endpoint_id']
-                endpoint['url'] = catalog_core.format_url(
-                    endpoint['url'], d)
-                # populate filtered endpoints
-                if 'endpoints' in services[service_id]:
-                    service['endpoints'].append(endpoint)
-                else:
-                    service['endpoints'] = [endpoint]
-            except exception.EndpointNotFound:
-                # remove bad reference from association
-                self.endpoint_filter_api.remove_endpoint_from_project(
-                    entry.endpoint_id, project_id)
-
-        # format catalog
-        catalog = []
-        for service_id, service in six.iteritems(services):
-            formatted_service = {}
-            formatted_service['id'] = service['id']
-            formatted_service['type'] = service['type']
-            formatted_service['endpoints'] = service['endpoints']
-            catalog.append(formatted_service)
-
-        return catalog
+        return self._format_v3_catalog(compiled or [], user_id, project_id)
@@ -47,6 +47,7 @@ extension_data = {
 extension.register_admin_extension(extension_data['alias'], extension_data)
 
 
+@dependency.requires('catalog_api')
 @dependency.provider('endpoint_filter_api')
 class Manager(manager.Manager):
     """Default pivot point for the Endpoint Filter backend.
@@ -59,6 +60,14 @@ class Manager(manager.Manager):
     def __init__(self):
         super(Manager, self).__init__(CONF.endpoint_filter.driver)
 
+    def add_endpoint_to_project(self, endpoint_id, project_id):
+        self.driver.add_endpoint_to_project(endpoint_id, project_id)
+        self.catalog_api.invalidate_project_catalog(project_id)
+
+    def remove_endpoint_from_project(self, endpoint_id, project_id):
+        self.driver.remove_endpoint_from_project(endpoint_id, project_id)
+        self.catalog_api.invalidate_project_catalog(project_id)
+
 
 @six.add_metaclass(abc.ABCMeta)
 class Driver(object):
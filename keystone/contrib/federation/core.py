@@ -20,6 +20,7 @@ from keystone.common import dependency
 from keystone.common import extension
 from keystone.common import manager
 from keystone import config
+from keystone.contrib.federation import utils
 from keystone import exception
 from keystone.openstack.common import log as logging
 
@@ -56,6 +57,21 @@ class Manager(manager.Manager):
     """
     def __init__(self):
         super(Manager, self).__init__(CONF.federation.driver)
+        self.event_callbacks = {
+            'deleted': {'group': [self._group_deleted_callback]}}
+
+    def _group_deleted_callback(self, service, resource_type, operation,
+                                payload):
+        utils.invalidate_group(payload['resource_info'])
+
+    def update_mapping(self, mapping_id, mapping_ref):
+        ref = self.driver.update_mapping(mapping_id, mapping_ref)
+        utils.invalidate_rule_processor(mapping_id)
+        return ref
+
+    def delete_mapping(self, mapping_id):
+        self.driver.delete_mapping(mapping_id)
+        utils.invalidate_rule_processor(mapping_id)
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -14,12 +14,15 @@
 
 import re
 
+from dogpile.cache import api
 import jsonschema
 import six
 
+from keystone.common import cache
 from keystone.common import config
 from keystone import exception
 from keystone.openstack.common.gettextutils import _
+from keystone.openstack.common import jsonutils
 from keystone.openstack.common import log
 from keystone.openstack.common import timeutils
 
@@ -27,6 +30,13 @@ from keystone.openstack.common import timeutils
 CONF = config.CONF
 LOG = log.getLogger(__name__)
 
+# mapping id -> (serialized rules, RuleProcessor)
+_RULE_PROCESSORS = {}
+
+# (group_cache_size, group_cache_time) -> LRUCache of the ids of the groups
+# known to exist
+_EXISTING_GROUPS = {}
+
 
 MAPPING_SCHEMA = {
     "type": "object",
@@ -122,16 +132,39 @@ def validate_expiration(token_ref):
         raise exception.Unauthorized(_('Federation token is expired'))
 
 
+def _get_existing_groups():
+    key = (CONF.federation.group_cache_size, CONF.federation.group_cache_time)
+    existing_groups = _EXISTING_GROUPS.get(key)
+    if existing_groups is None:
+        existing_groups = cache.LRUCache(*key)
+        _EXISTING_GROUPS[key] = existing_groups
+    return existing_groups
+
+
+def invalidate_group(group_id):
+    """Forget that a group exists, once it is deleted."""
+    for existing_groups in _EXISTING_GROUPS.values():
+        existing_groups.delete(group_id)
+
+
 def validate_groups(group_ids, mapping_id, identity_api):
     if not group_ids:
         raise exception.MissingGroups(mapping_id=mapping_id)
 
-    for group_id in group_ids:
-        try:
-            identity_api.get_group(group_id)
-        except exception.GroupNotFound:
+    # NOTE: the groups recently found are not looked up again, the others
+    # are all looked up at once.
+    existing_groups = _get_existing_groups()
+    unknown_ids = [group_id for group_id in group_ids
+                   if existing_groups.get(group_id) is api.NO_VALUE]
+    if not unknown_ids:
+        return
+    found_ids = set(group['id']
+                    for group in identity_api.get_groups(unknown_ids))
+    for group_id in unknown_ids:
+        if group_id not in found_ids:
             raise exception.MappedGroupNotFound(
                 group_id=group_id, mapping_id=mapping_id)
+        existing_groups.set(group_id, True)
 
 
 def get_assertion_params_from_env(context):
@@ -141,8 +174,38 @@ def get_assertion_params_from_env(context):
             yield (k, v)
 
 
+def get_rule_processor(mapping):
+    """Return the rule processor of a mapping, compiled once per revision.
+
+    The serialized rules of the mapping are its revision: the processor is
+    compiled again if they differ from the ones it was compiled from.
+
+    :param mapping: mapping reference, with the rules serialized as JSON
+    :type mapping: dict
+
+    """
+    cached = _RULE_PROCESSORS.get(mapping['id'])
+    if cached is not None and cached[0] == mapping['rules']:
+        return cached[1]
+    rule_processor = RuleProcessor(jsonutils.loads(mapping['rules']))
+    _RULE_PROCESSORS[mapping['id']] = (mapping['rules'], rule_processor)
+    return rule_processor
+
+
+def invalidate_rule_processor(mapping_id):
+    """Forget the rule processor compiled for a mapping."""
+    _RULE_PROCESSORS.pop(mapping_id, None)
+
+
 class RuleProcessor(object):
-    """A class to process assertions and mapping rules."""
+    """A class to process assertions and mapping rules.
+
+    The rules are compiled once, when the processor is built: the regular
+    expressions are compiled, the values of the ``any_one_of`` and
+    ``not_any_of`` requirements are turned into sets, and the local values
+    the direct mappings are substituted in are found ahead of time.
+
+    """
 
     class _EvalType(object):
         """Mapping rule evaluation types."""
@@ -161,6 +224,11 @@ class RuleProcessor(object):
         """
 
         self.rules = rules
+        self._program = [(self._compile_requirements(rule['remote']),
+                          rule['local'],
+                          [self._compile_local(local)
+                           for local in rule['local']])
+                         for rule in rules]
 
     def process(self, assertion_data):
         """Transform assertion to a dictionary of user name and group ids
@@ -201,8 +269,8 @@ class RuleProcessor(object):
                          if isinstance(v, six.string_types))
         identity_values = []
 
-        for rule in self.rules:
-            direct_maps = self._verify_all_requirements(rule['remote'],
+        for requirements, local, local_fills in self._program:
+            direct_maps = self._verify_all_requirements(requirements,
                                                         assertion)
 
             # If the compare comes back as None, then the rule did not apply
@@ -214,11 +282,13 @@ class RuleProcessor(object):
             # directly to the array of saved values. However, if there is
             # a direct mapping, then perform variable replacement.
             if not direct_maps:
-                identity_values += rule['local']
+                identity_values += local
             else:
-                for local in rule['local']:
-                    new_local = self._update_local_mapping(local, direct_maps)
-                    identity_values.append(new_local)
+                for fill in local_fills:
+                    if callable(fill):
+                        identity_values.append(fill(*direct_maps))
+                    else:
+                        identity_values.append(fill)
 
         mapped_properties = self._transform(identity_values)
         if mapped_properties.get('name') is None:
@@ -260,49 +330,47 @@ class RuleProcessor(object):
 
         return {'name': user_name, 'group_ids': list(group_ids)}
 
-    def _update_local_mapping(self, local, direct_maps):
-        """Replace any {0}, {1} ... values with data from the assertion.
+    def _compile_local(self, local):
+        """Find the values of a local mapping with {0}, {1} ... in them.
 
-        :param local: local mapping reference that needs to be updated
+        :param local: local mapping reference
         :type local: dict
-        :param direct_maps: list of identity values, used to update local
-        :type direct_maps: list
 
         Example local::
 
             {'user': {'name': '{0} {1}', 'email': '{2}'}}
 
-        Example direct_maps::
-
-            ['Bob', 'Thompson', 'bob@example.com']
+        :returns: the local mapping itself if it has no value to replace,
+                  otherwise a function of the direct mappings returning a
+                  new local mapping reference with replaced values.
 
-        :returns: new local mapping reference with replaced values.
-
-        The expected return structure is::
+        Called with ``'Bob', 'Thompson', 'bob@example.com'``, the function
+        returned for the example local returns::
 
             {'user': {'name': 'Bob Thompson', 'email': 'bob@example.org'}}
 
         """
 
-        new = {}
+        fills = []
         for k, v in six.iteritems(local):
             if isinstance(v, dict):
-                new_value = self._update_local_mapping(v, direct_maps)
-            else:
-                new_value = v.format(*direct_maps)
-            new[k] = new_value
-        return new
-
-    def _verify_all_requirements(self, requirements, assertion):
-        """Go through the remote requirements of a rule, and compare against
-        the assertion.
-
-        If a value of ``None`` is returned, the rule with this assertion
-        doesn't apply.
-        If an array of zero length is returned, then there are no direct
-        mappings to be performed, but the rule is valid.
-        Otherwise, then it will return the values, in order, to be directly
-        mapped, again, the rule is valid.
+                fill = self._compile_local(v)
+                if callable(fill):
+                    fills.append((k, fill))
+            elif isinstance(v, six.string_types) and ('{' in v or '}' in v):
+                fills.append((k, v.format))
+        if not fills:
+            return local
+
+        def fill_local(*direct_maps):
+            new = dict(local)
+            for k, fill in fills:
+                new[k] = fill(*direct_maps)
+            return new
+        return fill_local
+
+    def _compile_requirements(self, requirements):
+        """Compile the remote requirements of a rule.
 
         :param requirements: list of remote requirements from rules
         :type requirements: list
@@ -321,6 +389,46 @@ class RuleProcessor(object):
                 }
             ]
 
+        :returns: list of ``(type, eval_type, regex, values)`` tuples, where
+                  ``eval_type`` is None for a direct mapping, and ``values``
+                  are compiled regular expressions if ``regex`` is set, a
+                  frozenset otherwise.
+
+        """
+
+        compiled = []
+        for requirement in requirements:
+            requirement_type = requirement['type']
+            regex = requirement.get('regex', False)
+            for eval_type in (self._EvalType.ANY_ONE_OF,
+                              self._EvalType.NOT_ANY_OF):
+                values = requirement.get(eval_type)
+                if values is not None:
+                    break
+            else:
+                compiled.append((requirement_type, None, False, None))
+                continue
+            if regex:
+                values = [re.compile(value) for value in values]
+            else:
+                values = frozenset(values)
+            compiled.append((requirement_type, eval_type, regex, values))
+        return compiled
+
+    def _verify_all_requirements(self, requirements, assertion):
+        """Go through the remote requirements of a rule, and compare against
+        the assertion.
+
+        If a value of ``None`` is returned, the rule with this assertion
+        doesn't apply.
+        If an array of zero length is returned, then there are no direct
+        mappings to be performed, but the rule is valid.
+        Otherwise, then it will return the values, in order, to be directly
+        mapped, again, the rule is valid.
+
+        :param requirements: compiled remote requirements of a rule, see
+                             ``_compile_requirements``
+        :type requirements: list
         :param assertion: dict of attributes from an IdP
         :type assertion: dict
 
@@ -340,26 +448,11 @@ class RuleProcessor(object):
 
         direct_maps = []
 
-        for requirement in requirements:
-            requirement_type = requirement['type']
-            regex = requirement.get('regex', False)
-
-            any_one_values = requirement.get(self._EvalType.ANY_ONE_OF)
-            if any_one_values is not None:
-                if self._evaluate_requirement(any_one_values,
-                                              requirement_type,
-                                              self._EvalType.ANY_ONE_OF,
-                                              regex,
-                                              assertion):
-                    continue
-                else:
-                    return None
-
-            not_any_values = requirement.get(self._EvalType.NOT_ANY_OF)
-            if not_any_values is not None:
-                if self._evaluate_requirement(not_any_values,
+        for requirement_type, eval_type, regex, values in requirements:
+            if eval_type is not None:
+                if self._evaluate_requirement(values,
                                               requirement_type,
-                                              self._EvalType.NOT_ANY_OF,
+                                              eval_type,
                                               regex,
                                               assertion):
                     continue
@@ -383,8 +476,8 @@ class RuleProcessor(object):
         assertion values. Otherwise, grab the intersection of the values
         and use that to compare against the evaluation type.
 
-        :param values: list of allowed values, defined in the requirement
-        :type values: list
+        :param values: compiled allowed values, defined in the requirement
+        :type values: list of regular expressions or frozenset
         :param requirement_type: key to look for in the assertion
         :type requirement_type: string
         :param eval_type: determine how to evaluate requirements
@@ -405,11 +498,11 @@ class RuleProcessor(object):
         if regex:
             for value in values:
                 for assertion_value in assertion_values:
-                    if re.search(value, assertion_value):
+                    if value.search(assertion_value):
                         return True
             return False
 
-        any_match = bool(set(values).intersection(set(assertion_values)))
+        any_match = not values.isdisjoint(assertion_values)
         if any_match and eval_type == self._EvalType.ANY_ONE_OF:
             return True
         if not any_match and eval_type == self._EvalType.NOT_ANY_OF:
@@ -69,7 +69,7 @@ class ConsumerCrudV3(controller.V3Controller):
 
     @controller.protected()
     def delete_consumer(self, context, consumer_id):
-        user_token_ref = self.token_api.get_token(context['token_id'])
+        user_token_ref = self._get_token_ref(context)
         user_id = user_token_ref['user'].get('id')
         self.token_api.delete_tokens(user_id, consumer_id=consumer_id)
         self.oauth_api.delete_consumer(consumer_id)
@@ -339,7 +339,7 @@ class OAuthControllerV3(controller.V3Controller):
             authed_roles.add(role['id'])
 
         # verify the authorizing user has the roles
-        user_token = self.token_api.get_token(context['token_id'])
+        user_token = self._get_token_ref(context)
         user_id = user_token['user'].get('id')
         project_id = req_token['requested_project_id']
         user_roles = self.assignment_api.get_roles_for_user_and_project(
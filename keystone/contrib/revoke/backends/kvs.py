@@ -58,6 +58,9 @@ class Revoke(revoke.Driver):
             self._store.set(_EVENT_KEY, pruned, lock)
         return results
 
+    def prune_expired_events(self):
+        self._prune_expired_events_and_get()
+
     def get_events(self, last_fetch=None):
         return self._prune_expired_events_and_get(last_fetch=last_fetch)
 
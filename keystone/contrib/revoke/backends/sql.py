@@ -35,9 +35,9 @@ class RevocationEvent(sql.ModelBase, sql.ModelDictMixin):
     trust_id = sql.Column(sql.String(64))
     consumer_id = sql.Column(sql.String(64))
     access_token_id = sql.Column(sql.String(64))
-    issued_before = sql.Column(sql.DateTime(), nullable=False)
+    issued_before = sql.Column(sql.DateTime(), nullable=False, index=True)
     expires_at = sql.Column(sql.DateTime())
-    revoked_at = sql.Column(sql.DateTime(), nullable=False)
+    revoked_at = sql.Column(sql.DateTime(), nullable=False, index=True)
 
 
 class Revoke(revoke.Driver):
@@ -59,7 +59,7 @@ class Revoke(revoke.Driver):
             # been increased beyond the default.
         return batch_size
 
-    def _prune_expired_events(self):
+    def prune_expired_events(self):
         oldest = revoke.revoked_before_cutoff_time()
 
         session = sql.get_session()
@@ -83,10 +83,14 @@ class Revoke(revoke.Driver):
         session.flush()
 
     def get_events(self, last_fetch=None):
-        self._prune_expired_events()
+        # NOTE: expired events are not deleted here, so reads never need a
+        # write transaction; they are only filtered out of the result. The
+        # deletion is done by `prune_expired_events`.
+        oldest = revoke.revoked_before_cutoff_time()
         session = sql.get_session()
         query = session.query(RevocationEvent).order_by(
             RevocationEvent.revoked_at)
+        query = query.filter(RevocationEvent.revoked_at >= oldest)
 
         if last_fetch:
             query = query.filter(RevocationEvent.revoked_at > last_fetch)
@@ -12,6 +12,8 @@
 
 import abc
 import datetime
+import heapq
+import uuid
 
 import six
 
@@ -55,6 +57,34 @@ SHOULD_CACHE = cache.should_cache_fn('revoke')
 # TODO(ayoung): migrate from the token section
 REVOCATION_CACHE_EXPIRATION_TIME = lambda: CONF.token.revocation_cache_time
 
+# Events are re-fetched from slightly before the high-water mark so that
+# events committed late by other API nodes (clock skew, slow transactions)
+# are not skipped. Duplicates are filtered out by `_event_key`.
+_SYNC_OVERLAP = datetime.timedelta(seconds=30)
+
+_REVISION_KEY = 'revoke-revision'
+
+
+def get_revoke_revision():
+    """Return the revision of the revocation events shared by the processes.
+
+    The revision changes whenever any process sharing the cache records a
+    revocation event, so that the others fetch it on their next check.
+
+    """
+    return cache.REGION.get_or_create(
+        _REVISION_KEY, lambda: uuid.uuid4().hex,
+        expiration_time=REVOCATION_CACHE_EXPIRATION_TIME())
+
+
+def bump_revoke_revision():
+    """Make every process fetch the events it has not seen yet."""
+    cache.REGION.set(_REVISION_KEY, uuid.uuid4().hex)
+
+
+def _event_key(event):
+    return tuple(getattr(event, name) for name in model.REVOKE_KEYS)
+
 
 def revoked_before_cutoff_time():
     expire_delta = datetime.timedelta(
@@ -75,6 +105,8 @@ class Manager(manager.Manager):
         super(Manager, self).__init__(CONF.revoke.driver)
         self._register_listeners()
         self.model = model
+        self._reset_revoke_matcher()
+        self._last_prune = None
 
     def _user_callback(self, service, resource_type, operation,
                        payload):
@@ -151,13 +183,99 @@ class Manager(manager.Manager):
     def revoke_by_domain_role_assignment(self, domain_id, role_id):
         self.revoke(model.RevokeEvent(domain_id=domain_id, role_id=role_id))
 
-    @cache.on_arguments(should_cache_fn=SHOULD_CACHE,
-                        expiration_time=REVOCATION_CACHE_EXPIRATION_TIME)
-    def _get_revoke_tree(self):
-        events = self.driver.get_events()
-        revoke_tree = model.RevokeTree(revoke_events=events)
+    def _reset_revoke_matcher(self):
+        self._revoke_matcher = None
+        # heap of (revoked_at, sequence, event) used to prune in order
+        self._revoke_heap = []
+        self._revoke_keys = set()
+        self._revoke_seq = 0
+        self._last_fetch = None
+        self._last_sync = None
+        self._revision = None
+
+    def _add_to_revoke_matcher(self, event):
+        key = _event_key(event)
+        if key in self._revoke_keys:
+            return
+        self._revoke_keys.add(key)
+        self._revoke_seq += 1
+        heapq.heappush(self._revoke_heap,
+                       (event.revoked_at, self._revoke_seq, event))
+        self._revoke_matcher.add_event(event)
+
+    def _prune_revoke_matcher(self):
+        oldest = revoked_before_cutoff_time()
+        heap = self._revoke_heap
+        while heap and heap[0][0] < oldest:
+            event = heapq.heappop(heap)[2]
+            self._revoke_keys.discard(_event_key(event))
+            self._revoke_matcher.remove_event(event)
+
+    def _needs_full_sync(self, now):
+        """Detect a gap between the in-process matcher and the backend.
+
+        The matcher is rebuilt from scratch the first time it is used, if the
+        clock has moved backwards, or if it has not been synchronized within
+        the revocation event retention window, since the backend may have
+        pruned or received events that the incremental fetch cannot see.
+
+        """
+        if self._revoke_matcher is None or self._last_sync is None:
+            return True
+        if now < self._last_sync:
+            return True
+        return self._last_sync < revoked_before_cutoff_time()
 
-        return revoke_tree
+    def _is_synchronized(self, now, revision):
+        """Whether no process has recorded an event since the last sync.
+
+        The shared revision is only trusted for ``revocation_cache_time``
+        seconds, which bounds the staleness when the cache backend is not
+        shared by every process.
+
+        """
+        if revision is None or revision != self._revision:
+            return False
+        return now - self._last_sync < datetime.timedelta(
+            seconds=REVOCATION_CACHE_EXPIRATION_TIME())
+
+    def _synchronize_revoke_matcher(self):
+        now = timeutils.utcnow()
+        # NOTE: the revision is read before the events, so that an event
+        # recorded during the fetch is fetched again on the next check.
+        revision = None
+        if SHOULD_CACHE(self._revoke_matcher):
+            revision = get_revoke_revision()
+        if self._needs_full_sync(now):
+            events = self.driver.get_events()
+            self._reset_revoke_matcher()
+            self._revoke_matcher = model.RevokeMatcher()
+        elif self._is_synchronized(now, revision):
+            return
+        else:
+            events = self.driver.get_events(
+                last_fetch=self._last_fetch - _SYNC_OVERLAP)
+
+        for event in events:
+            self._add_to_revoke_matcher(event)
+            if self._last_fetch is None or event.revoked_at > self._last_fetch:
+                self._last_fetch = event.revoked_at
+        if self._last_fetch is None:
+            self._last_fetch = now
+        self._last_sync = now
+        self._revision = revision
+        self._prune_revoke_matcher()
+
+    def _get_revoke_matcher(self):
+        """Return the in-process revocation matcher, synchronized if needed.
+
+        The matcher lives for the lifetime of the process and only pulls the
+        events newer than its high-water mark from the driver; expired events
+        are pruned from it in place.
+
+        """
+        self._synchronize_revoke_matcher()
+        return self._revoke_matcher
 
     def check_token(self, token_values):
         """Checks the values from a token against the revocation list
@@ -169,12 +287,33 @@ class Manager(manager.Manager):
         :raises exception.TokenNotFound: if the token is invalid
 
          """
-        if self._get_revoke_tree().is_revoked(token_values):
+        if self._get_revoke_matcher().is_revoked(token_values):
             raise exception.TokenNotFound(_('Failed to validate token'))
 
+    def prune_expired_events(self):
+        """Remove the events that can no longer match an unexpired token."""
+        self.driver.prune_expired_events()
+        self._last_prune = timeutils.utcnow()
+
+    def _prune_expired_events_if_due(self):
+        interval = CONF.revoke.prune_interval
+        if interval <= 0:
+            return
+        now = timeutils.utcnow()
+        if (self._last_prune is None or now < self._last_prune or
+                now - self._last_prune >= datetime.timedelta(
+                    seconds=interval)):
+            self.prune_expired_events()
+
     def revoke(self, event):
         self.driver.revoke(event)
-        self._get_revoke_tree.invalidate(self)
+        if SHOULD_CACHE(None):
+            bump_revoke_revision()
+        self._prune_expired_events_if_due()
+        # The high-water mark is deliberately not moved here; events from
+        # other processes older than this one are picked up by the next sync.
+        if self._revoke_matcher is not None:
+            self._add_to_revoke_matcher(event)
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -194,6 +333,17 @@ class Driver(object):
         """
         raise exception.NotImplemented()
 
+    @abc.abstractmethod
+    def prune_expired_events(self):
+        """remove the events older than the expiration cutoff
+
+        Events revoked before
+        keystone.contrib.revoke.core.revoked_before_cutoff_time() can no
+        longer match a valid token and may be deleted.
+
+        """
+        raise exception.NotImplemented()
+
     @abc.abstractmethod
     def revoke(self, event):
         """register a revocation event
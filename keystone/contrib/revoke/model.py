@@ -10,6 +10,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import itertools
+
+import six
+
 from keystone.openstack.common import timeutils
 
 # The set of attributes common between the RevokeEvent
@@ -145,7 +149,7 @@ class RevokeTree(object):
             stack.append((revoke_map, key, nxt))
             revoke_map = nxt
         else:
-            if event.issued_before == revoke_map['issued_before']:
+            if event.issued_before == revoke_map.get('issued_before'):
                 revoke_map.pop('issued_before')
         for parent, key, child in reversed(stack):
             if not any(child):
@@ -223,6 +227,130 @@ class RevokeTree(object):
         return False
 
 
+# Token attributes compared against each event attribute. Roles are handled
+# separately since a token carries a list of them.
+_ALTERNATIVES = {
+    'user_id': ('user_id', 'trustor_id', 'trustee_id'),
+    'domain_id': ('identity_domain_id', 'assignment_domain_id'),
+}
+
+
+class RevokeMatcher(object):
+    """Compiled Revocation Checking Structure
+
+    Events are partitioned by their shape, the set of attributes they
+    restrict. Only a handful of shapes exist, so a token is checked by
+    building, for each shape, the tuples of token values that could match
+    and looking them up in a hash table holding the latest 'issued_before'
+    for those values. The cost of a check does not depend on the number of
+    events recorded.
+
+    """
+
+    def __init__(self, revoke_events=None):
+        # shape -> {values: [issued_before, ...]}
+        self._events = {}
+        # shape -> {values: latest issued_before}
+        self._latest = {}
+        self._count = 0
+        self.add_events(revoke_events)
+
+    def __len__(self):
+        return self._count
+
+    @staticmethod
+    def _compile(event):
+        shape = tuple(name for name in _NAMES
+                      if getattr(event, name) is not None)
+        values = tuple(getattr(event, name) for name in shape)
+        return shape, values
+
+    def add_event(self, event):
+        """Updates the matcher based on a revocation event.
+
+        :param:  Event to add to the matcher
+
+        :returns:  the event that was passed in.
+
+        """
+        shape, values = self._compile(event)
+        issued = self._events.setdefault(shape, {}).setdefault(values, [])
+        issued.append(event.issued_before)
+        latest = self._latest.setdefault(shape, {})
+        if values not in latest or latest[values] < event.issued_before:
+            latest[values] = event.issued_before
+        self._count += 1
+        return event
+
+    def remove_event(self, event):
+        """Update the matcher based on the removal of a Revocation Event
+
+        :param: Event to remove from the matcher
+
+        """
+        shape, values = self._compile(event)
+        issued = self._events.get(shape, {}).get(values)
+        if not issued or event.issued_before not in issued:
+            return
+        issued.remove(event.issued_before)
+        self._count -= 1
+        if issued:
+            self._latest[shape][values] = max(issued)
+            return
+        del self._events[shape][values]
+        del self._latest[shape][values]
+        if not self._events[shape]:
+            del self._events[shape]
+            del self._latest[shape]
+
+    def add_events(self, revoke_events):
+        return [self.add_event(event) for event in revoke_events or []]
+
+    @staticmethod
+    def _candidates(name, token_data):
+        if name == 'role_id':
+            values = token_data.get('roles', [])
+        else:
+            values = [token_data[alt_name]
+                      for alt_name in _ALTERNATIVES.get(name, (name,))]
+        return set(v for v in values if v is not None)
+
+    def is_revoked(self, token_data):
+        """Check if a token matches any revocation event
+
+        token_data is a map based on a flattened view of token, with the
+        same required fields as for RevokeTree.is_revoked.
+
+        """
+        issued_at = token_data['issued_at']
+        candidates = {}
+        for shape, latest in six.iteritems(self._latest):
+            values = []
+            for name in shape:
+                if name not in candidates:
+                    candidates[name] = self._candidates(name, token_data)
+                if not candidates[name]:
+                    break
+                values.append(candidates[name])
+            else:
+                for key in itertools.product(*values):
+                    issued_before = latest.get(key)
+                    if issued_before is not None and issued_before > issued_at:
+                        return True
+        return False
+
+    def is_revoked_many(self, token_values_list):
+        """Check a batch of tokens against the revocation events.
+
+        :param token_values_list: list of token_data maps, as passed to
+                                  is_revoked
+        :returns: list of booleans, True for each revoked token
+
+        """
+        return [self.is_revoked(token_data)
+                for token_data in token_values_list]
+
+
 def build_token_values_v2(access, default_domain_id):
     token_data = access['token']
     token_values = {
@@ -46,6 +46,8 @@ class Credential(credential.Driver):
         query = session.query(CredentialModel)
         if 'user_id' in filters:
             query = query.filter_by(user_id=filters.get('user_id'))
+        if 'project_id' in filters:
+            query = query.filter_by(project_id=filters.get('project_id'))
         refs = query.all()
         return [ref.to_dict() for ref in refs]
 
@@ -18,6 +18,7 @@ import abc
 
 import six
 
+from keystone.common import cache
 from keystone.common import dependency
 from keystone.common import manager
 from keystone import config
@@ -29,6 +30,31 @@ from keystone.openstack.common import log
 CONF = config.CONF
 
 LOG = log.getLogger(__name__)
+SHOULD_CACHE = cache.should_cache_fn('credential')
+
+# NOTE: The config option is not available at import time.
+EXPIRATION_TIME = lambda: CONF.credential.cache_time
+
+# (authorization_cache_size, authorization_cache_time) -> LRUCache of the
+# authorizations granted through EC2 and S3 credentials, by
+# (user_id, project_id)
+_AUTHORIZATIONS = {}
+
+
+def get_authorizations():
+    key = (CONF.credential.authorization_cache_size,
+           CONF.credential.authorization_cache_time)
+    authorizations = _AUTHORIZATIONS.get(key)
+    if authorizations is None:
+        authorizations = cache.LRUCache(*key)
+        _AUTHORIZATIONS[key] = authorizations
+    return authorizations
+
+
+def invalidate_authorizations():
+    """Forget the roles and catalogs kept for every user and project."""
+    for authorizations in _AUTHORIZATIONS.values():
+        authorizations.clear()
 
 
 @dependency.provider('credential_api')
@@ -42,6 +68,47 @@ class Manager(manager.Manager):
 
     def __init__(self):
         super(Manager, self).__init__(CONF.credential.driver)
+        # NOTE: the authorizations hold the names of the roles.
+        self.event_callbacks = {
+            'updated': {'role': [self._role_changed_callback]},
+            'deleted': {'role': [self._role_changed_callback]}}
+
+    def _role_changed_callback(self, service, resource_type, operation,
+                               payload):
+        invalidate_authorizations()
+
+    def get_credential(self, credential_id):
+        return self._get_credential(credential_id)
+
+    # NOTE: EC2 and S3 credentials are looked up by the hash of their access
+    # key on every signature check, which is the id cached here.
+    @cache.on_arguments(should_cache_fn=SHOULD_CACHE,
+                        expiration_time=EXPIRATION_TIME)
+    def _get_credential(self, credential_id):
+        return self.driver.get_credential(credential_id)
+
+    def update_credential(self, credential_id, credential):
+        ref = self.driver.update_credential(credential_id, credential)
+        self._get_credential.invalidate(self, credential_id)
+        return ref
+
+    def delete_credential(self, credential_id):
+        self.driver.delete_credential(credential_id)
+        self._get_credential.invalidate(self, credential_id)
+
+    def delete_credentials_for_project(self, project_id):
+        credential_ids = [ref['id'] for ref in
+                          self.driver.list_credentials(project_id=project_id)]
+        self.driver.delete_credentials_for_project(project_id)
+        for credential_id in credential_ids:
+            self._get_credential.invalidate(self, credential_id)
+
+    def delete_credentials_for_user(self, user_id):
+        credential_ids = [ref['id'] for ref in
+                          self.driver.list_credentials(user_id=user_id)]
+        self.driver.delete_credentials_for_user(user_id)
+        for credential_id in credential_ids:
+            self._get_credential.invalidate(self, credential_id)
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -344,6 +344,13 @@ class Gone(Error):
     title = 'Gone'
 
 
+class ServiceUnavailable(Error):
+    message_format = _("The server is currently unable to handle the"
+                       " request, please retry later.")
+    code = 503
+    title = 'Service Unavailable'
+
+
 class ConfigFileNotFound(UnexpectedError):
     debug_message_format = _("The Keystone configuration file %(config_file)s "
                              "could not be found.")
@@ -70,7 +70,8 @@ class Identity(kvs.Base, identity.Driver):
             user_ref = self._get_user(user_id)
         except exception.UserNotFound:
             raise AssertionError(_('Invalid user / password'))
-        if not utils.check_password(password, user_ref.get('password')):
+        if not identity.check_password(user_id, password,
+                                       user_ref.get('password')):
             raise AssertionError(_('Invalid user / password'))
         return identity.filter_user(user_ref)
 
@@ -248,6 +249,15 @@ class Identity(kvs.Base, identity.Driver):
         except exception.NotFound:
             raise exception.GroupNotFound(group_id=group_id)
 
+    def get_groups(self, group_ids):
+        group_refs = []
+        for group_id in set(group_ids):
+            try:
+                group_refs.append(self.db.get('group-%s' % group_id))
+            except exception.NotFound:
+                continue
+        return group_refs
+
     def update_group(self, group_id, group):
         # First, make sure we are not trying to change the
         # name to one that is already in use
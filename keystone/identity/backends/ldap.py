@@ -125,6 +125,9 @@ class Identity(identity.Driver):
     def get_group(self, group_id):
         return self.group.get_filtered(group_id)
 
+    def get_groups(self, group_ids):
+        return self.group.get_all_filtered_by_ids(group_ids)
+
     def update_group(self, group_id, group):
         self.group.check_allow_update()
         if 'name' in group:
@@ -359,3 +362,7 @@ class GroupApi(common_ldap.BaseLdap):
     def get_all_filtered(self, query=None):
         return [common_ldap.filter_entity(group)
                 for group in self.get_all(query)]
+
+    def get_all_filtered_by_ids(self, group_ids):
+        return [common_ldap.filter_entity(group)
+                for group in self.get_all_by_ids(group_ids)]
@@ -89,7 +89,8 @@ class Identity(identity.Driver):
         https://blueprints.launchpad.net/keystone/+spec/sql-identiy-pam
 
         """
-        return utils.check_password(password, user_ref.password)
+        return identity.check_password(user_ref.id, password,
+                                       user_ref.password)
 
     def is_domain_aware(self):
         return True
@@ -277,6 +278,13 @@ class Identity(identity.Driver):
         session = sql.get_session()
         return self._get_group(session, group_id).to_dict()
 
+    def get_groups(self, group_ids):
+        if not group_ids:
+            return []
+        session = sql.get_session()
+        query = session.query(Group).filter(Group.id.in_(set(group_ids)))
+        return [group_ref.to_dict() for group_ref in query]
+
     @sql.handle_conflicts(conflict_type='group')
     def update_group(self, group_id, group):
         session = sql.get_session()
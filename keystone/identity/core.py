@@ -16,16 +16,21 @@
 
 import abc
 import functools
+import hashlib
+import hmac
 import os
 import uuid
 
+from dogpile.cache import api
 from oslo.config import cfg
 import six
 
 from keystone import clean
+from keystone.common import cache
 from keystone.common import dependency
 from keystone.common import driver_hints
 from keystone.common import manager
+from keystone.common import utils
 from keystone import config
 from keystone import exception
 from keystone import notifications
@@ -42,6 +47,10 @@ LOG = log.getLogger(__name__)
 DOMAIN_CONF_FHEAD = 'keystone.'
 DOMAIN_CONF_FTAIL = '.conf'
 
+# (verified_password_cache_size, verified_password_cache_time) ->
+# VerifiedPasswords
+_VERIFIED_PASSWORDS = {}
+
 
 def filter_user(user_ref):
     """Filter out private items in a user dict.
@@ -65,6 +74,75 @@ def filter_user(user_ref):
     return user_ref
 
 
+class VerifiedPasswords(object):
+    """Remember the passwords recently verified for each user.
+
+    Checking a password against its stored hash runs ``crypt_strength``
+    rounds of SHA-512, on each authentication. Once a password is verified,
+    an HMAC of it, computed with a secret of the process, is kept along with
+    a fingerprint of the stored hash, so that the same password is accepted
+    again without hashing it as long as the stored hash has not changed.
+    Wrong passwords are never remembered.
+
+    :param maxsize: maximum number of users remembered, 0 disables the cache
+    :param ttl: time to remember a verified password (in seconds)
+
+    """
+
+    def __init__(self, maxsize, ttl):
+        self._secret = os.urandom(32)
+        self._cache = cache.LRUCache(maxsize, ttl)
+
+    def _digest(self, password_utf8, hashed):
+        password_mac = hmac.new(self._secret, password_utf8,
+                                hashlib.sha256).hexdigest()
+        fingerprint = hashlib.sha256(hashed.encode('utf-8')).hexdigest()
+        return '%s:%s' % (password_mac, fingerprint)
+
+    def check_password(self, user_id, password, hashed):
+        """Check that the password matches the hash stored for the user."""
+        if not self._cache.enabled or password is None or hashed is None:
+            return utils.check_password(password, hashed)
+        password_utf8 = utils.verify_length_and_trunc_password(
+            password).encode('utf-8')
+        digest = self._digest(password_utf8, hashed)
+        verified = self._cache.get(user_id)
+        if verified is not api.NO_VALUE and utils.auth_str_equal(digest,
+                                                                 verified):
+            return True
+        if not utils.check_password(password, hashed):
+            return False
+        self._cache.set(user_id, digest)
+        return True
+
+    def invalidate(self, user_id):
+        self._cache.delete(user_id)
+
+    def get_stats(self):
+        return self._cache.get_stats()
+
+
+def get_verified_passwords():
+    """Return the verified password cache of this process."""
+    key = (CONF.identity.verified_password_cache_size,
+           CONF.identity.verified_password_cache_time)
+    verified_passwords = _VERIFIED_PASSWORDS.get(key)
+    if verified_passwords is None:
+        verified_passwords = VerifiedPasswords(*key)
+        _VERIFIED_PASSWORDS[key] = verified_passwords
+    return verified_passwords
+
+
+def check_password(user_id, password, hashed):
+    """Check a user's password against its stored hash.
+
+    The passwords verified recently are not hashed again, see
+    :class:`VerifiedPasswords`.
+
+    """
+    return get_verified_passwords().check_password(user_id, password, hashed)
+
+
 class DomainConfigs(dict):
     """Discover, store and provide access to domain specific configs.
 
@@ -214,6 +292,16 @@ class Manager(manager.Manager):
     def __init__(self):
         super(Manager, self).__init__(CONF.identity.driver)
         self.domain_configs = DomainConfigs()
+        self.event_callbacks = {
+            'updated': {self._USER: [self._user_changed_callback]},
+            'deleted': {self._USER: [self._user_changed_callback]}}
+
+    def _user_changed_callback(self, service, resource_type, operation,
+                               payload):
+        # NOTE: a changed password no longer matches the fingerprint of the
+        # verified password, the user is forgotten on any change all the same.
+        for verified_passwords in _VERIFIED_PASSWORDS.values():
+            verified_passwords.invalidate(payload['resource_info'])
 
     # Domain ID normalization methods
 
@@ -381,6 +469,14 @@ class Manager(manager.Manager):
             ref = self._set_domain_id(ref, domain_id)
         return ref
 
+    @domains_configured
+    def get_groups(self, group_ids, domain_scope=None):
+        domain_id, driver = self._get_domain_id_and_driver(domain_scope)
+        ref_list = driver.get_groups(group_ids)
+        if not driver.is_domain_aware():
+            ref_list = self._set_domain_id(ref_list, domain_id)
+        return ref_list
+
     @notifications.updated(_GROUP)
     @domains_configured
     def update_group(self, group_id, group, domain_scope=None):
@@ -657,6 +753,17 @@ class Driver(object):
         """
         raise exception.NotImplemented()
 
+    @abc.abstractmethod
+    def get_groups(self, group_ids):
+        """Get the groups with any of the given IDs, in a single call.
+
+        The IDs of the groups that do not exist are ignored.
+
+        :returns: a list of group_refs, in no particular order
+
+        """
+        raise exception.NotImplemented()
+
     @abc.abstractmethod
     def update_group(self, group_id, group):
         """Updates an existing group.
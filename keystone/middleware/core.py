@@ -265,12 +265,18 @@ class AuthContextMiddleware(wsgi.Middleware):
             # TODO(gyee): validate_token_bind should really be its own
             # middleware
             wsgi.validate_token_bind(context, token_ref)
-            return authorization.token_to_auth_context(
+            auth_context = authorization.token_to_auth_context(
                 token_ref['token_data'])
         except exception.TokenNotFound:
             LOG.warning(_('RBAC: Invalid token'))
             raise exception.Unauthorized()
 
+        # Keep the token for the rest of the request, so that it is not
+        # loaded again.
+        request.environ[authorization.AUTH_TOKEN_ENV] = (
+            authorization.RequestToken(token_id, token_ref, auth_context))
+        return auth_context
+
     def process_request(self, request):
         if AUTH_TOKEN_HEADER not in request.headers:
             LOG.debug(_('Auth token not in the request header. '
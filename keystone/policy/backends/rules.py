@@ -15,7 +15,11 @@
 
 """Policy engine for keystone"""
 
+import ast
 import os.path
+import time
+
+import six
 
 from keystone.common import utils
 from keystone import config
@@ -33,15 +37,22 @@ LOG = log.getLogger(__name__)
 _ENFORCER = None
 _POLICY_PATH = None
 _POLICY_CACHE = {}
+# The rules compiled so far, by name, and the rules they were compiled from.
+_COMPILED = {}
+_COMPILED_FROM = None
 
 
 def reset():
     global _POLICY_PATH
     global _POLICY_CACHE
     global _ENFORCER
+    global _COMPILED
+    global _COMPILED_FROM
     _POLICY_PATH = None
     _POLICY_CACHE = {}
     _ENFORCER = None
+    _COMPILED = {}
+    _COMPILED_FROM = None
 
 
 def init():
@@ -54,9 +65,18 @@ def init():
             _POLICY_PATH = CONF.find_file(_POLICY_PATH)
     if not _ENFORCER:
         _ENFORCER = common_policy.Enforcer(policy_file=_POLICY_PATH)
+
+    # Only look for changes to the policy file every so often, rather than
+    # on every check.
+    now = time.time()
+    if (_POLICY_CACHE and
+            now - _POLICY_CACHE['checked_at'] <
+            CONF.policy.file_check_interval):
+        return
     utils.read_cached_file(_POLICY_PATH,
                            _POLICY_CACHE,
                            reload_func=_set_rules)
+    _POLICY_CACHE['checked_at'] = now
 
 
 def _set_rules(data):
@@ -66,6 +86,139 @@ def _set_rules(data):
         data, default_rule))
 
 
+def _true(target, creds, memo):
+    return True
+
+
+def _false(target, creds, memo):
+    return False
+
+
+def _compile_rule(name, rules, compiled, compiling):
+    if name not in compiled:
+        if name in compiling:
+            LOG.warning(_('Rule [%s] references itself'), name)
+            return _false
+        try:
+            check = rules[name]
+        except KeyError:
+            LOG.debug('Rule [%s] doesn\'t exist', name)
+            # If the rule doesn't exist, fail closed
+            compiled[name] = _false
+            return _false
+        compiled[name] = _compile_check(check, rules, compiled,
+                                        compiling | set([name]))
+    return compiled[name]
+
+
+def _compile_check(check, rules, compiled, compiling=frozenset()):
+    """Compile a check tree into a function of (target, creds, memo).
+
+    The references to other rules are resolved once, so that the resulting
+    function only evaluates the checks at the leaves of the tree. The role
+    and generic checks keep their results in memo, for the credentials of a
+    single evaluation.
+
+    """
+    if isinstance(check, common_policy.TrueCheck):
+        return _true
+    if isinstance(check, common_policy.FalseCheck):
+        return _false
+
+    if isinstance(check, common_policy.AndCheck):
+        checks = [_compile_check(c, rules, compiled, compiling)
+                  for c in check.rules]
+
+        def and_check(target, creds, memo):
+            for c in checks:
+                if not c(target, creds, memo):
+                    return False
+            return True
+        return and_check
+
+    if isinstance(check, common_policy.OrCheck):
+        checks = [_compile_check(c, rules, compiled, compiling)
+                  for c in check.rules]
+
+        def or_check(target, creds, memo):
+            for c in checks:
+                if c(target, creds, memo):
+                    return True
+            return False
+        return or_check
+
+    if isinstance(check, common_policy.NotCheck):
+        negated = _compile_check(check.rule, rules, compiled, compiling)
+        return lambda target, creds, memo: not negated(target, creds, memo)
+
+    if isinstance(check, common_policy.RuleCheck):
+        return _compile_rule(check.match, rules, compiled, compiling)
+
+    if isinstance(check, common_policy.RoleCheck):
+        role = check.match.lower()
+
+        def role_check(target, creds, memo):
+            roles = memo.get('roles')
+            if roles is None:
+                roles = memo['roles'] = set(x.lower() for x in creds['roles'])
+            return role in roles
+        return role_check
+
+    if isinstance(check, common_policy.GenericCheck):
+        return _compile_generic_check(check)
+
+    # Any other kind of check is evaluated as is.
+    return lambda target, creds, memo: check(target, creds, _ENFORCER)
+
+
+def _compile_generic_check(check):
+    kind = check.kind
+    match = check.match
+    try:
+        # Try to interpret check.kind as a literal
+        literal = six.text_type(ast.literal_eval(kind))
+    except ValueError:
+        literal = None
+    except SyntaxError:
+        # Let the check fail as it would have
+        return lambda target, creds, memo: check(target, creds, _ENFORCER)
+    templated = '%' in match
+
+    def generic_check(target, creds, memo):
+        value = match
+        if templated:
+            try:
+                value = match % target
+            except KeyError:
+                # While doing GenericCheck if key not
+                # present in Target return false
+                return False
+        if literal is not None:
+            return value == literal
+
+        key = (kind, value)
+        result = memo.get(key)
+        if result is None:
+            try:
+                result = value == six.text_type(creds[kind])
+            except KeyError:
+                result = False
+            memo[key] = result
+        return result
+    return generic_check
+
+
+def _get_compiled_rule(action):
+    global _COMPILED
+    global _COMPILED_FROM
+    rules = _ENFORCER.rules
+    if rules is not _COMPILED_FROM:
+        # The rules have been loaded again since they were compiled.
+        _COMPILED = {}
+        _COMPILED_FROM = rules
+    return _compile_rule(action, rules, _COMPILED, frozenset())
+
+
 def enforce(credentials, action, target, do_raise=True):
     """Verifies that the action is valid on the target in this context.
 
@@ -85,13 +238,16 @@ def enforce(credentials, action, target, do_raise=True):
     """
     init()
 
-    # Add the exception arguments if asked to do a raise
-    extra = {}
-    if do_raise:
-        extra.update(exc=exception.ForbiddenAction, action=action,
-                     do_raise=do_raise)
+    if _ENFORCER.rules:
+        result = _get_compiled_rule(action)(target, credentials, {})
+    else:
+        # No rules to reference means we're going to fail closed
+        result = False
+
+    if do_raise and not result:
+        raise exception.ForbiddenAction(action=action)
 
-    return _ENFORCER.enforce(action, target, credentials, **extra)
+    return result
 
 
 class Policy(policy.Driver):
@@ -333,6 +333,8 @@ class TestCase(BaseTestCase):
         self.config_fixture.config(public_workers=2)
         self.config_fixture.config(admin_workers=2)
         self.config_fixture.config(policy_file=dirs.etc('policy.json'))
+        # Tests rewrite the policy file and expect the change to be seen.
+        self.config_fixture.config(group='policy', file_check_interval=0)
         self.config_fixture.config(
             group='auth',
             methods=['keystone.auth.plugins.external.DefaultDomain',
@@ -95,10 +95,14 @@ def _match_query(query, attrs):
     """
     # cut off the parentheses
     inner = query[1:-1]
-    if inner.startswith(('&', '|')):
-        # cut off the & or |
+    if inner.startswith('&'):
+        # cut off the &
         groups = _paren_groups(inner[1:])
         return all(_match_query(group, attrs) for group in groups)
+    if inner.startswith('|'):
+        # cut off the |
+        groups = _paren_groups(inner[1:])
+        return any(_match_query(group, attrs) for group in groups)
     if inner.startswith('!'):
         # cut off the ! and the nested parentheses
         return not _match_query(query[2:-1], attrs)
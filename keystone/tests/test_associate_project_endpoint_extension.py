@@ -15,6 +15,8 @@
 import copy
 import uuid
 
+import mock
+
 # NOTE(morganfainberg): import endpoint filter to populate the SQL model
 from keystone.contrib import endpoint_filter  # flake8: noqa
 from keystone.tests import test_v3
@@ -489,3 +491,58 @@ class AssociateProjectEndpointFilterTokenRequestTestCase(TestExtensionCase):
         endpoints = r.result['token']['catalog'][0]['endpoints']
         endpoint_ids = [ep['id'] for ep in endpoints]
         self.assertEqual([self.endpoint_id], endpoint_ids)
+
+    def _get_catalog_endpoints(self):
+        auth_data = self.build_authentication_request(
+            user_id=self.user['id'],
+            password=self.user['password'],
+            project_id=self.project['id'])
+        r = self.post('/auth/tokens', body=auth_data)
+        return dict((ep['id'], ep) for service in r.result['token']['catalog']
+                    for ep in service['endpoints'])
+
+    def test_catalog_loaded_without_endpoint_lookups(self):
+        self.put('/OS-EP-FILTER/projects/%(project_id)s'
+                 '/endpoints/%(endpoint_id)s' % {
+                     'project_id': self.project['id'],
+                     'endpoint_id': self.endpoint_id},
+                 expected_status=204)
+
+        driver = self.catalog_api.driver
+        with mock.patch.object(driver, 'get_endpoint') as get_endpoint:
+            with mock.patch.object(driver, 'get_service') as get_service:
+                endpoints = self._get_catalog_endpoints()
+        self.assertEqual([self.endpoint_id], list(endpoints))
+        self.assertFalse(get_endpoint.called)
+        self.assertFalse(get_service.called)
+
+    def test_cached_catalog_invalidated(self):
+        self.put('/OS-EP-FILTER/projects/%(project_id)s'
+                 '/endpoints/%(endpoint_id)s' % {
+                     'project_id': self.project['id'],
+                     'endpoint_id': self.endpoint_id},
+                 expected_status=204)
+        self.assertEqual([self.endpoint_id],
+                         list(self._get_catalog_endpoints()))
+
+        # associating an endpoint
+        endpoint_id2 = uuid.uuid4().hex
+        endpoint2 = self.new_endpoint_ref(service_id=self.service_id)
+        endpoint2['id'] = endpoint_id2
+        self.catalog_api.create_endpoint(endpoint_id2, endpoint2.copy())
+        self.endpoint_filter_api.add_endpoint_to_project(endpoint_id2,
+                                                         self.project['id'])
+        self.assertEqual(set([self.endpoint_id, endpoint_id2]),
+                         set(self._get_catalog_endpoints()))
+
+        # updating an endpoint
+        url = 'http://%s' % uuid.uuid4().hex
+        self.catalog_api.update_endpoint(endpoint_id2, {'url': url})
+        self.assertEqual(url, self._get_catalog_endpoints()[endpoint_id2]
+                         ['url'])
+
+        # removing an association
+        self.endpoint_filter_api.remove_endpoint_from_project(
+            endpoint_id2, self.project['id'])
+        self.assertEqual([self.endpoint_id],
+                         list(self._get_catalog_endpoints()))
@@ -548,6 +548,88 @@ class IdentityTests(object):
              'role_id': 'admin'},
             assignment_list)
 
+    def test_list_role_assignments_filtered(self):
+        """Test for listing role assignments filtered by hints.
+
+        Test Plan:
+
+        - Create a domain, with a user, two groups & a project
+        - Create a grant of each type (user/group on project/domain)
+        - Check that filtering by actor, target and role, including a
+          filter on a list of groups, only returns the matching assignments
+
+        """
+        new_domain = {'id': uuid.uuid4().hex, 'name': uuid.uuid4().hex}
+        self.assignment_api.create_domain(new_domain['id'], new_domain)
+        new_user = {'name': uuid.uuid4().hex, 'password': uuid.uuid4().hex,
+                    'enabled': True, 'domain_id': new_domain['id']}
+        new_user = self.identity_api.create_user(new_user)
+        new_group = {'domain_id': new_domain['id'], 'name': uuid.uuid4().hex}
+        new_group = self.identity_api.create_group(new_group)
+        new_group2 = {'domain_id': new_domain['id'], 'name': uuid.uuid4().hex}
+        new_group2 = self.identity_api.create_group(new_group2)
+        new_project = {'id': uuid.uuid4().hex,
+                       'name': uuid.uuid4().hex,
+                       'domain_id': new_domain['id']}
+        self.assignment_api.create_project(new_project['id'], new_project)
+
+        self.assignment_api.create_grant(user_id=new_user['id'],
+                                         domain_id=new_domain['id'],
+                                         role_id='member')
+        self.assignment_api.create_grant(user_id=new_user['id'],
+                                         project_id=new_project['id'],
+                                         role_id='other')
+        self.assignment_api.create_grant(group_id=new_group['id'],
+                                         domain_id=new_domain['id'],
+                                         role_id='admin')
+        self.assignment_api.create_grant(group_id=new_group2['id'],
+                                         project_id=new_project['id'],
+                                         role_id='admin')
+
+        def list_role_assignments(**filters):
+            hints = driver_hints.Hints()
+            for name, value in six.iteritems(filters):
+                hints.add_filter(name, value)
+            return self.assignment_api.list_role_assignments(hints)
+
+        assignment_list = list_role_assignments(user_id=new_user['id'])
+        self.assertEqual(2, len(assignment_list))
+        self.assertIn(
+            {'user_id': new_user['id'], 'domain_id': new_domain['id'],
+             'role_id': 'member'},
+            assignment_list)
+        self.assertIn(
+            {'user_id': new_user['id'], 'project_id': new_project['id'],
+             'role_id': 'other'},
+            assignment_list)
+
+        assignment_list = list_role_assignments(
+            group_id=[new_group['id'], new_group2['id']])
+        self.assertEqual(2, len(assignment_list))
+        self.assertIn(
+            {'group_id': new_group['id'], 'domain_id': new_domain['id'],
+             'role_id': 'admin'},
+            assignment_list)
+        self.assertIn(
+            {'group_id': new_group2['id'], 'project_id': new_project['id'],
+             'role_id': 'admin'},
+            assignment_list)
+
+        assignment_list = list_role_assignments(project_id=new_project['id'],
+                                                role_id='admin')
+        self.assertEqual(
+            [{'group_id': new_group2['id'], 'project_id': new_project['id'],
+              'role_id': 'admin'}],
+            assignment_list)
+
+        assignment_list = list_role_assignments(domain_id=new_domain['id'],
+                                                inherited_to_projects=False,
+                                                user_id=new_user['id'])
+        self.assertEqual(
+            [{'user_id': new_user['id'], 'domain_id': new_domain['id'],
+              'role_id': 'member'}],
+            assignment_list)
+
     def test_list_role_assignments_bad_role(self):
         assignment_list = self.assignment_api.list_role_assignments_for_role(
             role_id=uuid.uuid4().hex)
@@ -609,6 +691,57 @@ class IdentityTests(object):
         self.assertEqual(set(role_list),
                          set([r['id'] for r in role_ref_list]))
 
+    def test_get_roles_for_user_and_project_with_many_groups(self):
+        """Test the roles of a user in many groups are read in one call.
+
+        Test Plan:
+
+        - Create a user, a project & five groups, add the user to each group
+        - Grant a different role to each group on the project, and one more
+          role directly to the user
+        - Check the roles are as expected, and were resolved with a single
+          call to the driver
+
+        """
+        user_ref = {'name': uuid.uuid4().hex,
+                    'domain_id': DEFAULT_DOMAIN_ID,
+                    'password': uuid.uuid4().hex,
+                    'enabled': True}
+        user_ref = self.identity_api.create_user(user_ref)
+
+        project_ref = {'id': uuid.uuid4().hex,
+                       'name': uuid.uuid4().hex,
+                       'domain_id': DEFAULT_DOMAIN_ID}
+        self.assignment_api.create_project(project_ref['id'], project_ref)
+
+        role_ids = []
+        for i in range(6):
+            role_ref = {'id': uuid.uuid4().hex, 'name': uuid.uuid4().hex}
+            self.assignment_api.create_role(role_ref['id'], role_ref)
+            role_ids.append(role_ref['id'])
+
+        for role_id in role_ids[:5]:
+            group = {'name': uuid.uuid4().hex,
+                     'domain_id': DEFAULT_DOMAIN_ID}
+            group_id = self.identity_api.create_group(group)['id']
+            self.identity_api.add_user_to_group(user_ref['id'], group_id)
+            self.assignment_api.create_grant(group_id=group_id,
+                                             project_id=project_ref['id'],
+                                             role_id=role_id)
+        self.assignment_api.add_role_to_user_and_project(
+            user_id=user_ref['id'],
+            tenant_id=project_ref['id'],
+            role_id=role_ids[5])
+
+        driver = self.assignment_api.driver
+        with mock.patch.object(driver, 'get_roles_for_actors',
+                               wraps=driver.get_roles_for_actors) as m:
+            role_list = self.assignment_api.get_roles_for_user_and_project(
+                user_id=user_ref['id'],
+                tenant_id=project_ref['id'])
+        self.assertEqual(set(role_ids), set(role_list))
+        self.assertEqual(1, m.call_count)
+
     def test_get_role_by_user_and_project(self):
         roles_ref = self.assignment_api.get_roles_for_user_and_project(
             self.user_foo['id'], self.tenant_bar['id'])
@@ -2385,6 +2518,20 @@ class IdentityTests(object):
                           self.identity_api.get_group,
                           group['id'])
 
+    def test_get_groups(self):
+        group_ids = []
+        for _ in range(3):
+            group = {'domain_id': DEFAULT_DOMAIN_ID,
+                     'name': uuid.uuid4().hex}
+            group_ids.append(self.identity_api.create_group(group)['id'])
+
+        # unknown ids are left out of the result
+        groups = self.identity_api.get_groups(group_ids[:2] +
+                                              [uuid.uuid4().hex])
+        self.assertEqual(set(group_ids[:2]),
+                         set(group['id'] for group in groups))
+        self.assertEqual([], self.identity_api.get_groups([]))
+
     def test_create_duplicate_group_name_fails(self):
         group1 = {'domain_id': DEFAULT_DOMAIN_ID, 'name': uuid.uuid4().hex}
         group2 = {'domain_id': DEFAULT_DOMAIN_ID, 'name': group1['name']}
@@ -2986,6 +3133,17 @@ class TokenTests(object):
         self.assertRaises(exception.TokenNotFound,
                           self.token_api.delete_token, token_id)
 
+    def test_create_token_keeps_data(self):
+        token_id = self._create_token_id()
+        data = {'a': 'b', 'trust_id': None,
+                'user': {'id': 'testuserid'}}
+        data_ref = self.token_api.create_token(token_id, data)
+        # Only the token reference is completed, not the given data
+        self.assertIn('expires', data_ref)
+        self.assertIn('user_id', data_ref)
+        self.assertEqual({'a': 'b', 'trust_id': None,
+                          'user': {'id': 'testuserid'}}, data)
+
     def create_token_sample_data(self, token_id=None, tenant_id=None,
                                  trust_id=None, user_id=None, expires=None):
         if token_id is None:
@@ -14,6 +14,7 @@
 import datetime
 import uuid
 
+import mock
 import six
 
 from keystone import exception
@@ -92,68 +93,152 @@ class KvsToken(tests.TestCase, test_backend.TokenTests):
         self.assertRaises(exception.NotImplemented,
                           self.token_api.flush_expired_tokens)
 
-    def _update_user_token_index_direct(self, user_key, token_id, new_data):
-        token_list = self.token_api.driver._get_user_token_list_with_expiry(
-            user_key)
-        # Update the user-index so that the expires time is _actually_ expired
-        # since we do not do an explicit get on the token, we only reference
-        # the data in the user index (to save extra round-trips to the kvs
-        # backend).
-        for i, data in enumerate(token_list):
-            if data[0] == token_id:
-                token_list[i] = new_data
-                break
-        self.token_api.driver._store.set(user_key, token_list)
-
-    def test_cleanup_user_index_on_create(self):
+    def _token_expires(self, hours):
+        return timeutils.normalize_time(
+            timeutils.utcnow() + datetime.timedelta(hours=hours))
+
+    def test_user_tokens_bucketed_by_expiry_hour(self):
+        self.config_fixture.config(group='token', expiration=4 * 3600)
+        user_id = six.text_type(uuid.uuid4().hex)
+        driver = self.token_api.driver
+        expires = [self._token_expires(1), self._token_expires(3),
+                   self._token_expires(3)]
+        token_ids = [self.create_token_sample_data(user_id=user_id,
+                                                   expires=e)[0]
+                     for e in expires]
+
+        buckets = [driver._expiry_bucket(e) for e in expires]
+        self.assertEqual(
+            [(token_ids[0], timeutils.isotime(expires[0], subsecond=True))],
+            driver._store.get(driver._prefix_user_bucket(user_id,
+                                                         buckets[0])))
+        self.assertEqual(
+            [(token_ids[1], timeutils.isotime(expires[1], subsecond=True)),
+             (token_ids[2], timeutils.isotime(expires[2], subsecond=True))],
+            driver._store.get(driver._prefix_user_bucket(user_id,
+                                                         buckets[1])))
+        self.assertEqual(set(token_ids),
+                         set(driver._list_tokens(user_id)))
+
+    def test_list_tokens_reads_buckets_in_single_call(self):
+        self.config_fixture.config(group='token', expiration=4 * 3600)
+        user_id = six.text_type(uuid.uuid4().hex)
+        driver = self.token_api.driver
+        token_id = self.create_token_sample_data(
+            user_id=user_id, expires=self._token_expires(3))[0]
+        with mock.patch.object(driver._store, 'get_multi_or_default',
+                               wraps=driver._store.get_multi_or_default
+                               ) as get_multi:
+            self.assertEqual([token_id], driver._list_tokens(user_id))
+        keys = get_multi.call_args[0][0]
+        # NOTE: the single list of the user and one bucket per hour from the
+        # current hour up to the expiration of a new token.
+        self.assertEqual(driver._prefix_user_id(user_id), keys[0])
+        self.assertEqual(6, len(keys))
+
+    def test_list_tokens_after_keys_expire(self):
+        # NOTE: memcache expires every key but the revocation list once the
+        # token expiration has passed since it was last written, mimic it by
+        # dropping the keys of the in memory backend not written since.
+        self.config_fixture.config(group='token', expiration=7200)
+        driver = self.token_api.driver
+        backend = driver._store._region.backend
+        written = {}
+        real_set = backend.set
+
+        def set_and_record(key, value):
+            written[key] = timeutils.utcnow()
+            real_set(key, value)
+
+        def expire_keys():
+            oldest = timeutils.utcnow() - datetime.timedelta(seconds=7200)
+            for key, when in list(written.items()):
+                if when < oldest:
+                    backend.delete(key)
+                    del written[key]
+
+        set_patch = mock.patch.object(backend, 'set', set_and_record)
+        set_patch.start()
+        self.addCleanup(set_patch.stop)
+        timeutils.set_time_override(datetime.datetime(2014, 1, 1, 0, 0))
+        self.addCleanup(timeutils.clear_time_override)
+        user_id = six.text_type(uuid.uuid4().hex)
+
+        expired_token_id = self.create_token_sample_data(
+            user_id=user_id)[0]
+        timeutils.advance_time_delta(datetime.timedelta(minutes=30))
+        token_id = self.create_token_sample_data(user_id=user_id)[0]
+
+        # the first token of the bucket has expired with its keys, the bucket
+        # lives on as long as the last token written to it.
+        timeutils.advance_time_delta(datetime.timedelta(minutes=105))
+        expire_keys()
+        self.assertRaises(exception.TokenNotFound,
+                          driver.get_token, expired_token_id)
+        self.assertEqual([token_id], driver._list_tokens(user_id))
+
+    def test_create_token_does_not_read_revocation_list(self):
+        user_id = six.text_type(uuid.uuid4().hex)
+        driver = self.token_api.driver
+        revoked_id = self.create_token_sample_data(user_id=user_id)[0]
+        self.token_api.delete_token(revoked_id)
+        with mock.patch.object(driver, 'list_revoked_tokens') as list_revoked:
+            token_id = self.create_token_sample_data(user_id=user_id)[0]
+        self.assertFalse(list_revoked.called)
+        # NOTE: the revoked token stays in its bucket until the bucket
+        # expires, but it is not listed anymore.
+        self.assertEqual([token_id], driver._list_tokens(user_id))
+
+    def test_expired_buckets_removed_on_new_bucket(self):
+        user_id = six.text_type(uuid.uuid4().hex)
+        driver = self.token_api.driver
+        old_expires = self._token_expires(1)
+        old_token_id = self.create_token_sample_data(
+            user_id=user_id, expires=old_expires)[0]
+        old_bucket_key = driver._prefix_user_bucket(
+            user_id, driver._expiry_bucket(old_expires))
+
+        later = old_expires + datetime.timedelta(hours=1)
+        new_expires = later + datetime.timedelta(hours=1)
+        with mock.patch.object(driver, '_get_current_time',
+                               return_value=later):
+            # the old bucket is only skipped until a new bucket is created
+            self.assertEqual([], driver._list_tokens(user_id))
+            self.assertIsNotNone(driver._store.get(old_bucket_key))
+
+            new_token_id = self.create_token_sample_data(
+                user_id=user_id, expires=new_expires)[0]
+            self.assertRaises(exception.NotFound, driver._store.get,
+                              old_bucket_key)
+            self.assertEqual([new_token_id],
+                             driver._list_tokens(user_id))
+        self.assertNotIn(old_token_id,
+                         driver._list_tokens(user_id))
+
+    def test_list_tokens_includes_single_list_index(self):
         user_id = six.text_type(uuid.uuid4().hex)
-        valid_token_id, data = self.create_token_sample_data(user_id=user_id)
-        expired_token_id, expired_data = self.create_token_sample_data(
-            user_id=user_id)
-
-        expire_delta = datetime.timedelta(seconds=86400)
-
-        # NOTE(morganfainberg): Directly access the data cache since we need to
-        # get expired tokens as well as valid tokens. token_api.list_tokens()
-        # will not return any expired tokens in the list.
-        user_key = self.token_api.driver._prefix_user_id(user_id)
-        user_token_list = self.token_api.driver._store.get(user_key)
-        valid_token_ref = self.token_api.get_token(valid_token_id)
-        expired_token_ref = self.token_api.get_token(expired_token_id)
-        expected_user_token_list = [
-            (valid_token_id, timeutils.isotime(valid_token_ref['expires'],
-                                               subsecond=True)),
-            (expired_token_id, timeutils.isotime(expired_token_ref['expires'],
-                                                 subsecond=True))]
-        self.assertEqual(expected_user_token_list, user_token_list)
-        new_expired_data = (expired_token_id,
-                            timeutils.isotime(
-                                (timeutils.utcnow() - expire_delta),
-                                subsecond=True))
-        self._update_user_token_index_direct(user_key, expired_token_id,
-                                             new_expired_data)
-        valid_token_id_2, valid_data_2 = self.create_token_sample_data(
-            user_id=user_id)
-        valid_token_ref_2 = self.token_api.get_token(valid_token_id_2)
-        expected_user_token_list = [
-            (valid_token_id, timeutils.isotime(valid_token_ref['expires'],
-                                               subsecond=True)),
-            (valid_token_id_2, timeutils.isotime(valid_token_ref_2['expires'],
-                                                 subsecond=True))]
-        user_token_list = self.token_api.driver._store.get(user_key)
-        self.assertEqual(expected_user_token_list, user_token_list)
-
-        # Test that revoked tokens are removed from the list on create.
-        self.token_api.delete_token(valid_token_id_2)
-        new_token_id, data = self.create_token_sample_data(user_id=user_id)
-        new_token_ref = self.token_api.get_token(new_token_id)
-        expected_user_token_list = [
-            (valid_token_id, timeutils.isotime(valid_token_ref['expires'],
-                                               subsecond=True)),
-            (new_token_id, timeutils.isotime(new_token_ref['expires'],
-                                             subsecond=True))]
-        user_token_list = self.token_api.driver._store.get(user_key)
-        self.assertEqual(expected_user_token_list, user_token_list)
+        driver = self.token_api.driver
+        token_id = self.create_token_sample_data(user_id=user_id)[0]
+        token_ref = self.token_api.get_token(token_id)
+        expires = token_ref['expires']
+        # NOTE: tokens issued before the index was split in buckets are only
+        # found in the single list of the user.
+        driver._store.delete(driver._prefix_user_bucket(
+            user_id, driver._expiry_bucket(expires)))
+        legacy_key = driver._prefix_user_id(user_id)
+        driver._store.set(legacy_key,
+                          [(token_id, timeutils.isotime(expires,
+                                                        subsecond=True))])
+        self.assertEqual([token_id], driver._list_tokens(user_id))
+        self.assertIsNotNone(driver._store.get(legacy_key))
+
+        # the single list is deleted once all of its tokens have expired
+        later = timeutils.normalize_time(expires) + datetime.timedelta(
+            seconds=1)
+        with mock.patch.object(driver, '_get_current_time',
+                               return_value=later):
+            self.assertEqual([], driver._list_tokens(user_id))
+        self.assertRaises(exception.NotFound, driver._store.get, legacy_key)
 
 
 class KvsTrust(tests.TestCase, test_backend.TrustTests):
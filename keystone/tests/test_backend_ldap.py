@@ -425,6 +425,9 @@ class BaseLDAPIdentity(test_backend.IdentityTests):
         after_assignments = len(self.assignment_api.list_role_assignments())
         self.assertEqual(existing_assignments + 2, after_assignments)
 
+    def test_list_role_assignments_filtered(self):
+        self.skipTest('N/A: LDAP does not support multiple domains')
+
     def test_list_role_assignments_dumb_member(self):
         self.config_fixture.config(group='ldap', use_dumb_member=True)
         self.clear_database()
@@ -1611,6 +1614,101 @@ class LDAPIdentityEnabledEmulation(LDAPIdentity):
             "Enabled emulation conflicts with enabled mask")
 
 
+class LDAPIdentityPool(LDAPIdentity):
+    def setUp(self):
+        common_ldap_core._POOLS.clear()
+        self.addCleanup(common_ldap_core._POOLS.clear)
+        super(LDAPIdentityPool, self).setUp()
+
+    def config_overrides(self):
+        super(LDAPIdentityPool, self).config_overrides()
+        self.config_fixture.config(group='ldap',
+                                   use_pool=True,
+                                   use_auth_pool=True,
+                                   pool_retry_delay=0)
+
+    def _pool_stats(self, user=CONF.ldap.user):
+        return common_ldap_core.get_pool_stats()[(CONF.ldap.url, user)]
+
+    def test_pool_reuses_connections(self):
+        common_ldap_core._POOLS.clear()
+        self.identity_api.get_user(self.user_foo['id'])
+        self.identity_api.get_user(self.user_two['id'])
+
+        stats = self._pool_stats()
+        self.assertEqual(1, stats['misses'])
+        self.assertThat(stats['hits'], matchers.GreaterThan(0))
+
+    def test_pool_connection_lifetime(self):
+        self.config_fixture.config(group='ldap', pool_connection_lifetime=0)
+        self.load_backends()
+        common_ldap_core._POOLS.clear()
+        self.identity_api.get_user(self.user_foo['id'])
+        self.identity_api.get_user(self.user_two['id'])
+
+        stats = self._pool_stats()
+        self.assertThat(stats['misses'], matchers.GreaterThan(1))
+        self.assertEqual(0, stats['hits'])
+        self.assertEqual(stats['misses'], stats['discarded'])
+
+    def test_pool_retries_search_when_server_down(self):
+        self.identity_api.get_user(self.user_foo['id'])
+
+        search_s = fakeldap.FakeLdap.search_s
+        calls = []
+
+        def fail_once(conn, *args, **kwargs):
+            calls.append(conn)
+            if len(calls) == 1:
+                raise ldap.SERVER_DOWN
+            return search_s(conn, *args, **kwargs)
+
+        with mock.patch.object(fakeldap.FakeLdap, 'search_s', fail_once):
+            user_ref = self.identity_api.get_user(self.user_two['id'])
+
+        self.assertEqual(self.user_two['id'], user_ref['id'])
+        self.assertIsNot(calls[0], calls[1])
+        self.assertEqual(1, self._pool_stats()['discarded'])
+
+    def test_pool_retries_connect_when_server_down(self):
+        common_ldap_core._POOLS.clear()
+        connect = fakeldap.FakeLdap.connect
+        calls = []
+
+        def fail_once(conn, *args, **kwargs):
+            calls.append(conn)
+            if len(calls) == 1:
+                raise ldap.SERVER_DOWN
+            return connect(conn, *args, **kwargs)
+
+        with mock.patch.object(fakeldap.FakeLdap, 'connect', fail_once):
+            self.identity_api.get_user(self.user_foo['id'])
+
+        self.assertEqual(1, self._pool_stats()['retries'])
+
+    def test_auth_pool_authenticate(self):
+        common_ldap_core._POOLS.clear()
+        for i in range(2):
+            self.identity_api.authenticate(
+                context={},
+                user_id=self.user_foo['id'],
+                password=self.user_foo['password'])
+        self.assertRaises(AssertionError,
+                          self.identity_api.authenticate,
+                          context={},
+                          user_id=self.user_foo['id'],
+                          password=uuid.uuid4().hex)
+        self.identity_api.authenticate(
+            context={},
+            user_id=self.user_foo['id'],
+            password=self.user_foo['password'])
+
+        # A failed bind gives the connection back to the pool as well.
+        stats = self._pool_stats(user=None)
+        self.assertEqual(1, stats['misses'])
+        self.assertEqual(3, stats['hits'])
+
+
 class LdapIdentitySqlAssignment(BaseLDAPIdentity, tests.SQLDriverOverrides,
                                 tests.TestCase):
 
@@ -13,6 +13,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
 import uuid
 
 import mock
@@ -22,9 +23,12 @@ import sqlalchemy
 from sqlalchemy import exc
 
 from keystone.common import sql
+from keystone.common import utils
 from keystone import config
 from keystone import exception
+from keystone import identity
 from keystone.identity.backends import sql as identity_sql
+from keystone.openstack.common import timeutils
 from keystone import tests
 from keystone.tests import default_fixtures
 from keystone.tests.ksfixtures import database
@@ -127,6 +131,33 @@ class SqlIdentity(SqlTests, test_backend.IdentityTests):
         user_ref = self.identity_api._get_user(session, self.user_foo['id'])
         self.assertNotEqual(user_ref['password'], self.user_foo['password'])
 
+    def test_authenticate_with_verified_password_cache(self):
+        self.config_fixture.config(group='identity',
+                                   verified_password_cache_size=10)
+        identity._VERIFIED_PASSWORDS.clear()
+        self.addCleanup(identity._VERIFIED_PASSWORDS.clear)
+        password = uuid.uuid4().hex
+        user = {'name': uuid.uuid4().hex,
+                'domain_id': DEFAULT_DOMAIN_ID,
+                'password': password}
+        user = self.identity_api.create_user(user)
+        new_password = uuid.uuid4().hex
+
+        with mock.patch.object(utils, 'check_password',
+                               wraps=utils.check_password) as check_password:
+            for _ in range(2):
+                self.identity_api.authenticate({}, user['id'], password)
+            self.assertEqual(1, check_password.call_count)
+
+            self.identity_api.update_user(user['id'],
+                                          {'password': new_password})
+            self.assertRaises(AssertionError,
+                              self.identity_api.authenticate,
+                              {}, user['id'], password)
+            self.identity_api.authenticate({}, user['id'], new_password)
+        self.assertEqual(1, identity.get_verified_passwords().get_stats()[
+            'size'])
+
     def test_delete_user_with_project_association(self):
         user = {'name': uuid.uuid4().hex,
                 'domain_id': DEFAULT_DOMAIN_ID,
@@ -329,40 +360,115 @@ class SqlToken(SqlTests, test_backend.TokenTests):
         mock_query = mock_sql.get_session().query
         mock_query.assert_called_with(*expected_query_args)
 
-    def test_flush_expired_tokens_batch(self):
-        # TODO(dstanek): This test should be rewritten to be less
-        # brittle. The code will likely need to be changed first. I
-        # just copied the spirit of the existing test when I rewrote
-        # mox -> mock. These tests are brittle because they have the
-        # call structure for SQLAlchemy encoded in them.
-
-        # test sqlite dialect
-        with mock.patch.object(token_sql, 'sql') as mock_sql:
-            mock_sql.get_session().bind.dialect.name = 'sqlite'
-            tok = token_sql.Token()
-            tok.flush_expired_tokens()
-
-        self.assertFalse(mock_sql.get_session().query().filter().limit.called)
+    def _create_expired_tokens(self, count, expired_for):
+        expires = timeutils.utcnow() - expired_for
+        token_ids = []
+        for _ in range(count):
+            token_id = uuid.uuid4().hex
+            self.token_api.create_token(token_id, {
+                'id': token_id, 'expires': expires, 'trust_id': None,
+                'user': {'id': 'testuserid'}})
+            token_ids.append(token_id)
+        return token_ids
+
+    def _count_tokens(self):
+        session = sql.get_session()
+        return session.query(token_sql.TokenModel).count()
 
-    def test_flush_expired_tokens_batch_ibm_db_sa(self):
-        # TODO(dstanek): This test should be rewritten to be less
-        # brittle. The code will likely need to be changed first. I
-        # just copied the spirit of the existing test when I rewrote
-        # mox -> mock. These tests are brittle because they have the
-        # call structure for SQLAlchemy encoded in them.
+    def test_flush_expired_tokens_batch(self):
+        self._create_expired_tokens(7, datetime.timedelta(minutes=1))
+        tok = token_sql.Token()
+        with mock.patch.object(token_sql, 'time') as mock_time:
+            mock_time.time.return_value = 0
+            deleted = tok.flush_expired_tokens(batch_size=3, batch_delay=1)
+        self.assertEqual(7, deleted)
+        self.assertEqual(0, self._count_tokens())
+        # batches of 3, 3 and 1 tokens
+        self.assertEqual(2, mock_time.sleep.call_count)
+
+    def test_flush_expired_tokens_single_statement(self):
+        self._create_expired_tokens(3, datetime.timedelta(minutes=1))
+        tok = token_sql.Token()
+        self.assertEqual(3, tok.flush_expired_tokens(batch_size=0))
+        self.assertEqual(0, self._count_tokens())
 
-        # test ibm_db_sa
-        with mock.patch.object(token_sql, 'sql') as mock_sql:
-            # NOTE(dstanek): this will allow us to break out of the
-            # 'while True' loop
-            mock_sql.get_session().query().filter().delete.return_value = 0
+    def test_flush_expired_tokens_cutoff(self):
+        self._create_expired_tokens(2, datetime.timedelta(hours=2))
+        recent = self._create_expired_tokens(1, datetime.timedelta(
+            minutes=1))
+        tok = token_sql.Token()
+        expired_before = timeutils.utcnow() - datetime.timedelta(hours=1)
+        deleted = tok.flush_expired_tokens(batch_size=1,
+                                           expired_before=expired_before)
+        self.assertEqual(2, deleted)
+        session = sql.get_session()
+        token_ids = [token_ref.id for token_ref in
+                     session.query(token_sql.TokenModel.id)]
+        self.assertEqual(recent, token_ids)
 
-            mock_sql.get_session().bind.dialect.name = 'ibm_db_sa'
-            tok = token_sql.Token()
-            tok.flush_expired_tokens()
+    def test_flush_expired_tokens_max_runtime(self):
+        self._create_expired_tokens(4, datetime.timedelta(minutes=1))
+        tok = token_sql.Token()
+        # the runtime is exceeded once the first batch is deleted
+        with mock.patch.object(token_sql, 'time') as mock_time:
+            mock_time.time.side_effect = [0, 10]
+            deleted = tok.flush_expired_tokens(batch_size=2, max_runtime=5)
+        self.assertEqual(2, deleted)
+        self.assertEqual(2, self._count_tokens())
+
+    def test_flush_expired_tokens_dialect_batch_size(self):
+        self._create_expired_tokens(3, datetime.timedelta(minutes=1))
+        tok = token_sql.Token()
+        # the batch size of the dialect is used by default, as for DB2
+        with mock.patch.object(tok, 'token_flush_batch_size',
+                               return_value=2) as mock_batch_size:
+            self.assertEqual(3, tok.flush_expired_tokens())
+        self.assertTrue(mock_batch_size.called)
+        self.assertEqual(0, self._count_tokens())
+
+    def test_token_stored_without_catalog(self):
+        token_id = uuid.uuid4().hex
+        project_id = uuid.uuid4().hex
+        token_data = {'token': {'methods': ['password'],
+                                'project': {'id': project_id},
+                                'catalog': [{'type': 'identity'}]}}
+        data = {'id': token_id, 'user': {'id': 'testuserid'},
+                'tenant': {'id': project_id}, 'trust_id': None,
+                'token_data': token_data, 'token_version': 'v3.0'}
+        self.token_api.create_token(token_id, data)
+
+        token_ref = self.token_api.get_token(token_id)
+        self.assertTrue(token_ref['catalog_omitted'])
+        self.assertNotIn('catalog', token_ref['token_data']['token'])
+        # the given token data is left as it was
+        self.assertIn('catalog', token_data['token'])
 
-        mock_limit = mock_sql.get_session().query().filter().limit
-        mock_limit.assert_called_with(100)
+        session = sql.get_session()
+        token_model = session.query(token_sql.TokenModel).get(token_id)
+        self.assertEqual(project_id, token_model.project_id)
+        self.assertIsNone(token_model.domain_id)
+        self.assertIsNone(token_model.consumer_id)
+
+    def test_delete_tokens_for_consumer(self):
+        def create_token(consumer_id):
+            token_id = uuid.uuid4().hex
+            token_data = {'token': {'methods': ['oauth1'],
+                                    'OS-OAUTH1': {'consumer_id': consumer_id,
+                                                  'access_token_id': 'id'}}}
+            data = {'id': token_id, 'user': {'id': 'testuserid'},
+                    'trust_id': None, 'token_data': token_data,
+                    'token_version': 'v3.0'}
+            self.token_api.create_token(token_id, data)
+            return token_id
+
+        consumer_id = uuid.uuid4().hex
+        token_id = create_token(consumer_id)
+        other_token_id = create_token(uuid.uuid4().hex)
+
+        self.token_api.delete_tokens('testuserid', consumer_id=consumer_id)
+        self.assertRaises(exception.TokenNotFound,
+                          self.token_api.get_token, token_id)
+        self.token_api.get_token(other_token_id)
 
     def test_token_flush_batch_size_default(self):
         tok = token_sql.Token()
@@ -399,6 +505,46 @@ class SqlCatalog(SqlTests, test_backend.CatalogTests):
         catalog = self.catalog_api.get_catalog('fake-user', 'fake-tenant')
         self.assertEqual({}, catalog)
 
+    def test_get_catalog_recompiled_on_change(self):
+        service = {
+            'id': uuid.uuid4().hex,
+            'type': uuid.uuid4().hex,
+            'name': uuid.uuid4().hex,
+        }
+        self.catalog_api.create_service(service['id'], service.copy())
+
+        endpoint = {
+            'id': uuid.uuid4().hex,
+            'region': uuid.uuid4().hex,
+            'interface': 'public',
+            'url': 'http://localhost:$(public_port)s/$(tenant_id)s',
+            'service_id': service['id'],
+        }
+        self.catalog_api.create_endpoint(endpoint['id'], endpoint.copy())
+
+        def get_urls(tenant_id):
+            catalog = self.catalog_api.get_v3_catalog('user', tenant_id)
+            return [e['url'] for s in catalog for e in s['endpoints']]
+
+        self.assertEqual(
+            ['http://localhost:%s/tenant' % CONF.public_port],
+            get_urls('tenant'))
+        self.assertEqual(
+            ['http://localhost:%s/other' % CONF.public_port],
+            get_urls('other'))
+
+        self.catalog_api.update_endpoint(
+            endpoint['id'], {'url': 'http://remote/$(tenant_id)s'})
+        self.assertEqual(['http://remote/tenant'], get_urls('tenant'))
+        catalog = self.catalog_api.get_catalog('user', 'tenant')
+        self.assertEqual('http://remote/tenant',
+                         catalog[endpoint['region']][service['type']]
+                         ['publicURL'])
+
+        self.catalog_api.update_service(service['id'], {'enabled': False})
+        self.assertEqual([], get_urls('tenant'))
+        self.assertEqual({}, self.catalog_api.get_catalog('user', 'tenant'))
+
     def test_get_catalog_with_empty_public_url(self):
         service = {
             'id': uuid.uuid4().hex,
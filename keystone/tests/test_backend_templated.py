@@ -15,6 +15,10 @@
 import os
 import uuid
 
+import mock
+
+from keystone.catalog import core
+from keystone.common import cache
 from keystone import tests
 from keystone.tests import default_fixtures
 from keystone.tests import test_backend
@@ -68,11 +72,34 @@ class TestTemplatedCatalog(tests.TestCase, test_backend.CatalogTests):
         (self.catalog_api.driver.templates
          ['RegionOne']['compute']['adminURL']) = \
             'http://localhost:$(compute_port)s/v1.1/$(tenant)s'
+        # The templates are compiled once per catalog revision.
+        core.bump_catalog_revision()
 
         # the malformed one has been removed
         catalog_ref = self.catalog_api.get_catalog('foo', 'bar')
         self.assertEqual(1, len(catalog_ref['RegionOne']))
 
+    def test_get_catalog_compiled_once(self):
+        self.catalog_api.get_catalog('foo', 'bar')
+        with mock.patch.object(core, 'UrlTemplate') as url_template:
+            catalog_ref = self.catalog_api.get_catalog('foo', 'baz')
+        self.assertFalse(url_template.called)
+        self.assertEqual('http://localhost:8774/v1.1/baz',
+                         catalog_ref['RegionOne']['compute']['publicURL'])
+
+    def test_get_catalog_compiled_again_once_revision_expires(self):
+        self.config_fixture.config(group='catalog', cache_time=600)
+        revision = core.get_catalog_revision()
+        self.catalog_api.get_catalog('foo', 'bar')
+        # an expired revision is replaced by a new one, as it is for a
+        # process which does not share the cache backend of the others
+        cache.REGION.delete(core._REVISION_KEY)
+        self.assertNotEqual(revision, core.get_catalog_revision())
+        with mock.patch.object(core, 'UrlTemplate',
+                               wraps=core.UrlTemplate) as url_template:
+            self.catalog_api.get_catalog('foo', 'bar')
+        self.assertTrue(url_template.called)
+
     def test_get_catalog_endpoint_disabled(self):
         self.skipTest("Templated backend doesn't have disabled endpoints")
 
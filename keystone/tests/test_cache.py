@@ -16,6 +16,7 @@ import copy
 
 from dogpile.cache import api
 from dogpile.cache import proxy
+import mock
 
 from keystone.common import cache
 from keystone import config
@@ -244,3 +245,47 @@ class CacheNoopBackendTest(tests.TestCase):
         # Delete should not raise exceptions
         self.region.delete(single_key)
         self.region.delete_multi(multi_values.keys())
+
+
+class LRUCacheTest(tests.TestCase):
+    def test_get_set_delete(self):
+        lru = cache.LRUCache(maxsize=2, ttl=60)
+        self.assertIs(api.NO_VALUE, lru.get('a'))
+        lru.set('a', 1)
+        self.assertEqual(1, lru.get('a'))
+        lru.delete('a')
+        self.assertIs(api.NO_VALUE, lru.get('a'))
+
+    def test_least_recently_used_evicted(self):
+        lru = cache.LRUCache(maxsize=2, ttl=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(1, lru.get('a'))
+        self.assertIs(api.NO_VALUE, lru.get('b'))
+        self.assertEqual(3, lru.get('c'))
+
+    def test_value_expires(self):
+        lru = cache.LRUCache(maxsize=2, ttl=60)
+        with mock.patch('time.time', return_value=1000):
+            lru.set('a', 1)
+        with mock.patch('time.time', return_value=1059):
+            self.assertEqual(1, lru.get('a'))
+        with mock.patch('time.time', return_value=1060):
+            self.assertIs(api.NO_VALUE, lru.get('a'))
+
+    def test_disabled(self):
+        lru = cache.LRUCache(maxsize=0, ttl=60)
+        lru.set('a', 1)
+        self.assertIs(api.NO_VALUE, lru.get('a'))
+
+    def test_stats(self):
+        lru = cache.LRUCache(maxsize=2, ttl=60)
+        lru.set('a', 1)
+        lru.get('a')
+        lru.get('b')
+        stats = lru.get_stats()
+        self.assertEqual(1, stats['size'])
+        self.assertEqual(2, stats['maxsize'])
+        self.assertEqual(0.5, stats['hit_ratio'])
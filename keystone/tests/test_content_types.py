@@ -1209,6 +1209,47 @@ class JsonTestCase(RestfulTestCase, CoreApiTests, LegacyV2UsernameTests):
             expected_status=200)
         self.assertValidRevocationListResponse(r)
 
+    def test_fetch_revocation_list_not_modified(self):
+        token = self.get_scoped_token()
+        r = self.admin_request(
+            method='GET',
+            path='/v2.0/tokens/revoked',
+            token=token,
+            expected_status=200)
+        etag = r.headers['ETag']
+
+        r = self.admin_request(
+            method='GET',
+            path='/v2.0/tokens/revoked',
+            token=token,
+            headers={'If-None-Match': etag},
+            expected_status=304)
+        self.assertEqual(etag, r.headers['ETag'])
+        self.assertFalse(r.body)
+
+    def test_fetch_revocation_list_modified_after_revoke(self):
+        token1 = self.get_scoped_token()
+        r = self.admin_request(
+            method='GET',
+            path='/v2.0/tokens/revoked',
+            token=token1,
+            expected_status=200)
+        etag = r.headers['ETag']
+
+        token2 = self.get_scoped_token()
+        self.admin_request(method='DELETE',
+                           path='/v2.0/tokens/%s' % token2,
+                           token=token1)
+
+        r = self.admin_request(
+            method='GET',
+            path='/v2.0/tokens/revoked',
+            token=token1,
+            headers={'If-None-Match': etag},
+            expected_status=200)
+        self.assertNotEqual(etag, r.headers['ETag'])
+        self.assertValidRevocationListResponse(r)
+
     def assertValidRevocationListResponse(self, response):
         self.assertIsNotNone(response.result['signed'])
 
@@ -1391,6 +1432,12 @@ class RevokeApiJsonTestCase(JsonTestCase):
     def test_fetch_revocation_list_sha256(self):
         self.skipTest('Revoke API disables revocation_list.')
 
+    def test_fetch_revocation_list_not_modified(self):
+        self.skipTest('Revoke API disables revocation_list.')
+
+    def test_fetch_revocation_list_modified_after_revoke(self):
+        self.skipTest('Revoke API disables revocation_list.')
+
 
 class XmlTestCase(RestfulTestCase, CoreApiTests, LegacyV2UsernameTests):
     xmlns = 'http://docs.openstack.org/identity/api/v2.0'
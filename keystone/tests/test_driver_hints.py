@@ -60,3 +60,13 @@ class ListHintsTests(test.TestCase):
         hints.set_limit(10, truncated=True)
         self.assertEqual(10, hints.limit['limit'])
         self.assertTrue(hints.limit['truncated'])
+
+    def test_markers(self):
+        hints = driver_hints.Hints()
+        self.assertIsNone(hints.marker)
+        hints.set_marker('abc')
+        self.assertEqual('abc', hints.marker['marker'])
+        self.assertFalse(hints.marker['applied'])
+        hints.set_marker('abc', applied=True)
+        self.assertEqual('abc', hints.marker['marker'])
+        self.assertTrue(hints.marker['applied'])
@@ -257,6 +257,20 @@ class KVSTest(tests.TestCase):
         # Second delete should raise NotFound
         self.assertRaises(exception.NotFound, kvs.delete, key=self.key_bar)
 
+    def test_kvs_memory_values_isolated(self):
+        kvs = self._get_kvs_region()
+        kvs.configure('openstack.kvs.Memory')
+
+        value = {'nested': {'data': self.value_foo}}
+        kvs.set(self.key_bar, value)
+        value['nested']['data'] = self.value_bar
+        # Changes made after .set or to a returned value are not stored
+        returned_value = kvs.get(self.key_bar)
+        self.assertEqual(self.value_foo, returned_value['nested']['data'])
+        returned_value['nested']['data'] = self.value_bar
+        self.assertEqual(self.value_foo,
+                         kvs.get(self.key_bar)['nested']['data'])
+
     def _kvs_multi_get_set_delete(self, kvs):
         keys = [self.key_foo, self.key_bar]
         expected = [self.value_foo, self.value_bar]
@@ -276,6 +290,11 @@ class KVSTest(tests.TestCase):
         # Make sure get_multi raises NotFound if one of the keys isn't found
         kvs.set(self.key_foo, self.value_foo)
         self.assertRaises(exception.NotFound, kvs.get_multi, keys=keys)
+        # Make sure get_multi_or_default returns the default in its place
+        self.assertEqual([self.value_foo, None],
+                         kvs.get_multi_or_default(keys))
+        self.assertEqual([self.value_foo, []],
+                         kvs.get_multi_or_default(keys, default=[]))
 
     def test_kvs_multi_get_set_delete(self):
         kvs = self._get_kvs_region()
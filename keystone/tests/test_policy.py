@@ -14,6 +14,7 @@
 #    under the License.
 
 import json
+import os
 import tempfile
 
 import mock
@@ -206,6 +207,81 @@ class DefaultPolicyTestCase(tests.TestCase):
                           self.credentials, "example:noexist", {})
 
 
+class CompiledPolicyTestCase(tests.TestCase):
+    def setUp(self):
+        super(CompiledPolicyTestCase, self).setUp()
+        rules.reset()
+        self.addCleanup(rules.reset)
+        rules.init()
+
+    def config_overrides(self):
+        super(CompiledPolicyTestCase, self).config_overrides()
+        self.config_fixture.config(
+            policy_file=tests.dirs.etc('policy.v3cloudsample.json'))
+
+    def test_compiled_rules_match_enforcer(self):
+        enforcer = common_policy.Enforcer()
+        enforcer.set_rules(rules._ENFORCER.rules)
+
+        credentials = [
+            {'roles': ['admin'], 'domain_id': 'admin_domain_id',
+             'user_id': 'user', 'project_id': 'project'},
+            {'roles': ['Admin'], 'domain_id': 'domain', 'user_id': 'user'},
+            {'roles': ['member'], 'user_id': 'user',
+             'project_id': 'project'},
+            {'roles': ['service'], 'user_id': 'other'},
+            {'roles': []},
+        ]
+        targets = [
+            {},
+            {'domain_id': 'domain', 'user_id': 'user',
+             'project_id': 'project',
+             'target.token.user_id': 'user',
+             'target.token.user.domain.id': 'domain',
+             'target.user.domain_id': 'domain',
+             'target.project.domain_id': 'domain'},
+        ]
+        for action in rules._ENFORCER.rules:
+            for creds in credentials:
+                for target in targets:
+                    expected = enforcer.enforce(action, target, creds)
+                    actual = rules.enforce(creds, action, target,
+                                           do_raise=False)
+                    self.assertEqual(bool(expected), bool(actual),
+                                     (action, creds, target))
+
+    def test_role_checks_memoized(self):
+        class Roles(list):
+            iterations = 0
+
+            def __iter__(self):
+                Roles.iterations += 1
+                return super(Roles, self).__iter__()
+
+        rules._ENFORCER.set_rules(common_policy.Rules({
+            'example:roles': common_policy.parse_rule(
+                'role:a or role:b or (role:c and role:d) or role:e')}))
+        self.assertFalse(rules.enforce({'roles': Roles(['f'])},
+                                       'example:roles', {}, do_raise=False))
+        self.assertEqual(1, Roles.iterations)
+
+    def test_rules_recompiled_when_set(self):
+        creds = {'roles': ['admin']}
+        rules.enforce(creds, 'identity:create_region', {})
+
+        rules._ENFORCER.set_rules(common_policy.Rules({
+            'identity:create_region': common_policy.parse_rule('!')}))
+        self.assertRaises(exception.ForbiddenAction, rules.enforce,
+                          creds, 'identity:create_region', {})
+
+    def test_policy_file_checked_every_interval(self):
+        self.config_fixture.config(group='policy', file_check_interval=3600)
+        creds = {'roles': ['admin']}
+        with mock.patch.object(os.path, 'getmtime') as getmtime:
+            rules.enforce(creds, 'identity:create_region', {})
+        self.assertFalse(getmtime.called)
+
+
 class PolicyJsonTestCase(tests.TestCase):
 
     def _load_entries(self, filename):
@@ -17,7 +17,10 @@ import uuid
 import mock
 
 from keystone.common import dependency
+from keystone.common import sql
 from keystone import config
+from keystone.contrib.revoke.backends import sql as revoke_sql
+from keystone.contrib.revoke import core as revoke_core
 from keystone.contrib.revoke import model
 from keystone import exception
 from keystone.openstack.common import timeutils
@@ -166,6 +169,85 @@ class RevokeTests(object):
         # should no longer throw an exception
         self.revoke_api.check_token(token_values)
 
+    def test_revoke_matcher_is_kept_between_checks(self):
+        self.revoke_api.revoke_by_user(_new_id())
+        matcher = self.revoke_api._get_revoke_matcher()
+        self.config_fixture.config(group='token', revocation_cache_time=0)
+        with mock.patch.object(self.revoke_api.driver, 'get_events',
+                               return_value=[]) as get_events:
+            self.assertIs(matcher, self.revoke_api._get_revoke_matcher())
+            get_events.assert_called_once_with(last_fetch=mock.ANY)
+
+    def test_revoke_matcher_fetches_only_new_events(self):
+        user_id = _new_id()
+        token_values = _sample_blank_token()
+        token_values['user_id'] = user_id
+        self.revoke_api.check_token(token_values)
+
+        # An event recorded by another process only reaches the matcher by
+        # the incremental fetch.
+        self.config_fixture.config(group='token', revocation_cache_time=0)
+        self.revoke_api.driver.revoke(model.RevokeEvent(user_id=user_id))
+        self.assertRaises(exception.TokenNotFound,
+                          self.revoke_api.check_token,
+                          token_values)
+        self.assertEqual(1, len(self.revoke_api._revoke_heap))
+
+    def test_revoke_matcher_fetches_events_of_other_processes(self):
+        user_id = _new_id()
+        token_values = _sample_blank_token()
+        token_values['user_id'] = user_id
+        self.revoke_api.check_token(token_values)
+        with mock.patch.object(self.revoke_api.driver, 'get_events') as m:
+            self.revoke_api.check_token(token_values)
+        self.assertFalse(m.called)
+
+        # Another process records an event and bumps the shared revision,
+        # which is seen well before revocation_cache_time has passed.
+        self.revoke_api.driver.revoke(model.RevokeEvent(user_id=user_id))
+        revoke_core.bump_revoke_revision()
+        self.assertRaises(exception.TokenNotFound,
+                          self.revoke_api.check_token,
+                          token_values)
+
+    @mock.patch.object(timeutils, 'utcnow')
+    def test_revoke_matcher_prunes_expired_events(self, mock_utcnow):
+        now = datetime.datetime.utcnow()
+        mock_utcnow.return_value = now
+        self.revoke_api.revoke_by_user(_new_id())
+        self.revoke_api._get_revoke_matcher()
+        self.revoke_api.revoke_by_user(_new_id())
+        self.assertEqual(2, len(self.revoke_api._revoke_heap))
+
+        self.config_fixture.config(group='token', revocation_cache_time=0)
+        window = datetime.timedelta(
+            seconds=CONF.token.expiration + CONF.revoke.expiration_buffer)
+        mock_utcnow.return_value = now + window - datetime.timedelta(
+            seconds=10)
+        matcher = self.revoke_api._get_revoke_matcher()
+        self.assertEqual(2, len(self.revoke_api._revoke_heap))
+
+        mock_utcnow.return_value = now + window + datetime.timedelta(
+            microseconds=1)
+        self.assertIs(matcher, self.revoke_api._get_revoke_matcher())
+        self.assertEqual(0, len(self.revoke_api._revoke_heap))
+        self.assertEqual(0, len(matcher))
+
+    def test_revoke_prunes_expired_events_once_per_interval(self):
+        self.config_fixture.config(group='revoke', prune_interval=300)
+        with mock.patch.object(self.revoke_api.driver,
+                               'prune_expired_events') as prune:
+            self.revoke_api.revoke_by_user(_new_id())
+            self.revoke_api.revoke_by_user(_new_id())
+            self.assertEqual(1, prune.call_count)
+
+    def test_revoke_does_not_prune_when_disabled(self):
+        self.config_fixture.config(group='revoke', prune_interval=0)
+        with mock.patch.object(self.revoke_api.driver,
+                               'prune_expired_events') as prune:
+            self.revoke_api.revoke_by_user(_new_id())
+            self.assertFalse(prune.called)
+
 
 class SqlRevokeTests(test_backend_sql.SqlTests, RevokeTests):
     def config_overrides(self):
@@ -178,6 +260,21 @@ class SqlRevokeTests(test_backend_sql.SqlTests, RevokeTests):
             provider='keystone.token.providers.pki.Provider',
             revoke_by_id=False)
 
+    def _count_events(self):
+        session = sql.get_session()
+        return session.query(revoke_sql.RevocationEvent).count()
+
+    def test_get_events_does_not_delete_expired_events(self):
+        event = model.RevokeEvent()
+        event.revoked_at = _past_time()
+        self.revoke_api.driver.revoke(event)
+
+        self.assertEqual(0, len(self.revoke_api.get_events()))
+        self.assertEqual(1, self._count_events())
+
+        self.revoke_api.prune_expired_events()
+        self.assertEqual(0, self._count_events())
+
 
 class KvsRevokeTests(tests.TestCase, RevokeTests):
     def config_overrides(self):
@@ -467,3 +564,48 @@ class RevokeTreeTests(tests.TestCase):
         for event in self.events:
             self.tree.remove_event(event)
         self._assertEmpty(self.tree.revoke_map)
+
+
+class RevokeMatcherTests(RevokeTreeTests):
+    def setUp(self):
+        super(RevokeMatcherTests, self).setUp()
+        self.tree = model.RevokeMatcher()
+
+    def test_cleanup(self):
+        events = self.events
+        self._assertEmpty(self.tree)
+        for i in range(0, 10):
+            # the other helpers record the event themselves
+            events.append(self._revoke_by_user(_new_id()))
+            self._revoke_by_expiration(_new_id(), _future_time())
+            self._revoke_by_project_role_assignment(_new_id(), _new_id())
+            self._revoke_by_domain_role_assignment(_new_id(), _new_id())
+            self._revoke_by_user_and_project(_new_id(), _new_id())
+        self.assertEqual(len(events), len(self.tree))
+
+        for event in self.events:
+            self.tree.remove_event(event)
+        self._assertEmpty(self.tree)
+
+    def test_remove_keeps_other_event_with_same_values(self):
+        user_id = _new_id()
+        token_data = _sample_blank_token()
+        token_data['user_id'] = user_id
+        older = model.RevokeEvent(user_id=user_id)
+        newer = model.RevokeEvent(
+            user_id=user_id,
+            issued_before=older.issued_before + datetime.timedelta(seconds=1))
+        self.tree.add_event(older)
+        self.tree.add_event(newer)
+
+        self.tree.remove_event(newer)
+        self.assertTrue(self.tree.is_revoked(token_data))
+        self.tree.remove_event(older)
+        self.assertFalse(self.tree.is_revoked(token_data))
+
+    def test_is_revoked_many(self):
+        self._revoke_by_user_and_project(self.user_ids[0],
+                                         self.project_ids[0])
+        tokens = self.project_tokens + [self.token_to_revoke]
+        self.assertEqual([True, False, False, True],
+                         self.tree.is_revoked_many(tokens))
@@ -223,3 +223,20 @@ class RevokeExtension(test_sql_upgrade.SqlMigrateBase):
                                 _REVOKE_COLUMN_NAMES)
         self.downgrade(0, repository=self.repo_path)
         self.assertTableDoesNotExist('revocation_event')
+
+    def test_upgrade_adds_issued_before_index(self):
+        self.upgrade(1, repository=self.repo_path)
+        table = utils.get_table(self.engine, 'revocation_event')
+        index_names = [i.name for i in table.indexes]
+        self.assertNotIn('ix_revocation_event_issued_before', index_names)
+
+        self.upgrade(2, repository=self.repo_path)
+        table = utils.get_table(self.engine, 'revocation_event')
+        index_names = [i.name for i in table.indexes]
+        self.assertIn('ix_revocation_event_issued_before', index_names)
+        self.assertIn('ix_revocation_event_revoked_at', index_names)
+
+        self.downgrade(1, repository=self.repo_path)
+        table = utils.get_table(self.engine, 'revocation_event')
+        index_names = [i.name for i in table.indexes]
+        self.assertNotIn('ix_revocation_event_issued_before', index_names)
@@ -30,6 +30,7 @@ WARNING::
 """
 
 import copy
+import datetime
 import json
 import uuid
 
@@ -1211,6 +1212,79 @@ class SqlUpgradeTests(SqlMigrateBase):
         self.downgrade(50)
         self.assertTableDoesNotExist('id_mapping')
 
+    def test_assignment_target_id_index(self):
+        def get_index_names():
+            meta = sqlalchemy.MetaData()
+            meta.bind = self.engine
+            table = sqlalchemy.Table('assignment', meta, autoload=True)
+            return [index.name for index in table.indexes]
+
+        self.upgrade(51)
+        self.assertNotIn('ix_assignment_target_id', get_index_names())
+        self.upgrade(52)
+        self.assertIn('ix_assignment_target_id', get_index_names())
+        self.downgrade(51)
+        self.assertNotIn('ix_assignment_target_id', get_index_names())
+
+    def test_token_scope_columns(self):
+        def get_token_table():
+            meta = sqlalchemy.MetaData()
+            meta.bind = self.engine
+            return sqlalchemy.Table('token', meta, autoload=True)
+
+        session = self.Session()
+        self.upgrade(52)
+        project_id = uuid.uuid4().hex
+        extra = {'tenant': {'id': project_id},
+                 'token_data': {'access': {'serviceCatalog': []}}}
+        token = {'id': uuid.uuid4().hex,
+                 'expires': datetime.datetime.utcnow() +
+                 datetime.timedelta(hours=1),
+                 'extra': json.dumps(extra),
+                 'valid': True,
+                 'user_id': uuid.uuid4().hex}
+        self.insert_dict(session, 'token', token)
+
+        self.upgrade(53)
+        token_table = get_token_table()
+        self.assertIn('ix_token_project_id',
+                      [index.name for index in token_table.indexes])
+        token_ref = session.query(token_table).filter_by(
+            id=token['id']).one()
+        self.assertEqual(project_id, token_ref.project_id)
+        self.assertIsNone(token_ref.domain_id)
+
+        # a row written compressed is read back as JSON once downgraded
+        compressed = sql.CompressedJsonBlob().process_bind_param(extra, None)
+        token_table.update().where(token_table.c.id == token['id']).values(
+            extra=compressed).execute()
+        self.downgrade(52)
+        token_table = get_token_table()
+        self.assertNotIn('project_id', token_table.c)
+        token_ref = session.query(token_table).filter_by(
+            id=token['id']).one()
+        self.assertEqual(extra, json.loads(token_ref.extra))
+        session.close()
+
+    def test_token_valid_token_indexes(self):
+        def get_index_names():
+            meta = sqlalchemy.MetaData()
+            meta.bind = self.engine
+            table = sqlalchemy.Table('token', meta, autoload=True)
+            return [index.name for index in table.indexes]
+
+        self.upgrade(53)
+        self.assertIn('ix_token_trust_id', get_index_names())
+        self.assertNotIn('ix_token_user_id_valid_expires', get_index_names())
+        self.upgrade(54)
+        self.assertIn('ix_token_user_id_valid_expires', get_index_names())
+        self.assertIn('ix_token_trust_id_valid_expires', get_index_names())
+        self.assertNotIn('ix_token_trust_id', get_index_names())
+        self.downgrade(53)
+        self.assertIn('ix_token_trust_id', get_index_names())
+        self.assertNotIn('ix_token_trust_id_valid_expires',
+                         get_index_names())
+
     def populate_user_table(self, with_pass_enab=False,
                             with_pass_enab_domain=False):
         # Populate the appropriate fields in the user
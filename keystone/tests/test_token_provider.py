@@ -13,6 +13,9 @@
 # under the License.
 
 import datetime
+import uuid
+
+import mock
 
 from keystone import config
 from keystone import exception
@@ -800,6 +803,50 @@ class TestTokenProvider(tests.TestCase):
             self.token_provider_api._is_valid_token(create_v3_token()))
 
 
+class TestTokenProviderLocalCache(tests.TestCase):
+    def setUp(self):
+        super(TestTokenProviderLocalCache, self).setUp()
+        self.load_backends()
+        self.token_id = uuid.uuid4().hex
+        self.driver = mock.Mock()
+        self.driver.validate_v3_token.return_value = create_v3_token()
+        self.driver.get_token_version.return_value = token.provider.V3
+        self.token_provider_api.driver = self.driver
+
+    def config_overrides(self):
+        super(TestTokenProviderLocalCache, self).config_overrides()
+        self.config_fixture.config(group='token',
+                                   provider=token.provider.UUID_PROVIDER,
+                                   local_cache_size=10)
+
+    def _validate_twice(self):
+        # the second validation misses the cache region, so that it must be
+        # served by the local cache to avoid the driver
+        self.token_provider_api.validate_v3_token(self.token_id)
+        self.token_provider_api._validate_v3_token.invalidate(
+            self.token_provider_api, self.token_id)
+        self.token_provider_api.validate_v3_token(self.token_id)
+
+    def test_validation_served_by_local_cache(self):
+        self._validate_twice()
+        self.assertEqual(1, self.driver.validate_v3_token.call_count)
+        stats = self.token_provider_api.get_local_cache_stats()
+        self.assertEqual(1, stats['size'])
+        self.assertEqual(0.5, stats['hit_ratio'])
+
+    def test_invalidation_drops_local_cache(self):
+        self.token_provider_api.validate_v3_token(self.token_id)
+        self.token_provider_api.invalidate_individual_token_cache(
+            self.token_id)
+        self.token_provider_api.validate_v3_token(self.token_id)
+        self.assertEqual(2, self.driver.validate_v3_token.call_count)
+
+    def test_local_cache_disabled(self):
+        self.config_fixture.config(group='token', caching=False)
+        self._validate_twice()
+        self.assertEqual(2, self.driver.validate_v3_token.call_count)
+
+
 class TestTokenProviderOAuth1(tests.TestCase):
     def setUp(self):
         super(TestTokenProviderOAuth1, self).setUp()
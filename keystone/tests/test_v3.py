@@ -16,6 +16,7 @@ import datetime
 import uuid
 
 from lxml import etree
+import mock
 import six
 from testtools import matchers
 
@@ -23,6 +24,7 @@ from keystone import auth
 from keystone.common import authorization
 from keystone.common import cache
 from keystone.common import serializer
+from keystone.common import wsgi
 from keystone import config
 from keystone import exception
 from keystone import middleware
@@ -1206,3 +1208,36 @@ class AuthContextMiddlewareTestCase(RestfulTestCase):
         middleware.AuthContextMiddleware(application).process_request(req)
         self.assertDictEqual(req.environ.get(authorization.AUTH_CONTEXT_ENV),
                              {})
+
+    def test_request_token_kept_by_middleware(self):
+        token = self.get_scoped_token()
+        req = self._mock_request_object(token)
+        application = None
+        middleware.AuthContextMiddleware(application).process_request(req)
+        request_token = req.environ.get(authorization.AUTH_TOKEN_ENV)
+        self.assertEqual(token, request_token.token_id)
+        self.assertEqual(self.token_api.get_token(token),
+                         request_token.token_ref)
+        self.assertIs(req.environ.get(authorization.AUTH_CONTEXT_ENV),
+                      request_token.auth_context)
+
+    def test_request_token_reused(self):
+        token = self.get_scoped_token()
+        req = self._mock_request_object(token)
+        application = None
+        middleware.AuthContextMiddleware(application).process_request(req)
+        context = {'token_id': token, 'environment': req.environ}
+        request_token = req.environ.get(authorization.AUTH_TOKEN_ENV)
+
+        app = wsgi.Application()
+        with mock.patch.object(self.token_api, 'get_token') as get_token:
+            self.assertIs(request_token.token_ref, app._get_token_ref(context))
+            self.assertFalse(get_token.called)
+
+    def test_request_token_for_another_token_ignored(self):
+        token = self.get_scoped_token()
+        req = self._mock_request_object(token)
+        application = None
+        middleware.AuthContextMiddleware(application).process_request(req)
+        context = {'token_id': uuid.uuid4().hex, 'environment': req.environ}
+        self.assertIsNone(authorization.get_request_token(context))
@@ -17,8 +17,10 @@ import json
 import uuid
 
 from keystoneclient.contrib.ec2 import utils as ec2_utils
+import mock
 
 from keystone import config
+from keystone.credential import core as credential_core
 from keystone import exception
 from keystone.tests import test_v3
 
@@ -72,6 +74,21 @@ class CredentialTestCase(CredentialBaseTestCase):
                           self.credential_api.get_credential,
                           credential_id=self.credential_id)
 
+    def test_credential_api_delete_credentials_for_project_cached(self):
+        other_credential = self.new_credential_ref(
+            user_id=self.user['id'], project_id=uuid.uuid4().hex)
+        self.credential_api.create_credential(other_credential['id'],
+                                              other_credential)
+        # seed the cache with both credentials
+        self.credential_api.get_credential(self.credential_id)
+        self.credential_api.get_credential(other_credential['id'])
+
+        self.credential_api.delete_credentials_for_project(self.project_id)
+        self.assertRaises(exception.CredentialNotFound,
+                          self.credential_api.get_credential,
+                          self.credential_id)
+        self.credential_api.get_credential(other_credential['id'])
+
     def test_credential_api_delete_credentials_for_user(self):
         self.credential_api.delete_credentials_for_user(self.user_id)
         # Test that the credential that we created in .setUp no longer exists
@@ -280,7 +297,7 @@ class TestCredentialEc2(CredentialBaseTestCase):
     def setUp(self):
         super(TestCredentialEc2, self).setUp()
 
-    def _validate_signature(self, access, secret):
+    def _validate_signature(self, access, secret, expected_status=200):
         """Test signature validation with the access/secret provided."""
         signer = ec2_utils.Ec2Signer(secret)
         params = {'SignatureMethod': 'HmacSHA256',
@@ -303,8 +320,9 @@ class TestCredentialEc2(CredentialBaseTestCase):
         r = self.post(
             '/ec2tokens',
             body={'ec2Credentials': sig_ref},
-            expected_status=200)
-        self.assertValidTokenResponse(r)
+            expected_status=expected_status)
+        if expected_status == 200:
+            self.assertValidTokenResponse(r)
 
     def test_ec2_credential_signature_validate(self):
         """Test signature validation with a v3 ec2 credential."""
@@ -379,3 +397,38 @@ class TestCredentialEc2(CredentialBaseTestCase):
         self.assertRaises(exception.CredentialNotFound,
                           self.credential_api.get_credential,
                           cred_from_credential_api[0]['id'])
+
+    def test_ec2_credential_lookup_cached(self):
+        ec2_cred = self._get_ec2_cred()
+        self._validate_signature(access=ec2_cred['access'],
+                                 secret=ec2_cred['secret'])
+        with mock.patch.object(
+                self.credential_api.driver, 'get_credential',
+                wraps=self.credential_api.driver.get_credential) as m:
+            self._validate_signature(access=ec2_cred['access'],
+                                     secret=ec2_cred['secret'])
+        self.assertFalse(m.called)
+
+        uri = '/'.join([self._get_ec2_cred_uri(), ec2_cred['access']])
+        self.delete(uri)
+        self._validate_signature(access=ec2_cred['access'],
+                                 secret=ec2_cred['secret'],
+                                 expected_status=401)
+
+    def test_ec2_authorization_cached(self):
+        self.config_fixture.config(group='credential',
+                                   authorization_cache_size=10)
+        credential_core._AUTHORIZATIONS.clear()
+        self.addCleanup(credential_core._AUTHORIZATIONS.clear)
+        ec2_cred = self._get_ec2_cred()
+        for _ in range(2):
+            self._validate_signature(access=ec2_cred['access'],
+                                     secret=ec2_cred['secret'])
+        authorizations = credential_core.get_authorizations()
+        self.assertEqual(1, authorizations.get_stats()['hits'])
+
+        # the snapshots hold the names of the roles
+        role = self.assignment_api.get_role(self.role_id)
+        role['name'] = uuid.uuid4().hex
+        self.assignment_api.update_role(self.role_id, role)
+        self.assertEqual(0, authorizations.get_stats()['size'])
@@ -13,6 +13,8 @@
 import random
 import uuid
 
+import mock
+
 from keystone.auth import controllers as auth_controllers
 from keystone.common import dependency
 from keystone.common import serializer
@@ -40,6 +42,12 @@ class FederationTests(test_v3.RestfulTestCase):
     EXTENSION_NAME = 'federation'
     EXTENSION_TO_ADD = 'federation_extension'
 
+    def setUp(self):
+        super(FederationTests, self).setUp()
+        # NOTE: the groups of the mappings have the same ids in every test
+        mapping_utils._EXISTING_GROUPS.clear()
+        self.addCleanup(mapping_utils._EXISTING_GROUPS.clear)
+
 
 class FederatedIdentityProviderTests(FederationTests):
     """A test class for Identity Providers."""
@@ -496,6 +504,17 @@ class MappingCRUDTests(FederationTests):
         resp = self.get(url)
         self.assertValidMappingResponse(resp, mapping_fixtures.MAPPING_SMALL)
 
+    def test_mapping_update_invalidates_rule_processor(self):
+        url = self.MAPPING_URL + '%(mapping_id)s'
+        resp = self._create_default_mapping_entry()
+        mapping_id = self._get_id_from_response(resp)
+        url = url % {'mapping_id': mapping_id}
+        mapping_utils.get_rule_processor(
+            self.federation_api.get_mapping(mapping_id))
+        self.assertIn(mapping_id, mapping_utils._RULE_PROCESSORS)
+        self.patch(url, body={'mapping': mapping_fixtures.MAPPING_SMALL})
+        self.assertNotIn(mapping_id, mapping_utils._RULE_PROCESSORS)
+
     def test_delete_mapping_dne(self):
         url = self.MAPPING_URL + uuid.uuid4().hex
         self.delete(url, expected_status=404)
@@ -568,6 +587,27 @@ class MappingCRUDTests(FederationTests):
 class MappingRuleEngineTests(FederationTests):
     """A class for testing the mapping rule engine."""
 
+    def test_rule_processor_compiled_once_per_revision(self):
+        mapping = {'id': uuid.uuid4().hex,
+                   'rules': jsonutils.dumps(
+                       mapping_fixtures.MAPPING_LARGE['rules'])}
+        self.addCleanup(mapping_utils.invalidate_rule_processor,
+                        mapping['id'])
+        rp = mapping_utils.get_rule_processor(mapping)
+        self.assertIs(rp, mapping_utils.get_rule_processor(dict(mapping)))
+        self.assertEqual(
+            mapping_utils.RuleProcessor(
+                mapping_fixtures.MAPPING_LARGE['rules']).process(
+                    mapping_fixtures.ADMIN_ASSERTION),
+            rp.process(mapping_fixtures.ADMIN_ASSERTION))
+
+        mapping['rules'] = jsonutils.dumps(
+            mapping_fixtures.MAPPING_SMALL['rules'])
+        new_rp = mapping_utils.get_rule_processor(mapping)
+        self.assertIsNot(rp, new_rp)
+        self.assertEqual(mapping_fixtures.MAPPING_SMALL['rules'],
+                         new_rp.rules)
+
     def test_rule_engine_any_one_of_and_direct_mapping(self):
         """Should return user's name and group id EMPLOYEE_GROUP_ID.
 
@@ -980,6 +1020,25 @@ class FederatedTokenTests(FederationTests):
                           self._issue_unscoped_token,
                           assertion='CONTRACTOR_ASSERTION')
 
+    def test_validate_groups_looks_up_unknown_groups_once(self):
+        group_ids = [self.identity_api.create_group(
+            {'domain_id': self.domain_id, 'name': uuid.uuid4().hex})['id']
+            for _ in range(2)]
+        mapping_id = uuid.uuid4().hex
+        with mock.patch.object(self.identity_api, 'get_groups',
+                               wraps=self.identity_api.get_groups) as m:
+            mapping_utils.validate_groups(group_ids, mapping_id,
+                                          self.identity_api)
+            mapping_utils.validate_groups(group_ids, mapping_id,
+                                          self.identity_api)
+        m.assert_called_once_with(group_ids)
+
+        # a deleted group is looked up again
+        self.identity_api.delete_group(group_ids[0])
+        self.assertRaises(exception.MappedGroupNotFound,
+                          mapping_utils.validate_groups,
+                          group_ids, mapping_id, self.identity_api)
+
     def test_scope_to_domain_once(self):
         r = self.post(self.AUTH_URL,
                       body=self.TOKEN_SCOPE_DOMAIN_A_FROM_CUSTOMER)
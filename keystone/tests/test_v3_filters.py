@@ -415,6 +415,64 @@ class IdentityTestListLimitCase(IdentityTestFilteredCase):
         """
         self._test_entity_list_limit('policy', 'policy')
 
+    def _test_entity_list_paging(self, entity):
+        """GET /<entities>?limit={limit} and the following next links
+
+        Test Plan:
+
+        - For the specified type of entity:
+            - Get all the entities
+            - Page through them 3 at a time, following the next links until
+            - there is none, and check that each entity is seen exactly once,
+            - in order of id
+
+        """
+        if entity == 'policy':
+            plural = 'policies'
+        else:
+            plural = '%ss' % entity
+
+        r = self.get('/%s' % plural, auth=self.auth)
+        expected_ids = sorted(x['id'] for x in r.result.get(plural))
+
+        paged_ids = []
+        url = '/%s?limit=3' % plural
+        while url is not None:
+            r = self.get(url, auth=self.auth)
+            page = r.result.get(plural)
+            self.assertTrue(len(page) <= 3)
+            paged_ids.extend(x['id'] for x in page)
+            url = r.result['links']['next']
+            if url is not None:
+                self.assertIs(r.result.get('truncated'), True)
+                self.assertIn('marker=%s' % page[-1]['id'], url)
+                url = url.split('/v3', 1)[1]
+        self.assertEqual(expected_ids, paged_ids)
+
+    def test_users_list_paging(self):
+        self._test_entity_list_paging('user')
+
+    def test_projects_list_paging(self):
+        self._test_entity_list_paging('project')
+
+    def test_non_driver_list_paging(self):
+        """Check list can be paged through without driver level support."""
+        self._test_entity_list_paging('policy')
+
+    def test_requested_limit_below_list_limit(self):
+        self.config_fixture.config(list_limit=5)
+        r = self.get('/users?limit=3', auth=self.auth)
+        self.assertEqual(3, len(r.result.get('users')))
+        self.assertIs(r.result.get('truncated'), True)
+
+        r = self.get('/users?limit=8', auth=self.auth)
+        self.assertEqual(5, len(r.result.get('users')))
+
+    def test_invalid_limit(self):
+        for limit in ('0', '-1', 'abc'):
+            self.get('/users?limit=%s' % limit, auth=self.auth,
+                     expected_status=400)
+
     def test_no_limit(self):
         """Check truncated attribute not set when list not limited."""
 
@@ -14,6 +14,7 @@
 
 import uuid
 
+import mock
 from oslo.config import cfg
 from testtools import matchers
 
@@ -1089,6 +1090,45 @@ class IdentityTestCase(test_v3.RestfulTestCase):
             role_id=self.role_id)
         self.assertRoleAssignmentInListResponse(r, ud_entity, link_url=gd_url)
 
+    def test_get_effective_role_assignments_for_user(self):
+        """Call ``GET /role_assignments?effective&user.id={user_id}``.
+
+        Test Plan:
+
+        - Create two extra users for tests and add them to a group
+        - Add a role assignment for the group on a domain
+        - Get the effective role assignments of the first user - the group
+          assignment should have turned into an assignment of that user
+          alone, without reading the members of the group
+
+        """
+        self.user1 = self.new_user_ref(
+            domain_id=self.domain['id'])
+        self.user1 = self.identity_api.create_user(self.user1)
+        self.user2 = self.new_user_ref(
+            domain_id=self.domain['id'])
+        self.user2 = self.identity_api.create_user(self.user2)
+        self.identity_api.add_user_to_group(self.user1['id'], self.group['id'])
+        self.identity_api.add_user_to_group(self.user2['id'], self.group['id'])
+
+        gd_url, gd_entity = _build_role_assignment_url_and_entity(
+            domain_id=self.domain_id, group_id=self.group_id,
+            role_id=self.role_id)
+        self.put(gd_url)
+
+        collection_url = ('/role_assignments?effective&user.id=%s' %
+                          self.user1['id'])
+        with mock.patch.object(self.identity_api,
+                               'list_users_in_group') as m:
+            r = self.get(collection_url)
+        self.assertFalse(m.called)
+        self.assertValidRoleAssignmentListResponse(r)
+        self.assertEqual(1, len(r.result.get('role_assignments')))
+        unused, ud_entity = _build_role_assignment_url_and_entity(
+            domain_id=self.domain_id, user_id=self.user1['id'],
+            role_id=self.role_id)
+        self.assertRoleAssignmentInListResponse(r, ud_entity, link_url=gd_url)
+
     def test_check_effective_values_for_role_assignments(self):
         """Call ``GET /role_assignments?effective=value``.
 
@@ -53,3 +53,29 @@ class FormatUrlTests(testtools.TestCase):
 
         _test(None)
         _test(object())
+
+
+class UrlTemplateTests(testtools.TestCase):
+
+    def test_request_variables_substituted(self):
+        url = core.UrlTemplate('http://$(host)s:$(port)d/$(tenant_id)s',
+                               {'host': 'server', 'port': 9090})
+        self.assertEqual(set(['host', 'port', 'tenant_id']), url.variables)
+        self.assertEqual('http://server:9090/A', url.format('A', 'B'))
+        self.assertEqual('http://server:9090/C', url.format('C', 'B'))
+
+    def test_static_url(self):
+        url = core.UrlTemplate('http://$(host)s/v2.0', {'host': 'server'})
+        self.assertEqual('http://server/v2.0', url.format('A', 'B'))
+
+    def test_raises_malformed_on_missing_key(self):
+        self.assertRaises(exception.MalformedEndpoint,
+                          core.UrlTemplate,
+                          'http://$(foo)s/$(tenant)s',
+                          {'foo': '1'})
+
+    def test_raises_malformed_on_wrong_request_type(self):
+        self.assertRaises(exception.MalformedEndpoint,
+                          core.UrlTemplate,
+                          'http://server/$(user_id)d',
+                          {})
@@ -0,0 +1,115 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import base64
+import zlib
+
+import eventlet
+from keystoneclient.common import cms
+
+from keystone.common import signing
+from keystone.common.signing.backends import crypto
+from keystone.common.signing.backends import openssl
+from keystone import config
+from keystone import exception
+from keystone import tests
+
+
+CONF = config.CONF
+
+_CRYPTO_SIGNER = 'keystone.common.signing.backends.crypto.Signer'
+
+
+class SignerTests(tests.TestCase):
+
+    def setUp(self):
+        super(SignerTests, self).setUp()
+        self.openssl_signer = openssl.Signer(CONF.signing.certfile,
+                                             CONF.signing.keyfile)
+        self.crypto_signer = crypto.Signer(CONF.signing.certfile,
+                                           CONF.signing.keyfile)
+        self.text = '{"access": {"token": {"id": "%s"}}}' % ('x' * 5000)
+
+    def test_sign_text_matches_openssl(self):
+        self.assertEqual(self.openssl_signer.sign_text(self.text),
+                         self.crypto_signer.sign_text(self.text))
+
+    def test_sign_token_matches_openssl(self):
+        self.assertEqual(self.openssl_signer.sign_token(self.text),
+                         self.crypto_signer.sign_token(self.text))
+
+    def test_sign_pkiz_matches_openssl(self):
+        # The compressed data may differ between zlib builds, so compare the
+        # signed documents.
+        def _der(token):
+            return zlib.decompress(
+                base64.urlsafe_b64decode(str(token[len(cms.PKIZ_PREFIX):])))
+
+        openssl_token = self.openssl_signer.sign_pkiz(self.text)
+        crypto_token = self.crypto_signer.sign_pkiz(self.text)
+        self.assertTrue(crypto_token.startswith(cms.PKIZ_PREFIX))
+        self.assertEqual(_der(openssl_token), _der(crypto_token))
+
+    def test_signed_text_verifies(self):
+        signed = self.crypto_signer.sign_text(self.text)
+        self.assertEqual(self.text,
+                         cms.cms_verify(signed, CONF.signing.certfile,
+                                        CONF.signing.ca_certs))
+
+    def test_get_signer_is_loaded_once(self):
+        self.config_fixture.config(group='signing', signer=_CRYPTO_SIGNER)
+        signer = signing.get_signer()
+        self.assertIsInstance(signer, crypto.Signer)
+        self.assertIs(signer, signing.get_signer())
+
+    def test_get_signer_falls_back_to_openssl(self):
+        self.config_fixture.config(group='signing', signer=_CRYPTO_SIGNER,
+                                   keyfile=CONF.signing.certfile)
+        self.assertIsInstance(signing.get_signer(), openssl.Signer)
+
+
+class SigningPoolTests(tests.BaseTestCase):
+
+    def test_inline_when_size_is_zero(self):
+        pool = signing.SigningPool(0, 10, 10)
+        self.assertEqual(3, pool.execute(lambda a, b: a + b, 1, 2))
+        self.assertEqual(1, pool.stats['executed'])
+
+    def test_execute_in_thread_pool(self):
+        pool = signing.SigningPool(2, 10, 10)
+        self.assertEqual(3, pool.execute(lambda a, b: a + b, 1, 2))
+        self.assertEqual(1, pool.stats['executed'])
+        self.assertFalse(pool._semaphore.locked())
+
+    def test_rejected_when_queue_is_full(self):
+        pool = signing.SigningPool(1, 0, 10)
+        pool._semaphore.acquire()
+        self.assertRaises(exception.ServiceUnavailable,
+                          pool.execute, lambda: None)
+        self.assertEqual(1, pool.stats['rejected'])
+
+    def test_timed_out_waiting_for_a_thread(self):
+        pool = signing.SigningPool(1, 1, 0.01)
+        pool._semaphore.acquire()
+        self.assertRaises(exception.ServiceUnavailable,
+                          pool.execute, lambda: None)
+        self.assertEqual(1, pool.stats['timed_out'])
+        self.assertEqual(0, pool.stats['queue_depth'])
+
+    def test_waits_for_a_free_thread(self):
+        pool = signing.SigningPool(1, 1, 10)
+        pool._semaphore.acquire()
+        waiter = eventlet.spawn(pool.execute, lambda: 'signed')
+        eventlet.sleep(0)
+        self.assertEqual(1, pool.stats['queue_depth'])
+        pool._semaphore.release()
+        self.assertEqual('signed', waiter.wait())
@@ -50,3 +50,19 @@ class TestModelDictMixin(tests.BaseTestCase):
         m = TestModel(id=expected['id'], text=expected['text'])
         m.extra = 'this should not be in the dictionary'
         self.assertEqual(m.to_dict(), expected)
+
+
+class TestCompressedJsonBlob(tests.BaseTestCase):
+
+    def test_value_round_trip(self):
+        blob = sql.CompressedJsonBlob()
+        value = {'id': utils.new_uuid(), 'list': [utils.new_uuid()] * 10}
+        stored = blob.process_bind_param(value, None)
+        self.assertTrue(stored.startswith(blob.prefix))
+        self.assertEqual(value, blob.process_result_value(stored, None))
+
+    def test_plain_json_value_read(self):
+        blob = sql.CompressedJsonBlob()
+        value = {'id': utils.new_uuid()}
+        stored = sql.JsonBlob().process_bind_param(value, None)
+        self.assertEqual(value, blob.process_result_value(stored, None))
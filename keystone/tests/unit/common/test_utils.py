@@ -13,6 +13,7 @@
 import uuid
 
 from keystone.common import utils
+from keystone import exception
 from keystone import tests
 
 
@@ -41,3 +42,42 @@ class TestPasswordHashing(tests.BaseTestCase):
         new_hashed_password = utils.hash_password(self.hashed_password)
         self.assertFalse(utils.check_password(self.password,
                                               new_hashed_password))
+
+
+class TestPasswordPool(tests.TestCase):
+
+    def setUp(self):
+        super(TestPasswordPool, self).setUp()
+        utils._PASSWORD_POOLS.clear()
+        self.addCleanup(utils._PASSWORD_POOLS.clear)
+        self.password = uuid.uuid4().hex
+
+    def test_hash_and_check_inline_by_default(self):
+        hashed_password = utils.hash_password(self.password)
+        self.assertTrue(utils.check_password(self.password, hashed_password))
+        pool = utils.get_password_pool()
+        self.assertEqual(0, pool.size)
+        self.assertEqual(2, pool.stats['executed'])
+
+    def test_hash_and_check_in_thread_pool(self):
+        self.config_fixture.config(group='identity',
+                                   password_hash_pool_size=2)
+        hashed_password = utils.hash_password(self.password)
+        self.assertTrue(utils.check_password(self.password, hashed_password))
+        pool = utils.get_password_pool()
+        self.assertEqual(2, pool.size)
+        self.assertEqual(2, pool.stats['executed'])
+        self.assertFalse(pool._semaphore.locked())
+
+    def test_check_rejected_when_pool_is_saturated(self):
+        hashed_password = utils.hash_password(self.password)
+        self.config_fixture.config(group='identity',
+                                   password_hash_pool_size=1,
+                                   password_hash_pool_queue_size=0)
+        pool = utils.get_password_pool()
+        pool._semaphore.acquire()
+        self.addCleanup(pool._semaphore.release)
+        self.assertRaises(exception.ServiceUnavailable,
+                          utils.check_password, self.password,
+                          hashed_password)
+        self.assertEqual(1, pool.stats['rejected'])
@@ -17,6 +17,7 @@ import uuid
 
 import mock
 
+from keystone.common import utils
 from keystone import config
 from keystone import exception
 from keystone import identity
@@ -78,3 +79,51 @@ class TestDomainConfigs(tests.BaseTestCase):
             mock_load_config.assert_called_once_with(fake_assignment_api,
                                                      [domain_config_filename],
                                                      'abc.def.com')
+
+
+class TestVerifiedPasswords(tests.BaseTestCase):
+
+    def setUp(self):
+        super(TestVerifiedPasswords, self).setUp()
+        self.user_id = uuid.uuid4().hex
+        self.password = uuid.uuid4().hex
+        self.hashed = utils.hash_password(self.password)
+        self.verified_passwords = identity.VerifiedPasswords(10, 60)
+        check_password = mock.patch.object(utils, 'check_password',
+                                           wraps=utils.check_password)
+        self.check_password = check_password.start()
+        self.addCleanup(check_password.stop)
+
+    def _check(self, password, hashed=None):
+        return self.verified_passwords.check_password(
+            self.user_id, password, hashed or self.hashed)
+
+    def test_verified_password_is_not_hashed_again(self):
+        self.assertTrue(self._check(self.password))
+        self.assertTrue(self._check(self.password))
+        self.assertEqual(1, self.check_password.call_count)
+
+    def test_wrong_password_is_always_hashed(self):
+        self.assertTrue(self._check(self.password))
+        self.assertFalse(self._check(uuid.uuid4().hex))
+        self.assertFalse(self._check(uuid.uuid4().hex))
+        self.assertEqual(3, self.check_password.call_count)
+
+    def test_changed_hash_is_checked(self):
+        self.assertTrue(self._check(self.password))
+        self.assertFalse(self._check(self.password,
+                                     utils.hash_password(uuid.uuid4().hex)))
+        self.assertEqual(2, self.check_password.call_count)
+
+    def test_invalidate(self):
+        self.assertTrue(self._check(self.password))
+        self.verified_passwords.invalidate(self.user_id)
+        self.assertTrue(self._check(self.password))
+        self.assertEqual(2, self.check_password.call_count)
+
+    def test_disabled(self):
+        self.verified_passwords = identity.VerifiedPasswords(0, 60)
+        self.assertTrue(self._check(self.password))
+        self.assertTrue(self._check(self.password))
+        self.assertEqual(2, self.check_password.call_count)
+        self.assertEqual(0, self.verified_passwords.get_stats()['size'])
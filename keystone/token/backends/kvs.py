@@ -14,7 +14,8 @@
 # under the License.
 
 from __future__ import absolute_import
-import copy
+
+import datetime
 
 import six
 
@@ -30,6 +31,10 @@ from keystone import token
 CONF = config.CONF
 LOG = log.getLogger(__name__)
 
+# NOTE: the tokens of a user are indexed in one bucket per hour they expire
+# in, named after this format so that the buckets sort by time.
+BUCKET_FORMAT = '%Y%m%d%H'
+
 
 class Token(token.Driver):
     """KeyValueStore backend for tokens.
@@ -61,8 +66,28 @@ class Token(token.Driver):
         return 'token-%s' % token_id.encode('utf-8')
 
     def _prefix_user_id(self, user_id):
+        # NOTE: the single list of all the tokens of a user used to be stored
+        # under this key, it is only read to revoke the tokens issued before
+        # the index was split in buckets, until they have all expired.
         return 'usertokens-%s' % user_id.encode('utf-8')
 
+    def _prefix_user_bucket(self, user_id, bucket):
+        return 'usertokenbucket-%s-%s' % (bucket, user_id.encode('utf-8'))
+
+    def _expiry_bucket(self, expires):
+        return timeutils.normalize_time(expires).strftime(BUCKET_FORMAT)
+
+    def _expiry_buckets(self, start, end):
+        """Return the buckets of the hours from `start` to `end` included."""
+        hour = timeutils.normalize_time(start).replace(
+            minute=0, second=0, microsecond=0)
+        end = timeutils.normalize_time(end)
+        buckets = []
+        while hour <= end:
+            buckets.append(self._expiry_bucket(hour))
+            hour += datetime.timedelta(hours=1)
+        return buckets
+
     def _get_key_or_default(self, key, default=None):
         try:
             return self._store.get(key)
@@ -93,23 +118,16 @@ class Token(token.Driver):
         It is assumed the caller has performed data validation on the "data"
         parameter.
         """
-        data_copy = copy.deepcopy(data)
+        data_copy = dict(data)
         ptk = self._prefix_token_id(token_id)
         if not data_copy.get('expires'):
             data_copy['expires'] = token.default_expire_time()
         if not data_copy.get('user_id'):
             data_copy['user_id'] = data_copy['user']['id']
 
-        # NOTE(morganfainberg): for ease of manipulating the data without
-        # concern about the backend, always store the value(s) in the
-        # index as the isotime (string) version so this is where the string is
-        # built.
-        expires_str = timeutils.isotime(data_copy['expires'], subsecond=True)
-
         self._set_key(ptk, data_copy)
         user_id = data['user']['id']
-        user_key = self._prefix_user_id(user_id)
-        self._update_user_token_list(user_key, token_id, expires_str)
+        self._update_user_token_list(user_id, token_id, data_copy['expires'])
         if CONF.trust.enabled and data.get('trust_id'):
             # NOTE(morganfainberg): If trusts are enabled and this is a trust
             # scoped token, we add the token to the trustee list as well.  This
@@ -129,59 +147,91 @@ class Token(token.Driver):
                     _('Unknown token version %s') %
                     data_copy.get('token_version'))
 
-            trustee_key = self._prefix_user_id(trustee_user_id)
-            self._update_user_token_list(trustee_key, token_id, expires_str)
+            self._update_user_token_list(trustee_user_id, token_id,
+                                         data_copy['expires'])
 
         return data_copy
 
-    def _get_user_token_list_with_expiry(self, user_key):
+    def _get_user_token_list_with_expiry(self, user_id):
         """Return a list of tuples in the format (token_id, token_expiry) for
-        the user_key.
-        """
-        return self._get_key_or_default(user_key, default=[])
+        the tokens of the user that expire in the current hour or later.
 
-    def _get_user_token_list(self, user_key):
-        """Return a list of token_ids for the user_key."""
-        token_list = self._get_user_token_list_with_expiry(user_key)
-        # Each element is a tuple of (token_id, token_expiry). Most code does
-        # not care about the expiry, it is stripped out and only a
-        # list of token_ids are returned.
-        return [t[0] for t in token_list]
-
-    def _update_user_token_list(self, user_key, token_id, expires_isotime_str):
+        The buckets are not indexed: no token lives longer than the token
+        expiration, so the buckets of the current hour up to the hour of the
+        longest lived token are all read in a single call.  The expired
+        tokens of the current hour are not filtered out.
+        """
         current_time = self._get_current_time()
-        revoked_token_list = set([t['id'] for t in
-                                  self.list_revoked_tokens()])
-
-        with self._store.get_lock(user_key) as lock:
-            filtered_list = []
-            token_list = self._get_user_token_list_with_expiry(user_key)
-            for item in token_list:
-                try:
-                    item_id, expires = self._format_token_index_item(item)
-                except (ValueError, TypeError):
-                    # NOTE(morganfainberg): Skip on expected errors
-                    # possibilities from the `_format_token_index_item` method.
-                    continue
-
-                if expires < current_time:
-                    LOG.debug(_('Token `%(token_id)s` is expired, removing '
-                                'from `%(user_key)s`.'),
-                              {'token_id': item_id, 'user_key': user_key})
-                    continue
-
-                if item_id in revoked_token_list:
-                    # NOTE(morganfainberg): If the token has been revoked, it
-                    # can safely be removed from this list.  This helps to keep
-                    # the user_token_list as reasonably small as possible.
-                    LOG.debug(_('Token `%(token_id)s` is revoked, removing '
-                                'from `%(user_key)s`.'),
-                              {'token_id': item_id, 'user_key': user_key})
-                    continue
-                filtered_list.append(item)
-            filtered_list.append((token_id, expires_isotime_str))
-            self._set_key(user_key, filtered_list, lock)
-            return filtered_list
+        legacy_key = self._prefix_user_id(user_id)
+        latest_time = current_time + datetime.timedelta(
+            seconds=CONF.token.expiration)
+        bucket_keys = [self._prefix_user_bucket(user_id, bucket)
+                       for bucket in self._expiry_buckets(current_time,
+                                                          latest_time)]
+        values = self._store.get_multi_or_default([legacy_key] + bucket_keys,
+                                                  default=[])
+        legacy_list = values.pop(0)
+        if legacy_list:
+            self._prune_legacy_user_token_list(user_id, legacy_list,
+                                               current_time)
+        token_list = list(legacy_list)
+        for bucket_list in values:
+            token_list.extend(bucket_list)
+        return token_list
+
+    def _prune_legacy_user_token_list(self, user_id, token_list,
+                                      current_time):
+        """Delete the single list of tokens of the user once all the tokens
+        in it have expired.
+
+        The list is not written to anymore, once its tokens have expired
+        there is no reason to keep reading it.
+        """
+        for item in token_list:
+            try:
+                token_id, expires = self._format_token_index_item(item)
+            except (TypeError, ValueError):
+                continue
+            if expires > current_time:
+                return
+
+        legacy_key = self._prefix_user_id(user_id)
+        LOG.debug(_('Removing the expired token list of user `%s`.'),
+                  user_id)
+        with self._store.get_lock(legacy_key) as lock:
+            try:
+                self._store.delete(legacy_key, lock)
+            except exception.NotFound:
+                # NOTE: removed by a concurrent listing of the tokens.
+                pass
+
+    def _update_user_token_list(self, user_id, token_id, expires):
+        """Append the token to the bucket of its user and expiry hour.
+
+        Nothing is parsed or filtered out on the way: the buckets of the
+        hours past are left out when listing the tokens, and expire after
+        the token expiration like any other key.  In stores without expiry
+        they are dropped when the next bucket of the user is created.
+        """
+        bucket = self._expiry_bucket(expires)
+        bucket_key = self._prefix_user_bucket(user_id, bucket)
+        expires_str = timeutils.isotime(expires, subsecond=True)
+        with self._store.get_lock(bucket_key) as lock:
+            token_list = self._get_key_or_default(bucket_key, default=[])
+            new_bucket = not token_list
+            token_list.append((token_id, expires_str))
+            self._set_key(bucket_key, token_list, lock)
+
+        if new_bucket:
+            current_time = self._get_current_time()
+            oldest_time = current_time - datetime.timedelta(
+                seconds=CONF.token.expiration)
+            expired = self._expiry_buckets(oldest_time, current_time)[:-1]
+            LOG.debug(_('Removing expired token buckets %(buckets)s of '
+                        'user `%(user_id)s`.'),
+                      {'buckets': expired, 'user_id': user_id})
+            self._store.delete_multi(
+                [self._prefix_user_bucket(user_id, b) for b in expired])
 
     def _get_current_time(self):
         return timeutils.normalize_time(timeutils.utcnow())
@@ -308,8 +358,7 @@ class Token(token.Driver):
         if not CONF.token.revoke_by_id:
             return []
         tokens = []
-        user_key = self._prefix_user_id(user_id)
-        token_list = self._get_user_token_list_with_expiry(user_key)
+        token_list = self._get_user_token_list_with_expiry(user_id)
         current_time = self._get_current_time()
         for item in token_list:
             try:
@@ -348,6 +397,7 @@ class Token(token.Driver):
             return revoked_token_list
         return []
 
-    def flush_expired_tokens(self):
+    def flush_expired_tokens(self, batch_size=None, batch_delay=0,
+                             max_runtime=None, expired_before=None):
         """Archive or delete tokens that have expired."""
         raise exception.NotImplemented()
@@ -12,16 +12,22 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import copy
+import time
 
 from keystone.common import sql
 from keystone import config
 from keystone import exception
+from keystone.openstack.common.gettextutils import _
+from keystone.openstack.common import log
 from keystone.openstack.common import timeutils
 from keystone import token
 
 
 CONF = config.CONF
+LOG = log.getLogger(__name__)
+
+# minimum time between two progress reports of a token flush (in seconds)
+FLUSH_PROGRESS_INTERVAL = 10
 
 
 class TokenModel(sql.ModelBase, sql.DictBase):
@@ -29,16 +35,64 @@ class TokenModel(sql.ModelBase, sql.DictBase):
     attributes = ['id', 'expires', 'user_id', 'trust_id']
     id = sql.Column(sql.String(64), primary_key=True)
     expires = sql.Column(sql.DateTime(), default=None)
-    extra = sql.Column(sql.JsonBlob())
+    extra = sql.Column(sql.CompressedJsonBlob())
     valid = sql.Column(sql.Boolean(), default=True, nullable=False)
     user_id = sql.Column(sql.String(64))
     trust_id = sql.Column(sql.String(64))
+    # NOTE: the scope of the token is kept in columns of its own to be
+    # queried, but is not part of the token reference.
+    project_id = sql.Column(sql.String(64))
+    domain_id = sql.Column(sql.String(64))
+    consumer_id = sql.Column(sql.String(64))
     __table_args__ = (
         sql.Index('ix_token_expires', 'expires'),
-        sql.Index('ix_token_expires_valid', 'expires', 'valid')
+        sql.Index('ix_token_expires_valid', 'expires', 'valid'),
+        sql.Index('ix_token_user_id_valid_expires',
+                  'user_id', 'valid', 'expires'),
+        sql.Index('ix_token_trust_id_valid_expires',
+                  'trust_id', 'valid', 'expires'),
+        sql.Index('ix_token_project_id', 'project_id'),
+        sql.Index('ix_token_domain_id', 'domain_id'),
+        sql.Index('ix_token_consumer_id', 'consumer_id')
     )
 
 
+def _scope_values(token_ref):
+    """Return the project, domain and consumer IDs of the token."""
+    project_id = domain_id = consumer_id = None
+    if token_ref.get('tenant'):
+        project_id = token_ref['tenant'].get('id')
+    token_data = token_ref.get('token_data') or {}
+    if 'token' in token_data:
+        domain_id = token_data['token'].get('domain', {}).get('id')
+        consumer_id = token_data['token'].get('OS-OAUTH1', {}).get(
+            'consumer_id')
+    return project_id, domain_id, consumer_id
+
+
+def compact_token_ref(token_ref):
+    """Return the token reference as it is stored.
+
+    The service catalog, which makes up most of the token data, is left out
+    and ``catalog_omitted`` set instead, so that the catalog is rebuilt when
+    the token is validated.
+
+    """
+    token_data = token_ref.get('token_data')
+    if not token_data:
+        return token_ref
+    for version_key, catalog_key in (('token', 'catalog'),
+                                     ('access', 'serviceCatalog')):
+        if catalog_key in token_data.get(version_key, {}):
+            body = dict(token_data[version_key])
+            del body[catalog_key]
+            token_data = dict(token_data)
+            token_data[version_key] = body
+            return dict(token_ref, token_data=token_data,
+                        catalog_omitted=True)
+    return token_ref
+
+
 class Token(token.Driver):
     # Public interface
     def get_token(self, token_id):
@@ -51,14 +105,16 @@ class Token(token.Driver):
         return token_ref.to_dict()
 
     def create_token(self, token_id, data):
-        data_copy = copy.deepcopy(data)
+        data_copy = dict(data)
         if not data_copy.get('expires'):
             data_copy['expires'] = token.default_expire_time()
         if not data_copy.get('user_id'):
             data_copy['user_id'] = data_copy['user']['id']
 
-        token_ref = TokenModel.from_dict(data_copy)
+        token_ref = TokenModel.from_dict(compact_token_ref(data_copy))
         token_ref.valid = True
+        (token_ref.project_id, token_ref.domain_id,
+         token_ref.consumer_id) = _scope_values(data_copy)
         session = sql.get_session()
         with session.begin():
             session.add(token_ref)
@@ -72,6 +128,27 @@ class Token(token.Driver):
                 raise exception.TokenNotFound(token_id=token_id)
             token_ref.valid = False
 
+    def _valid_tokens_query(self, query, user_id=None, tenant_id=None,
+                            trust_id=None, consumer_id=None):
+        """Filter the query down to the valid tokens matching the IDs.
+
+        The filters match the indexes on (user_id, valid, expires) and
+        (trust_id, valid, expires), so that the token data is not looked at.
+
+        """
+        now = timeutils.utcnow()
+        if trust_id:
+            query = query.filter(TokenModel.trust_id == trust_id)
+        else:
+            query = query.filter(TokenModel.user_id == user_id)
+        query = query.filter_by(valid=True)
+        query = query.filter(TokenModel.expires > now)
+        if tenant_id:
+            query = query.filter(TokenModel.project_id == tenant_id)
+        if consumer_id:
+            query = query.filter(TokenModel.consumer_id == consumer_id)
+        return query
+
     def delete_tokens(self, user_id, tenant_id=None, trust_id=None,
                       consumer_id=None):
         """Deletes all tokens in one session
@@ -84,86 +161,27 @@ class Token(token.Driver):
         """
         session = sql.get_session()
         with session.begin():
-            now = timeutils.utcnow()
-            query = session.query(TokenModel)
-            query = query.filter_by(valid=True)
-            query = query.filter(TokenModel.expires > now)
-            if trust_id:
-                query = query.filter(TokenModel.trust_id == trust_id)
-            else:
-                query = query.filter(TokenModel.user_id == user_id)
-
-            for token_ref in query.all():
-                if tenant_id:
-                    token_ref_dict = token_ref.to_dict()
-                    if not self._tenant_matches(tenant_id, token_ref_dict):
-                        continue
-                if consumer_id:
-                    token_ref_dict = token_ref.to_dict()
-                    if not self._consumer_matches(consumer_id, token_ref_dict):
-                        continue
-
-                token_ref.valid = False
-
-    def _tenant_matches(self, tenant_id, token_ref_dict):
-        return ((tenant_id is None) or
-                (token_ref_dict.get('tenant') and
-                 token_ref_dict['tenant'].get('id') == tenant_id))
-
-    def _consumer_matches(self, consumer_id, ref):
-        if consumer_id is None:
-            return True
-        else:
-            try:
-                oauth = ref['token_data']['token'].get('OS-OAUTH1', {})
-                return oauth and oauth['consumer_id'] == consumer_id
-            except KeyError:
-                return False
+            query = self._valid_tokens_query(
+                session.query(TokenModel), user_id, tenant_id=tenant_id,
+                trust_id=trust_id, consumer_id=consumer_id)
+            query.update({'valid': False}, synchronize_session=False)
 
-    def _list_tokens_for_trust(self, trust_id):
+    def _list_token_ids(self, user_id=None, tenant_id=None, trust_id=None,
+                        consumer_id=None):
         session = sql.get_session()
-        tokens = []
-        now = timeutils.utcnow()
-        query = session.query(TokenModel)
-        query = query.filter(TokenModel.expires > now)
-        query = query.filter(TokenModel.trust_id == trust_id)
+        query = self._valid_tokens_query(
+            session.query(TokenModel.id), user_id, tenant_id=tenant_id,
+            trust_id=trust_id, consumer_id=consumer_id)
+        return [token_ref.id for token_ref in query]
 
-        token_references = query.filter_by(valid=True)
-        for token_ref in token_references:
-            token_ref_dict = token_ref.to_dict()
-            tokens.append(token_ref_dict['id'])
-        return tokens
+    def _list_tokens_for_trust(self, trust_id):
+        return self._list_token_ids(trust_id=trust_id)
 
     def _list_tokens_for_user(self, user_id, tenant_id=None):
-        session = sql.get_session()
-        tokens = []
-        now = timeutils.utcnow()
-        query = session.query(TokenModel)
-        query = query.filter(TokenModel.expires > now)
-        query = query.filter(TokenModel.user_id == user_id)
-
-        token_references = query.filter_by(valid=True)
-        for token_ref in token_references:
-            token_ref_dict = token_ref.to_dict()
-            if self._tenant_matches(tenant_id, token_ref_dict):
-                tokens.append(token_ref['id'])
-        return tokens
+        return self._list_token_ids(user_id, tenant_id=tenant_id)
 
     def _list_tokens_for_consumer(self, user_id, consumer_id):
-        tokens = []
-        session = sql.get_session()
-        with session.begin():
-            now = timeutils.utcnow()
-            query = session.query(TokenModel)
-            query = query.filter(TokenModel.expires > now)
-            query = query.filter(TokenModel.user_id == user_id)
-            token_references = query.filter_by(valid=True)
-
-            for token_ref in token_references:
-                token_ref_dict = token_ref.to_dict()
-                if self._consumer_matches(consumer_id, token_ref_dict):
-                    tokens.append(token_ref_dict['id'])
-        return tokens
+        return self._list_token_ids(user_id, consumer_id=consumer_id)
 
     def _list_tokens(self, user_id, tenant_id=None, trust_id=None,
                      consumer_id=None):
@@ -209,23 +227,72 @@ class Token(token.Driver):
             # been increased beyond the default.
         return batch_size
 
-    def flush_expired_tokens(self):
+    def flush_expired_tokens(self, batch_size=None, batch_delay=0,
+                             max_runtime=None, expired_before=None):
+        """Delete the tokens that have expired.
+
+        With a batch size, the tokens are deleted in batches ordered by
+        token ID, each in a transaction of its own, so that locks are only
+        held for one batch at a time.
+
+        :param batch_size: number of tokens deleted per batch, defaults to
+                           the batch size of the database dialect, 0 for a
+                           single statement
+        :param batch_delay: time to sleep between two batches (in seconds)
+        :param max_runtime: time after which no new batch is started (in
+                            seconds)
+        :param expired_before: only delete the tokens expired before this
+                               time, defaults to now
+        :returns: number of tokens deleted
+
+        """
         session = sql.get_session()
-        dialect = session.bind.dialect.name
-        batch_size = self.token_flush_batch_size(dialect)
-        if batch_size > 0:
-            query = session.query(TokenModel.id)
-            query = query.filter(TokenModel.expires < timeutils.utcnow())
-            query = query.limit(batch_size).subquery()
-            delete_query = (session.query(TokenModel).
-                            filter(TokenModel.id.in_(query)))
-            while True:
-                rowcount = delete_query.delete(synchronize_session=False)
-                if rowcount == 0:
-                    break
-        else:
-            query = session.query(TokenModel)
-            query = query.filter(TokenModel.expires < timeutils.utcnow())
-            query.delete(synchronize_session=False)
+        if batch_size is None:
+            batch_size = self.token_flush_batch_size(
+                session.bind.dialect.name)
+        if expired_before is None:
+            expired_before = timeutils.utcnow()
+
+        if batch_size <= 0:
+            with session.begin():
+                query = session.query(TokenModel)
+                query = query.filter(TokenModel.expires < expired_before)
+                deleted = query.delete(synchronize_session=False)
+            LOG.info(_('Flushed %d expired tokens'), deleted)
+            return deleted
+
+        start = time.time()
+        reported_at = start
+        deleted = 0
+        last_id = None
+        while True:
+            with session.begin():
+                query = session.query(TokenModel.id)
+                query = query.filter(TokenModel.expires < expired_before)
+                if last_id is not None:
+                    query = query.filter(TokenModel.id > last_id)
+                query = query.order_by(TokenModel.id).limit(batch_size)
+                token_ids = [token_ref.id for token_ref in query]
+                if token_ids:
+                    delete_query = session.query(TokenModel).filter(
+                        TokenModel.id.in_(token_ids))
+                    delete_query.delete(synchronize_session=False)
+            deleted += len(token_ids)
+            if len(token_ids) < batch_size:
+                break
+            last_id = token_ids[-1]
+
+            now = time.time()
+            if max_runtime is not None and now - start >= max_runtime:
+                LOG.info(_('Token flush stopped after %(runtime)d seconds, '
+                           'the remaining expired tokens are left for the '
+                           'next run'), {'runtime': now - start})
+                break
+            if now - reported_at >= FLUSH_PROGRESS_INTERVAL:
+                LOG.info(_('Flushed %d expired tokens so far'), deleted)
+                reported_at = now
+            if batch_delay:
+                time.sleep(batch_delay)
 
-        session.flush()
+        LOG.info(_('Flushed %d expired tokens'), deleted)
+        return deleted
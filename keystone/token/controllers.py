@@ -12,9 +12,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import datetime
-
-from keystoneclient.common import cms
 import six
 
 from keystone.common import controller
@@ -23,7 +20,6 @@ from keystone.common import wsgi
 from keystone import config
 from keystone import exception
 from keystone.openstack.common.gettextutils import _
-from keystone.openstack.common import jsonutils
 from keystone.openstack.common import log
 from keystone.openstack.common import timeutils
 from keystone.token import core
@@ -427,19 +423,9 @@ class Auth(controller.V2Controller):
     def revocation_list(self, context, auth=None):
         if not CONF.token.revoke_by_id:
             raise exception.Gone()
-        tokens = self.token_api.list_revoked_tokens()
-
-        for t in tokens:
-            expires = t['expires']
-            if expires and isinstance(expires, datetime.datetime):
-                    t['expires'] = timeutils.isotime(expires)
-        data = {'revoked': tokens}
-        json_data = jsonutils.dumps(data)
-        signed_text = cms.cms_sign_text(json_data,
-                                        CONF.signing.certfile,
-                                        CONF.signing.keyfile)
-
-        return {'signed': signed_text}
+        version, signed_text = self.token_api.get_signed_revocation_list()
+        return wsgi.render_entity_response(context, {'signed': signed_text},
+                                           version)
 
     @controller.v2_deprecated
     def endpoints(self, context, token_id):
@@ -15,8 +15,8 @@
 """Main entry point into the Token service."""
 
 import abc
-import copy
 import datetime
+import hashlib
 
 from keystoneclient.common import cms
 import six
@@ -24,9 +24,11 @@ import six
 from keystone.common import cache
 from keystone.common import dependency
 from keystone.common import manager
+from keystone.common import signing
 from keystone import config
 from keystone import exception
 from keystone.openstack.common.gettextutils import _
+from keystone.openstack.common import jsonutils
 from keystone.openstack.common import log
 from keystone.openstack.common import timeutils
 from keystone.openstack.common import versionutils
@@ -154,8 +156,9 @@ class Manager(manager.Manager):
 
     def create_token(self, token_id, data):
         unique_id = self.unique_id(token_id)
-        data_copy = copy.deepcopy(data)
-        data_copy['id'] = unique_id
+        # NOTE: the token data is handed over to the token API, so only its
+        # top level, which is updated here, is copied.
+        data_copy = dict(data, id=unique_id)
         ret = self.driver.create_token(unique_id, data_copy)
         if SHOULD_CACHE(ret):
             # NOTE(morganfainberg): when doing a cache set, you must pass the
@@ -189,11 +192,39 @@ class Manager(manager.Manager):
     def list_revoked_tokens(self):
         return self.driver.list_revoked_tokens()
 
+    def get_signed_revocation_list(self):
+        """Return the signed revocation list and its version.
+
+        Signing the list may fork an openssl process, so the signed list is
+        cached until the revocation list is invalidated.
+
+        :returns: tuple of the version of the revocation list, usable as an
+                  HTTP entity tag, and the CMS signed revocation list
+
+        """
+        return self._get_signed_revocation_list()
+
+    @cache.on_arguments(should_cache_fn=SHOULD_CACHE,
+                        expiration_time=REVOCATION_CACHE_EXPIRATION_TIME)
+    def _get_signed_revocation_list(self):
+        tokens = []
+        for t in self.list_revoked_tokens():
+            t = dict(t)
+            expires = t['expires']
+            if expires and isinstance(expires, datetime.datetime):
+                t['expires'] = timeutils.isotime(expires)
+            tokens.append(t)
+        json_data = jsonutils.dumps({'revoked': tokens})
+        version = hashlib.sha1(json_data.encode('utf-8')).hexdigest()
+        signed_text = signing.get_signer().sign_text(json_data)
+        return version, signed_text
+
     def invalidate_revocation_list(self):
         # NOTE(morganfainberg): Note that ``self`` needs to be passed to
         # invalidate() because of the way the invalidation method works on
         # determining cache-keys.
         self.list_revoked_tokens.invalidate(self)
+        self._get_signed_revocation_list.invalidate(self)
 
     def delete_tokens_for_domain(self, domain_id):
         """Delete all tokens for a given domain."""
@@ -323,6 +354,14 @@ class Driver(object):
         :type data: dict
         :returns: token_ref or None.
 
+        The caller hands the data over to the driver and must not modify it
+        afterwards, so that the driver does not need to copy it. The driver
+        must not modify it either, beyond its top level.
+
+        The driver may store the token data without its service catalog, in
+        which case the token references it returns have ``catalog_omitted``
+        set, and the catalog is rebuilt when the token is validated.
+
         """
         raise exception.NotImplemented()
 
@@ -409,7 +448,18 @@ class Driver(object):
         raise exception.NotImplemented()
 
     @abc.abstractmethod
-    def flush_expired_tokens(self):
+    def flush_expired_tokens(self, batch_size=None, batch_delay=0,
+                             max_runtime=None, expired_before=None):
         """Archive or delete tokens that have expired.
+
+        :param batch_size: number of tokens removed per batch, 0 for a
+                           single batch
+        :param batch_delay: time to sleep between two batches (in seconds)
+        :param max_runtime: time after which no new batch is started (in
+                            seconds)
+        :param expired_before: only remove the tokens expired before this
+                               time, defaults to now
+        :returns: number of tokens removed
+
         """
         raise exception.NotImplemented()
@@ -16,6 +16,7 @@
 
 import abc
 
+from dogpile.cache import api
 import six
 
 from keystone.common import cache
@@ -104,12 +105,16 @@ class Manager(manager.Manager):
 
     def __init__(self):
         super(Manager, self).__init__(self.get_token_provider())
+        # NOTE: validated tokens are kept in this process for a short time,
+        # in front of the cache region, to save its round trip.
+        self._local_cache = cache.LRUCache(CONF.token.local_cache_size,
+                                           CONF.token.local_cache_time)
 
     def validate_token(self, token_id, belongs_to=None):
         unique_id = self.token_api.unique_id(token_id)
         # NOTE(morganfainberg): Ensure we never use the long-form token_id
         # (PKI) as part of the cache_key.
-        token = self._validate_token(unique_id)
+        token = self._validate_cached(self._validate_token, None, unique_id)
         self._token_belongs_to(token, belongs_to)
         self._is_valid_token(token)
         return token
@@ -129,7 +134,7 @@ class Manager(manager.Manager):
         unique_id = self.token_api.unique_id(token_id)
         # NOTE(morganfainberg): Ensure we never use the long-form token_id
         # (PKI) as part of the cache_key.
-        token = self._validate_v2_token(unique_id)
+        token = self._validate_cached(self._validate_v2_token, V2, unique_id)
         self.check_revocation_v2(token)
         self._token_belongs_to(token, belongs_to)
         self._is_valid_token(token)
@@ -155,7 +160,7 @@ class Manager(manager.Manager):
         unique_id = self.token_api.unique_id(token_id)
         # NOTE(morganfainberg): Ensure we never use the long-form token_id
         # (PKI) as part of the cache_key.
-        token = self._validate_v3_token(unique_id)
+        token = self._validate_cached(self._validate_v3_token, V3, unique_id)
         self._is_valid_token(token)
         return token
 
@@ -184,6 +189,26 @@ class Manager(manager.Manager):
         unique_id = self.token_api.unique_id(token_id)
         self.validate_v3_token(unique_id)
 
+    def _validate_cached(self, validate, version, token_id):
+        """Validate the token through the local cache.
+
+        The local cache only holds the validated token data, the expiry and
+        the revocation of the token are still checked on each validation.
+
+        """
+        if not (self._local_cache.enabled and SHOULD_CACHE(None)):
+            return validate(token_id)
+        key = (version, token_id)
+        token = self._local_cache.get(key)
+        if token is api.NO_VALUE:
+            token = validate(token_id)
+            self._local_cache.set(key, token)
+        return token
+
+    def get_local_cache_stats(self):
+        """Return the size and hit ratio of the local token cache."""
+        return self._local_cache.get_stats()
+
     @cache.on_arguments(should_cache_fn=SHOULD_CACHE,
                         expiration_time=EXPIRATION_TIME)
     def _validate_token(self, token_id):
@@ -252,6 +277,8 @@ class Manager(manager.Manager):
         self._validate_token.invalidate(self, token_id)
         self._validate_v2_token.invalidate(self, token_id)
         self._validate_v3_token.invalidate(self, token_id)
+        for version in (None, V2, V3):
+            self._local_cache.delete((version, token_id))
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -569,6 +569,37 @@ class BaseProvider(provider.Provider):
                         CONF.identity.default_domain_id):
                     raise exception.Unauthorized(msg)
 
+    def _restore_catalog(self, token_ref, token_data):
+        """Add the service catalog the token data was stored without.
+
+        The catalog is built again from the catalog API, the token data of
+        the reference is not modified.
+
+        """
+        if not token_ref.get('catalog_omitted'):
+            return token_data
+        if 'access' in token_data:
+            access = dict(token_data['access'])
+            catalog_ref = {}
+            if token_ref.get('tenant'):
+                catalog_ref = self.catalog_api.get_catalog(
+                    token_ref['user']['id'], token_ref['tenant']['id'],
+                    token_ref['metadata'])
+            access['serviceCatalog'] = (
+                self.v2_token_data_helper.format_catalog(catalog_ref))
+            return dict(token_data, access=access)
+
+        token_body = dict(token_data['token'])
+        trust = None
+        if 'OS-TRUST:trust' in token_body:
+            trust = {'trustor_user_id':
+                     token_body['OS-TRUST:trust']['trustor_user']['id']}
+        self.v3_token_data_helper._populate_service_catalog(
+            token_body, token_body['user']['id'],
+            token_body.get('domain', {}).get('id'),
+            token_body.get('project', {}).get('id'), trust)
+        return dict(token_data, token=token_body)
+
     def validate_v2_token(self, token_id):
         token_ref = self._verify_token(token_id)
         return self._validate_v2_token_ref(token_ref)
@@ -604,6 +635,8 @@ class BaseProvider(provider.Provider):
                         metadata_ref)
                 token_data = self.v2_token_data_helper.format_token(
                     token_ref, roles_ref, catalog_ref)
+            else:
+                token_data = self._restore_catalog(token_ref, token_data)
             return token_data
         except exception.ValidationError as e:
             LOG.exception(_('Failed to validate token'))
@@ -640,6 +673,8 @@ class BaseProvider(provider.Provider):
                 project_id=project_id,
                 bind=token_ref.get('bind'),
                 expires=token_ref['expires'])
+        else:
+            token_data = self._restore_catalog(token_ref, token_data)
         return token_data
 
     def validate_token(self, token_id):
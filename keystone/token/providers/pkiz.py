@@ -12,9 +12,8 @@
 
 """Keystone Compressed PKI Token Provider"""
 
-from keystoneclient.common import cms
-
 from keystone.common import environment
+from keystone.common import signing
 from keystone import config
 from keystone import exception
 from keystone.openstack.common.gettextutils import _
@@ -36,9 +35,9 @@ class Provider(common.BaseProvider):
             # produces unicode. This can be removed if the client returns
             # str()
             # TODO(ayoung): Make to a byte_str for Python3
-            token_id = str(cms.pkiz_sign(jsonutils.dumps(token_data),
-                                         CONF.signing.certfile,
-                                         CONF.signing.keyfile))
+            signer = signing.get_signer()
+            token_id = str(signing.get_signing_pool().execute(
+                signer.sign_pkiz, jsonutils.dumps(token_data)))
             return token_id
         except environment.subprocess.CalledProcessError:
             LOG.exception(ERROR_MESSAGE)
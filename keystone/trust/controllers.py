@@ -58,8 +58,7 @@ class TrustV3(controller.V3Controller):
 
     def _get_user_id(self, context):
         if 'token_id' in context:
-            token_id = context['token_id']
-            token = self.token_api.get_token(token_id)
+            token = self._get_token_ref(context)
             user_id = token['user']['id']
             return user_id
         return None
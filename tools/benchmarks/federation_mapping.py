@@ -0,0 +1,91 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Compare the rate of federated assertions mapped with and without caching.
+
+Every assertion of the mapping fixtures is mapped by every valid mapping of
+the fixtures. The per login path loads and compiles the rules of the mapping
+for each assertion, as federated logins used to, while the cached path
+reuses the rule processor compiled for the mapping. Run from the root of
+the source tree::
+
+    $ python tools/benchmarks/federation_mapping.py --count 200
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+from keystone.contrib.federation import utils as mapping_utils  # noqa
+from keystone import exception  # noqa
+from keystone.openstack.common import jsonutils  # noqa
+from keystone.tests import mapping_fixtures  # noqa
+
+
+def _fixtures(suffix):
+    return [getattr(mapping_fixtures, name)
+            for name in sorted(dir(mapping_fixtures))
+            if name.endswith(suffix)]
+
+
+def _valid_mappings():
+    mappings = []
+    for name in sorted(dir(mapping_fixtures)):
+        if not name.startswith('MAPPING_'):
+            continue
+        ref = getattr(mapping_fixtures, name)
+        try:
+            mapping_utils.validate_mapping_structure(ref)
+        except exception.ValidationError:
+            continue
+        mappings.append({'id': name, 'rules': jsonutils.dumps(ref['rules'])})
+    return mappings
+
+
+def _per_login(mapping):
+    return mapping_utils.RuleProcessor(jsonutils.loads(mapping['rules']))
+
+
+def _mappings_per_second(get_processor, mappings, assertions, count):
+    start = time.time()
+    for _ in range(count):
+        for mapping in mappings:
+            for assertion in assertions:
+                try:
+                    get_processor(mapping).process(assertion)
+                except exception.Unauthorized:
+                    pass
+    return count * len(mappings) * len(assertions) / (time.time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100,
+                        help='number of times each assertion is mapped')
+    args = parser.parse_args()
+
+    mappings = _valid_mappings()
+    assertions = _fixtures('_ASSERTION')
+    print('%d mappings, %d assertions' % (len(mappings), len(assertions)))
+    for name, get_processor in (('per login', _per_login),
+                                ('cached', mapping_utils.get_rule_processor)):
+        rate = _mappings_per_second(get_processor, mappings, assertions,
+                                    args.count)
+        print('%-10s %10.1f assertions/s' % (name, rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Compare the rate of policy checks of the interpreted and compiled rules.
+
+Every rule of the policy file is checked against a set of sample
+credentials. Run from the root of the source tree::
+
+    $ python tools/benchmarks/policy_enforcement.py --count 200
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+from keystone.openstack.common import policy as common_policy  # noqa
+from keystone.policy.backends import rules  # noqa
+
+
+CREDENTIALS = [
+    {'roles': ['admin'], 'domain_id': 'admin_domain_id',
+     'user_id': 'user', 'project_id': 'project'},
+    {'roles': ['admin', 'member'], 'domain_id': 'domain',
+     'user_id': 'user', 'project_id': 'project'},
+    {'roles': ['member'], 'user_id': 'user', 'project_id': 'project'},
+]
+
+TARGET = {'domain_id': 'domain',
+          'user_id': 'user',
+          'project_id': 'project',
+          'target.token.user_id': 'user',
+          'target.token.user.domain.id': 'domain',
+          'target.user.domain_id': 'domain',
+          'target.project.domain_id': 'domain'}
+
+
+def _checks_per_second(check, actions, count):
+    start = time.time()
+    for _ in range(count):
+        for action in actions:
+            for creds in CREDENTIALS:
+                check(action, TARGET, creds)
+    return count * len(actions) * len(CREDENTIALS) / (time.time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--policy-file',
+                        default='etc/policy.v3cloudsample.json')
+    parser.add_argument('--count', type=int, default=100,
+                        help='number of times each rule is checked')
+    args = parser.parse_args()
+
+    with open(args.policy_file) as f:
+        policy_rules = common_policy.Rules.load_json(f.read(), 'default')
+    enforcer = common_policy.Enforcer()
+    enforcer.set_rules(policy_rules)
+    actions = sorted(enforcer.rules)
+
+    compiled = {}
+
+    def compiled_check(action, target, creds):
+        rule = rules._compile_rule(action, enforcer.rules, compiled,
+                                   frozenset())
+        return rule(target, creds, {})
+
+    print('%d rules, %d sets of credentials' % (len(actions),
+                                                len(CREDENTIALS)))
+    for name, check in (('interpreted', enforcer.enforce),
+                        ('compiled', compiled_check)):
+        rate = _checks_per_second(check, actions, args.count)
+        print('%-12s %10.1f checks/s' % (name, rate))
+
+
+if __name__ == '__main__':
+    main()
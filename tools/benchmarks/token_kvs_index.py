@@ -0,0 +1,94 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Compare the rate of tokens issued to a single user by the KVS driver.
+
+The single list path keeps every token of the user in one list, filtered
+against the revocation list on each issue, as it used to. The current path
+appends the token to the bucket of its expiry hour. Both use the in-memory
+KVS backend. Run from the root of the source tree::
+
+    $ python tools/benchmarks/token_kvs_index.py --count 5000
+
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.getcwd())
+
+from keystone.common.kvs import core as kvs_core  # noqa
+from keystone.openstack.common import timeutils  # noqa
+from keystone.token.backends import kvs  # noqa
+
+
+class SingleListToken(kvs.Token):
+    """Keeps the index of a user in a single list, filtered on each issue."""
+
+    def _update_user_token_list(self, user_id, token_id, expires):
+        user_key = self._prefix_user_id(user_id)
+        expires_str = timeutils.isotime(expires, subsecond=True)
+        current_time = self._get_current_time()
+        revoked_token_list = set([t['id'] for t in
+                                  self.list_revoked_tokens()])
+        with self._store.get_lock(user_key) as lock:
+            filtered_list = []
+            for item in self._get_key_or_default(user_key, default=[]):
+                item_id, item_expires = self._format_token_index_item(item)
+                if item_expires < current_time:
+                    continue
+                if item_id in revoked_token_list:
+                    continue
+                filtered_list.append(item)
+            filtered_list.append((token_id, expires_str))
+            self._set_key(user_key, filtered_list, lock)
+
+
+def _tokens_per_second(driver, count, revoked):
+    user = {'id': uuid.uuid4().hex}
+    expires = timeutils.utcnow() + datetime.timedelta(hours=1)
+    for _ in range(revoked):
+        token_id = uuid.uuid4().hex
+        driver.create_token(token_id, {'user': user, 'expires': expires})
+        driver.delete_token(token_id)
+    start = time.time()
+    for _ in range(count):
+        driver.create_token(uuid.uuid4().hex,
+                            {'user': user, 'expires': expires})
+    return count / (time.time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=2000,
+                        help='number of tokens issued to the user')
+    parser.add_argument('--revoked', type=int, default=100,
+                        help='number of tokens revoked beforehand')
+    args = parser.parse_args()
+
+    print('%d tokens issued, %d revoked beforehand' % (args.count,
+                                                       args.revoked))
+    for name, driver_class in (('single list', SingleListToken),
+                               ('buckets', kvs.Token)):
+        # each driver needs a KVS region of its own
+        kvs_core.KEY_VALUE_STORE_REGISTRY.clear()
+        driver = driver_class()
+        rate = _tokens_per_second(driver, args.count, args.revoked)
+        print('%-12s %10.1f tokens/s' % (name, rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Compare the token signing rate of the available signers.
+
+Run from the root of the source tree::
+
+    $ python tools/benchmarks/token_signing.py --count 500
+
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+from keystone.common.signing.backends import crypto  # noqa
+from keystone.common.signing.backends import openssl  # noqa
+
+
+def _sample_token(catalog_size):
+    endpoints = [{'id': '%032x' % i,
+                  'interface': 'public',
+                  'region': 'RegionOne',
+                  'url': 'http://service%d.example.com:8080/v1/' % i}
+                 for i in range(catalog_size)]
+    return json.dumps({'access': {'token': {'id': 'placeholder'},
+                                  'serviceCatalog': endpoints}})
+
+
+def _tokens_per_second(sign, text, count):
+    start = time.time()
+    for _ in range(count):
+        sign(text)
+    return count / (time.time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--certfile',
+                        default='examples/pki/certs/signing_cert.pem')
+    parser.add_argument('--keyfile',
+                        default='examples/pki/private/signing_key.pem')
+    parser.add_argument('--count', type=int, default=200,
+                        help='number of tokens signed by each signer')
+    parser.add_argument('--catalog-size', type=int, default=20,
+                        help='number of endpoints in the sample token')
+    args = parser.parse_args()
+
+    text = _sample_token(args.catalog_size)
+    print('token payload: %d bytes' % len(text))
+    for name, signer_class in (('openssl', openssl.Signer),
+                               ('crypto', crypto.Signer)):
+        signer = signer_class(args.certfile, args.keyfile)
+        for method in ('sign_token', 'sign_pkiz'):
+            rate = _tokens_per_second(getattr(signer, method), text,
+                                      args.count)
+            print('%-8s %-11s %8.1f tokens/s' % (name, method, rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Compare the size of a token stored by the SQL backend in each format.
+
+The full format is the JSON of the whole token reference, the compact one
+leaves the service catalog out and compresses the rest. Run from the root
+of the source tree::
+
+    $ python tools/benchmarks/token_size.py --catalog-size 20
+
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+
+from keystone.common import sql  # noqa
+from keystone.token.backends import sql as token_sql  # noqa
+
+
+def _sample_token_ref(catalog_size):
+    catalog = [{'id': '%032x' % i,
+                'type': 'service%d' % i,
+                'endpoints': [{'id': '%032x' % (i * 3 + j),
+                               'interface': interface,
+                               'region': 'RegionOne',
+                               'url': 'http://service%d.example.com/v1/' % i}
+                              for j, interface in enumerate(
+                                  ('public', 'internal', 'admin'))]}
+               for i in range(catalog_size)]
+    user = {'id': 'u' * 32, 'name': 'user',
+            'domain': {'id': 'default', 'name': 'Default'}}
+    project = {'id': 'p' * 32, 'name': 'project',
+               'domain': {'id': 'default', 'name': 'Default'}}
+    token_data = {'token': {'methods': ['password'],
+                            'roles': [{'id': 'r' * 32, 'name': 'member'}],
+                            'expires_at': '2038-01-01T00:00:00.000000Z',
+                            'project': project,
+                            'catalog': catalog,
+                            'extras': {},
+                            'user': user,
+                            'issued_at': '2014-01-01T00:00:00.000000Z'}}
+    # the columns of the token table are not part of the extra blob
+    return {'key': 't' * 32,
+            'user': user, 'tenant': project,
+            'metadata': {'roles': ['r' * 32]},
+            'token_data': token_data,
+            'token_version': 'v3.0'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--catalog-size', type=int, default=20,
+                        help='number of services in the sample catalog')
+    parser.add_argument('--tokens', type=int, default=1000000,
+                        help='number of live tokens to extrapolate to')
+    args = parser.parse_args()
+
+    token_ref = _sample_token_ref(args.catalog_size)
+    full = sql.JsonBlob().process_bind_param(token_ref, None)
+    compact = sql.CompressedJsonBlob().process_bind_param(
+        token_sql.compact_token_ref(token_ref), None)
+    print('%d services in the catalog, %d tokens' % (args.catalog_size,
+                                                     args.tokens))
+    for name, stored in (('full', full), ('compact', compact)):
+        total = len(stored) * args.tokens
+        print('%-8s %8d bytes/token %10.1f MiB' % (
+            name, len(stored), total / 1024.0 / 1024.0))
+
+
+if __name__ == '__main__':
+    main()